@@ -35,6 +35,8 @@ PYRFLX = PyRFLX.from_specs(["specs/ipv4.rflx"], True)
 ICMP = PYRFLX["ICMP"]
 ICMP.set_checksum_functions({"Message": {"Checksum": icmp_checksum}})
 IP = PYRFLX["IPv4"]
+ICMP_MESSAGES = ICMP.pool("Message", 1)
+IP_PACKETS = IP.pool("Packet", 1)
 
 ICMP_DATA = bytes(list(range(0, 56)))
 
@@ -97,7 +99,11 @@ def ping(target: str) -> None:
 
 
 def create_request(src: int, dst: int, seq: int) -> bytes:
-    msg = ICMP["Message"]
+    with ICMP_MESSAGES.borrow() as msg, IP_PACKETS.borrow() as pkt:
+        return create_packet(msg, pkt, src, dst, seq)
+
+
+def create_packet(msg: MessageValue, pkt: MessageValue, src: int, dst: int, seq: int) -> bytes:
     msg.set("Tag", "Echo_Request")
     msg.set("Code_Zero", 0)
     msg.set("Checksum", 0)
@@ -106,7 +112,6 @@ def create_request(src: int, dst: int, seq: int) -> bytes:
     msg.set("Data", ICMP_DATA)
     msg.update_checksums()
 
-    pkt = IP["Packet"]
     pkt.set("Version", 4)
     pkt.set("IHL", 5)
     pkt.set("DSCP", 0)
@@ -2,6 +2,7 @@ import argparse
 import json
 import logging
 import os
+import time
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Sequence, Union
@@ -12,11 +13,12 @@ from rflx.error import RecordFluxError, Severity, Subsystem, fail
 from rflx.generator import Generator
 from rflx.graph import Graph
 from rflx.model import Message, Model, Session
-from rflx.specification import Parser
+from rflx.specification import Parser, Workspace, cache
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 DEFAULT_PREFIX = "RFLX"
+DEFAULT_CACHE_PORT = 8790
 
 
 def main(argv: List[str]) -> Union[int, str]:
@@ -29,7 +31,28 @@ def main(argv: List[str]) -> Union[int, str]:
     subparsers = parser.add_subparsers(dest="subcommand")
     subparsers.required = True
 
-    parser_check = subparsers.add_parser("check", help="check specification")
+    # arguments shared by all subcommands which use the verification cache
+    cache_arguments = argparse.ArgumentParser(add_help=False)
+    cache_arguments.add_argument(
+        "--cache-directory",
+        type=Path,
+        help="directory of verification cache (default: $RFLX_CACHE_DIR or ~/.cache/RecordFlux)",
+    )
+    verification_arguments = argparse.ArgumentParser(add_help=False, parents=[cache_arguments])
+    verification_arguments.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of parallel processes used for verification (default: 1)",
+    )
+    verification_arguments.add_argument(
+        "--cache-url",
+        help="URL of verification cache server (default: $RFLX_CACHE_URL)",
+    )
+
+    parser_check = subparsers.add_parser(
+        "check", parents=[verification_arguments], help="check specification"
+    )
     parser_check.add_argument(
         "files", metavar="FILE", type=Path, nargs="+", help="specification file"
     )
@@ -42,7 +65,28 @@ def main(argv: List[str]) -> Union[int, str]:
     parser_export.add_argument("-o", "--output", help="output file", type=Path, required=True)
     parser_export.set_defaults(func=export)
 
-    parser_generate = subparsers.add_parser("generate", help="generate code")
+    parser_compile_model = subparsers.add_parser(
+        "compile-model",
+        parents=[verification_arguments],
+        help="store verified model in binary snapshot",
+        description=(
+            "Store the verified model in a binary snapshot, which can be loaded by"
+            " PyRFLX.from_snapshot. Loading a snapshot can execute arbitrary code, so only snapshots"
+            " from trusted sources should be loaded. Snapshots which are writable by other"
+            " users are rejected."
+        ),
+    )
+    parser_compile_model.add_argument(
+        "files", metavar="FILE", type=Path, nargs="+", help="specification file"
+    )
+    parser_compile_model.add_argument(
+        "-o", "--output", help="output file", type=Path, required=True
+    )
+    parser_compile_model.set_defaults(func=compile_model)
+
+    parser_generate = subparsers.add_parser(
+        "generate", parents=[verification_arguments], help="generate code"
+    )
     parser_generate.add_argument(
         "-p",
         "--prefix",
@@ -81,6 +125,44 @@ def main(argv: List[str]) -> Union[int, str]:
     )
     parser_graph.set_defaults(func=graph)
 
+    parser_watch = subparsers.add_parser(
+        "watch",
+        parents=[verification_arguments],
+        help="check specification again whenever a specification file changes",
+    )
+    parser_watch.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks for changed files (default: 1.0)",
+    )
+    parser_watch.add_argument(
+        "files", metavar="FILE", type=Path, nargs="+", help="specification file"
+    )
+    parser_watch.set_defaults(func=watch)
+
+    parser_cache_server = subparsers.add_parser(
+        "cache-server",
+        parents=[cache_arguments],
+        help="run server for sharing verification results in a trusted network",
+        description=(
+            "Run a server for sharing verification results. The server is read-only unless"
+            " --writable is given. If $RFLX_CACHE_TOKEN is set, each request must contain the"
+            " token, which the clients take from the same variable. Requests are not encrypted,"
+            " so the server must only be accessible in a trusted network."
+        ),
+    )
+    parser_cache_server.add_argument(
+        "--host", type=str, default="localhost", help="host name (default: localhost)"
+    )
+    parser_cache_server.add_argument(
+        "--port", type=int, default=DEFAULT_CACHE_PORT, help=f"port (default: {DEFAULT_CACHE_PORT})"
+    )
+    parser_cache_server.add_argument(
+        "--writable", action="store_true", help="allow clients to store verification results"
+    )
+    parser_cache_server.set_defaults(func=cache_server)
+
     args = parser.parse_args(argv[1:])
 
     if args.quiet:
@@ -95,7 +177,12 @@ def main(argv: List[str]) -> Union[int, str]:
 
 
 def check(args: argparse.Namespace) -> None:
-    parse(args.files)
+    parse(
+        args.files,
+        workers=args.workers,
+        cache_directory=args.cache_directory,
+        cache_url=args.cache_url,
+    )
 
 
 def generate(args: argparse.Namespace) -> None:
@@ -108,7 +195,12 @@ def generate(args: argparse.Namespace) -> None:
     if not args.directory.is_dir():
         fail(f'directory not found: "{args.directory}"', Subsystem.CLI)
 
-    model = parse(args.files)
+    model = parse(
+        args.files,
+        workers=args.workers,
+        cache_directory=args.cache_directory,
+        cache_url=args.cache_url,
+    )
 
     generator = Generator(
         model, args.prefix, reproducible=os.environ.get("RFLX_REPRODUCIBLE") is not None
@@ -120,8 +212,25 @@ def generate(args: argparse.Namespace) -> None:
         generator.write_top_level_package(args.directory)
 
 
-def parse(files: Sequence[Path], skip_verification: bool = False) -> Model:
-    parser = Parser(skip_verification, cached=True)
+def parse(
+    files: Sequence[Path],
+    skip_verification: bool = False,
+    workers: int = 1,
+    cache_directory: Path = None,
+    cache_url: str = None,
+    workspace: Workspace = None,
+) -> Model:
+    if workers < 1:
+        fail(f"invalid number of workers: {workers}", Subsystem.CLI)
+
+    parser = Parser(
+        skip_verification,
+        cached=True,
+        workers=workers,
+        cache_directory=cache_directory,
+        cache_url=cache_url,
+        workspace=workspace,
+    )
     error = RecordFluxError()
     present_files = []
 
@@ -176,7 +285,82 @@ def graph(args: argparse.Namespace) -> None:
         json.dump(locations, f)
 
 
+def watch(args: argparse.Namespace) -> None:
+    if args.interval <= 0:
+        fail(f"invalid interval: {args.interval}", Subsystem.CLI)
+    if args.workers < 1:
+        fail(f"invalid number of workers: {args.workers}", Subsystem.CLI)
+
+    workspace = Workspace()
+    # the errors of the last check are reported when watching is stopped
+    error = RecordFluxError()
+
+    try:
+        while True:
+            try:
+                parse(
+                    args.files,
+                    workers=args.workers,
+                    cache_directory=args.cache_directory,
+                    cache_url=args.cache_url,
+                    workspace=workspace,
+                )
+                error = RecordFluxError()
+            except RecordFluxError as e:
+                error = e
+                logging.error("%s", e)
+            logging.info("Waiting for changes")
+            while not workspace.modified(args.files):
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+    error.propagate()
+
+
+def cache_server(args: argparse.Namespace) -> None:
+    directory = cache.cache_directory(args.cache_directory)
+
+    try:
+        server = cache.CacheServer(
+            (args.host, args.port),
+            cache.SQLiteBackend(directory / cache.VERIFICATION_FILE),
+            writable=args.writable,
+            token=os.environ.get(cache.CACHE_TOKEN_VARIABLE) or None,
+        )
+    except OSError as e:
+        fail(f"unable to start cache server: {e}", Subsystem.CLI)
+
+    logging.info(
+        "Serving %s verification cache in %s on %s:%s",
+        "writable" if args.writable else "read-only",
+        directory,
+        args.host,
+        args.port,
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 def export(args: argparse.Namespace) -> None:
     model = parse(args.files)
     with open(args.output, "w") as f:
         json.dump(model.serialize, f, indent=3)
+
+
+def compile_model(args: argparse.Namespace) -> None:
+    model = parse(
+        args.files,
+        workers=args.workers,
+        cache_directory=args.cache_directory,
+        cache_url=args.cache_url,
+    )
+    try:
+        model.dump(args.output)
+    except OSError as e:
+        fail(f'unable to write model snapshot "{args.output}": {e.strerror}', Subsystem.CLI)
@@ -18,7 +18,11 @@ class Base(ABC):
         return NotImplemented
 
     def __repr__(self) -> str:
-        args = "\n" + ",\n".join(f"{k}={v!r}" for k, v in self.__dict__.items() if k != "location")
+        args = "\n" + ",\n".join(
+            f"{k}={v!r}"
+            for k, v in self.__dict__.items()
+            if k not in ("location", "_simplified", "_generation")
+        )
         return indent_next(f"\n{self.__class__.__name__}({indent(args, 4)})", 4)
 
     @property
@@ -35,7 +39,16 @@ class Base(ABC):
             "data": {
                 k: value(v)
                 for k, v in self.__dict__.items()
-                if k not in ("location", "error", "type_", "_str", "immutable")
+                if k
+                not in (
+                    "location",
+                    "error",
+                    "type_",
+                    "_str",
+                    "_simplified",
+                    "_generation",
+                    "immutable",
+                )
             },
         }
 
@@ -1,7 +1,7 @@
 from collections import deque
 from enum import Enum, auto
 from pathlib import Path
-from typing import Deque, List, Optional, Tuple, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
 
 from rflx.common import Base, verbose_repr
 
@@ -100,6 +100,10 @@ class RecordFluxError(Exception, Base):
     def __repr__(self) -> str:
         return verbose_repr(self, ["errors"])
 
+    def __reduce__(self) -> Tuple[Callable[[type], "RecordFluxError"], Tuple[type], Dict[str, Any]]:
+        # the constructors of subclasses may have required arguments
+        return (self.__class__.__new__, (self.__class__,), self.__dict__)
+
     def __str__(self) -> str:
         def locn(entry: RecordFluxError.Entry) -> str:
             if entry.location:
@@ -1,12 +1,29 @@
 # pylint: disable=too-many-lines,too-many-ancestors,too-many-arguments
 import difflib
+import hashlib
 import itertools
 import operator
-from abc import abstractmethod
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
 from enum import Enum
-from functools import lru_cache
+from functools import wraps
 from sys import intern
-from typing import Callable, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from weakref import WeakValueDictionary
 
 import z3
 
@@ -40,17 +57,39 @@ class ProofResult(Enum):
 
 
 class Proof:
-    def __init__(self, expr: "Expr", facts: Optional[Sequence["Expr"]] = None):
+    def __init__(
+        self,
+        expr: "Expr",
+        facts: Optional[Sequence["Expr"]] = None,
+        solver: z3.Solver = None,
+        result: ProofResult = None,
+    ):
         self.__expr = expr
         self.__facts = facts or []
         self.__result = ProofResult.UNSAT
+        self.__error: Optional[List[Tuple[str, Optional[Location]]]] = None
 
-        solver = z3.Solver()
+        if result is not None:
+            # the result is already known, e.g., from a cache
+            self.__result = result
+            return
+
+        if solver is None:
+            self.__result = self.__check(z3.Solver())
+            return
+
+        # a shared solver is reused to avoid the costs of creating a new solver for each proof
+        solver.push()
+        try:
+            self.__result = self.__check(solver)
+        finally:
+            solver.pop()
+
+    def __check(self, solver: z3.Solver) -> ProofResult:
         solver.add(self.__expr.z3expr())
         for f in self.__facts:
             solver.add(f.z3expr())
-
-        self.__result = ProofResult(solver.check())
+        return ProofResult(solver.check())
 
     @property
     def result(self) -> ProofResult:
@@ -59,6 +98,8 @@ class Proof:
     @property
     def error(self) -> List[Tuple[str, Optional[Location]]]:
         assert self.__result == ProofResult.UNSAT
+        if self.__error is not None:
+            return self.__error
         solver = z3.Solver()
         solver.set(unsat_core=True)
         facts = {f"H{index}": fact for index, fact in enumerate(self.__facts)}
@@ -69,10 +110,412 @@ class Proof:
         facts["goal"] = self.__expr
         result = solver.check()
         assert result == z3.unsat, f"result should be unsat (is {result})"
-        return [
+        self.__error = [
             (" ".join(str(facts[str(fact)]).replace("\n", " ").split()), facts[fact].location)
             for fact in sorted([str(h) for h in solver.unsat_core()])
         ]
+        return self.__error
+
+
+def proof_key(expr: "Expr", facts: Optional[Sequence["Expr"]] = None) -> str:
+    """Return a structural hash of a proof obligation.
+
+    The hash is independent of the order of the facts and of the locations of all expressions.
+    """
+    obligation = "\0".join([str(expr), *sorted(str(f) for f in facts or [])])
+    return hashlib.sha256(obligation.encode("utf-8")).hexdigest()
+
+
+class ProofCache(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[ProofResult]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, key: str, result: ProofResult) -> None:
+        raise NotImplementedError
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, ProofResult]:
+        """Return the known results of the given keys.
+
+        Caches with an expensive lookup should override this method to look up all keys at once.
+        """
+        results = {}
+        for key in keys:
+            result = self.get(key)
+            if result is not None:
+                results[key] = result
+        return results
+
+
+class ScheduledProof:
+    def __init__(self, prove: Callable[[], Proof]) -> None:
+        self.__prove = prove
+        self.__proof: Optional[Proof] = None
+
+    @property
+    def proof(self) -> Proof:
+        if self.__proof is None:
+            self.__proof = self.__prove()
+        return self.__proof
+
+    @property
+    def result(self) -> ProofResult:
+        return self.proof.result
+
+    @property
+    def error(self) -> List[Tuple[str, Optional[Location]]]:
+        return self.proof.error
+
+
+class PrefixedProof(ScheduledProof):
+    """A scheduled proof whose facts start with a prefix shared by other proofs.
+
+    The result is determined by the proof manager together with all other proofs sharing a part of
+    the prefix. The error is determined by an independent proof of all facts.
+    """
+
+    def __init__(
+        self,
+        expr: "Expr",
+        facts: Sequence["Expr"],
+        remaining_facts: Sequence["Expr"],
+        solve: Callable[[], None],
+    ) -> None:
+        super().__init__(lambda: Proof(expr, facts))
+        self.expr = expr
+        self.facts = facts
+        self.remaining_facts = remaining_facts
+        self.prefix_result: Optional[ProofResult] = None
+        self.__solve = solve
+
+    @property
+    def result(self) -> ProofResult:
+        if self.prefix_result is None:
+            self.__solve()
+        assert self.prefix_result is not None
+        return self.prefix_result
+
+
+class PrefixNode:
+    def __init__(self) -> None:
+        self.children: Dict[Tuple["Expr", ...], "PrefixNode"] = {}
+        self.proofs: List[PrefixedProof] = []
+
+    def refute(self) -> List[PrefixedProof]:
+        """Set the result of all open proofs of this node and its successors to UNSAT."""
+        result = [p for p in self.proofs if p.prefix_result is None]
+        for proof in result:
+            proof.prefix_result = ProofResult.UNSAT
+        for child in self.children.values():
+            result.extend(child.refute())
+        return result
+
+    def all_proofs(self) -> List[PrefixedProof]:
+        result = list(self.proofs)
+        for child in self.children.values():
+            result.extend(child.all_proofs())
+        return result
+
+    def open(self) -> bool:
+        return any(p.prefix_result is None for p in self.proofs) or any(
+            c.open() for c in self.children.values()
+        )
+
+
+class ProofBatch:
+    def __init__(self) -> None:
+        self.obligations: List[Tuple["Expr", Optional[Sequence["Expr"]]]] = []
+        self.future: Optional[Future] = None
+
+
+def prove_batch(obligations: Sequence[Tuple["Expr", Optional[Sequence["Expr"]]]]) -> List[Proof]:
+    solver = z3.Solver()
+    return [Proof(expr, facts, solver) for expr, facts in obligations]
+
+
+class ProofManager:
+    """Schedule proofs to be done in the current process or by a pool of worker processes.
+
+    With a single worker, a scheduled proof is done by a shared solver when its result is first
+    accessed. Proofs with a common prefix of facts are done together by a single incremental
+    solver. With multiple workers, scheduled proofs are collected into batches, which are
+    dispatched to the pool when they are full, when `flush` is called or when the result of one of
+    their proofs is accessed. The proofs of a batch are done by a shared solver in one worker, so
+    that only one task has to be transferred per batch. Results found in the cache are used instead
+    of doing the proof, new results are added to the cache.
+    """
+
+    BATCH_SIZE = 16
+
+    def __init__(self, workers: int = 1, cache: ProofCache = None) -> None:
+        if workers < 1:
+            raise ValueError(f"invalid number of workers: {workers}")
+        self.__workers = workers
+        self.__cache = cache
+        self.__solver = z3.Solver()
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__futures: List[Future] = []
+        self.__batch = ProofBatch()
+        self.__prefixes = PrefixNode()
+
+    def __enter__(self) -> "ProofManager":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        if self.__executor is not None:
+            for f in self.__futures:
+                f.cancel()
+            self.__executor.shutdown()
+
+    def check(self, expr: "Expr", facts: Optional[Sequence["Expr"]] = None) -> Proof:
+        """Do the proof in the current process immediately."""
+        if self.__cache is None:
+            return Proof(expr, facts, self.__solver)
+        key = proof_key(expr, facts)
+        result = self.__cache.get(key)
+        if result is not None:
+            return Proof(expr, facts, result=result)
+        return self.__cached(key, Proof(expr, facts, self.__solver))
+
+    def submit(
+        self,
+        expr: "Expr",
+        facts: Optional[Sequence["Expr"]] = None,
+        prefix: Sequence[Sequence["Expr"]] = (),
+    ) -> ScheduledProof:
+        """Schedule a proof.
+
+        The prefix is a sequence of groups of facts which are shared by multiple proofs, e.g., the
+        facts of each link of a path through a message. All facts of the prefix must also be
+        contained in the facts of the proof.
+        """
+        if self.__workers == 1:
+            if prefix:
+                return self.__submit_prefixed(expr, facts or [], prefix)
+            return ScheduledProof(lambda: self.check(expr, facts))
+        if self.__cache is None:
+            key = None
+        else:
+            key = proof_key(expr, facts)
+            result = self.__cache.get(key)
+            if result is not None:
+                return ScheduledProof(lambda: Proof(expr, facts, result=result))
+        batch = self.__batch
+        index = len(batch.obligations)
+        batch.obligations.append((expr, facts))
+        if len(batch.obligations) >= self.BATCH_SIZE:
+            self.flush()
+        return ScheduledProof(lambda: self.__cached(key, self.__batch_result(batch, index)))
+
+    def flush(self) -> None:
+        """Dispatch all scheduled proofs which have not been dispatched yet."""
+        batch = self.__batch
+        if not batch.obligations:
+            return
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.__workers)
+        batch.future = self.__executor.submit(prove_batch, batch.obligations)
+        self.__futures.append(batch.future)
+        self.__batch = ProofBatch()
+
+    def __batch_result(self, batch: ProofBatch, index: int) -> Proof:
+        if batch.future is None:
+            self.flush()
+        assert batch.future is not None
+        return batch.future.result()[index]
+
+    def __cached(self, key: Optional[str], proof: Proof) -> Proof:
+        self.__add_to_cache(key, proof.result)
+        return proof
+
+    def __add_to_cache(self, key: Optional[str], result: ProofResult) -> None:
+        if self.__cache is not None and key is not None and result != ProofResult.UNKNOWN:
+            self.__cache.add(key, result)
+
+    def __submit_prefixed(
+        self, expr: "Expr", facts: Sequence["Expr"], prefix: Sequence[Sequence["Expr"]]
+    ) -> PrefixedProof:
+        node = self.__prefixes
+        for group in prefix:
+            node = node.children.setdefault(tuple(group), PrefixNode())
+        prefix_facts = {f for group in prefix for f in group}
+        proof = PrefixedProof(
+            expr, facts, [f for f in facts if f not in prefix_facts], self.__solve_prefixed
+        )
+        node.proofs.append(proof)
+        return proof
+
+    def __solve_prefixed(self) -> None:
+        """Do all scheduled proofs with a prefix by a depth-first traversal of the prefix tree.
+
+        The facts of each prefix are added to the solver only once, and all proofs sharing the
+        prefix are done in the context of these facts. If the facts of a prefix are contradictory,
+        all proofs of the prefix and its extensions are unsatisfiable and need not be done.
+        """
+        root, self.__prefixes = self.__prefixes, PrefixNode()
+        keys: Dict[int, str] = {}
+        if self.__cache is not None:
+            proofs = root.all_proofs()
+            keys = {id(p): proof_key(p.expr, p.facts) for p in proofs}
+            results = self.__cache.get_many(list(keys.values()))
+            for p in proofs:
+                p.prefix_result = results.get(keys[id(p)])
+        self.__solve_prefix(root, keys)
+
+    def __solve_prefix(self, node: PrefixNode, keys: Dict[int, str]) -> None:
+        for group, child in node.children.items():
+            if not child.open():
+                continue
+            self.__solver.push()
+            try:
+                for f in group:
+                    self.__solver.add(f.z3expr())
+                if ProofResult(self.__solver.check()) == ProofResult.UNSAT:
+                    for proof in child.refute():
+                        self.__add_to_cache(keys.get(id(proof)), ProofResult.UNSAT)
+                    continue
+                for proof in child.proofs:
+                    if proof.prefix_result is not None:
+                        continue
+                    self.__solver.push()
+                    try:
+                        self.__solver.add(proof.expr.z3expr())
+                        for f in proof.remaining_facts:
+                            self.__solver.add(f.z3expr())
+                        proof.prefix_result = ProofResult(self.__solver.check())
+                    finally:
+                        self.__solver.pop()
+                    self.__add_to_cache(keys.get(id(proof)), proof.prefix_result)
+                self.__solve_prefix(child, keys)
+            finally:
+                self.__solver.pop()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+
+
+_SIMPLIFIED_CACHE_INFO: Dict[str, int] = {"hits": 0, "misses": 0}
+_SUBSTITUTED_CACHE_INFO: Dict[str, int] = {"hits": 0, "misses": 0}
+_SUBSTITUTED_CACHE_SIZE = 4096
+# the entries consist of the expression, the items of the mapping and the result
+_SUBSTITUTED_CACHE: "OrderedDict[Tuple[int, int, Tuple[int, ...]], Tuple[Expr, object, Expr]]" = (
+    OrderedDict()
+)
+_Z3EXPR_CACHE_INFO: Dict[str, int] = {"hits": 0, "misses": 0}
+_Z3EXPR_CACHE_SIZE = 16384
+_Z3EXPR_CACHE: "OrderedDict[Expr, z3.ExprRef]" = OrderedDict()
+
+
+E = TypeVar("E", bound="Expr")
+
+
+def memoized_simplification(method: Callable[[E], "Expr"]) -> Callable[[E], "Expr"]:
+    """Store the simplified expression in the expression node.
+
+    The stored expression must be discarded when an attribute of the node is changed (cf.
+    `Expr.invalidate_memoized`).
+    """
+
+    @wraps(method)
+    def simplified(self: E) -> "Expr":
+        try:
+            result = self.__dict__["_simplified"]
+            _SIMPLIFIED_CACHE_INFO["hits"] += 1
+            return self if result is None else result
+        except KeyError:
+            _SIMPLIFIED_CACHE_INFO["misses"] += 1
+        result = method(self)
+        # an expression which is already simplified is not referenced by itself, so that copies of
+        # the expression are not simplified to the original expression
+        self.__dict__["_simplified"] = None if result is self else result
+        return result
+
+    return simplified
+
+
+def memoized_substitution(method: Callable[..., "Expr"]) -> Callable[..., "Expr"]:
+    """Store the results of substitutions by a mapping in a bounded LRU cache.
+
+    The cache is keyed by the identities of the expression and of the keys and values of the
+    mapping, as equal expressions can differ in their types and locations. The generation of the
+    expression is part of the key, so that results are not reused after an attribute of the
+    expression was changed. Substitutions by a function are not cached.
+    """
+
+    @wraps(method)
+    def substituted(
+        self: "Expr",
+        func: Callable[["Expr"], "Expr"] = None,
+        mapping: Mapping["Name", "Expr"] = None,
+    ) -> "Expr":
+        if func is not None or mapping is None:
+            return method(self, func, mapping)
+        items = tuple(mapping.items())
+        generation = self.__dict__.setdefault("_generation", 0)
+        key = (id(self), generation, tuple(id(e) for item in items for e in item))
+        entry = _SUBSTITUTED_CACHE.get(key)
+        # the entry references the expression and the items, so that their identities cannot be
+        # reused by other objects as long as the entry exists
+        if entry is not None and entry[0] is self:
+            _SUBSTITUTED_CACHE_INFO["hits"] += 1
+            _SUBSTITUTED_CACHE.move_to_end(key)
+            return entry[2]
+        _SUBSTITUTED_CACHE_INFO["misses"] += 1
+        result = method(self, func, mapping)
+        _SUBSTITUTED_CACHE[key] = (self, items, result)
+        if len(_SUBSTITUTED_CACHE) > _SUBSTITUTED_CACHE_SIZE:
+            _SUBSTITUTED_CACHE.popitem(last=False)
+        return result
+
+    return substituted
+
+
+def memoized_z3expr(method: Callable[[E], z3.ExprRef]) -> Callable[[E], z3.ExprRef]:
+    """Store the translations of expressions into Z3 expressions in a bounded LRU cache.
+
+    The cache is keyed by the structure of the expression, so that equal expressions share the
+    same Z3 expression.
+    """
+
+    @wraps(method)
+    def z3expr(self: E) -> z3.ExprRef:
+        result = _Z3EXPR_CACHE.get(self)
+        if result is not None:
+            _Z3EXPR_CACHE_INFO["hits"] += 1
+            _Z3EXPR_CACHE.move_to_end(self)
+            return result
+        _Z3EXPR_CACHE_INFO["misses"] += 1
+        result = method(self)
+        _Z3EXPR_CACHE[self] = result
+        if len(_Z3EXPR_CACHE) > _Z3EXPR_CACHE_SIZE:
+            _Z3EXPR_CACHE.popitem(last=False)
+        return result
+
+    return z3expr
+
+
+def simplified_cache_info() -> CacheInfo:
+    return CacheInfo(**_SIMPLIFIED_CACHE_INFO)
+
+
+def substituted_cache_info() -> CacheInfo:
+    return CacheInfo(**_SUBSTITUTED_CACHE_INFO)
+
+
+def z3expr_cache_info() -> CacheInfo:
+    return CacheInfo(**_Z3EXPR_CACHE_INFO)
+
+
+def clear_caches() -> None:
+    """Clear the substitution and Z3 caches and reset the statistics of all caches."""
+    _SUBSTITUTED_CACHE.clear()
+    _Z3EXPR_CACHE.clear()
+    _SIMPLIFIED_CACHE_INFO.update(hits=0, misses=0)
+    _SUBSTITUTED_CACHE_INFO.update(hits=0, misses=0)
+    _Z3EXPR_CACHE_INFO.update(hits=0, misses=0)
 
 
 class Expr(DBC, Base):
@@ -86,7 +529,21 @@ class Expr(DBC, Base):
         self.type_ = type_
         self.location = location
 
+    def invalidate_memoized(self) -> None:
+        """Discard the memoized results of the expression.
+
+        The memoized results are derived from the attributes of the expression. This method must be
+        called after an attribute of an existing expression or of a copy of an expression has been
+        changed.
+        """
+        attributes = self.__dict__
+        attributes.pop("_simplified", None)
+        if "_generation" in attributes:
+            attributes["_generation"] += 1
+
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if isinstance(other, self.__class__):
             return str(self) == str(other)
         return NotImplemented
@@ -99,7 +556,8 @@ class Expr(DBC, Base):
             return self._str
 
     def __hash__(self) -> int:
-        return hash(self.__class__.__name__)
+        # the hash of the string representation is cached by the string object
+        return hash(str(self))
 
     def __lt__(self, other: object) -> bool:
         if isinstance(other, Expr):
@@ -139,15 +597,17 @@ class Expr(DBC, Base):
 
     def check_type(self, expected: Union[rty.Type, Tuple[rty.Type, ...]]) -> RecordFluxError:
         """Initialize and check the types of the expression and all sub-expressions."""
-        return self._check_type_subexpr() + rty.check_type(
-            self.type_, expected, self.location, _entity_name(self)
-        )
+        error = self._check_type_subexpr()
+        self.invalidate_memoized()
+        return error + rty.check_type(self.type_, expected, self.location, _entity_name(self))
 
     def check_type_instance(
         self, expected: Union[Type[rty.Type], Tuple[Type[rty.Type], ...]]
     ) -> RecordFluxError:
         """Initialize and check the types of the expression and all sub-expressions."""
-        return self._check_type_subexpr() + rty.check_type_instance(
+        error = self._check_type_subexpr()
+        self.invalidate_memoized()
+        return error + rty.check_type_instance(
             self.type_, expected, self.location, _entity_name(self)
         )
 
@@ -164,6 +624,7 @@ class Expr(DBC, Base):
         return [self] if match(self) else []
 
     @require(lambda func, mapping: (func and mapping is None) or (not func and mapping is not None))
+    @memoized_substitution
     def substituted(
         self, func: Callable[["Expr"], "Expr"] = None, mapping: Mapping["Name", "Expr"] = None
     ) -> "Expr":
@@ -187,8 +648,8 @@ class Expr(DBC, Base):
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
-    def check(self, facts: Optional[Sequence["Expr"]] = None) -> Proof:
-        return Proof(self, facts)
+    def check(self, facts: Optional[Sequence["Expr"]] = None, solver: z3.Solver = None) -> Proof:
+        return Proof(self, facts, solver)
 
 
 class BooleanLiteral(Expr):
@@ -209,6 +670,7 @@ class BooleanLiteral(Expr):
     def precedence(self) -> Precedence:
         return Precedence.LITERAL
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self
 
@@ -226,7 +688,7 @@ class BooleanTrue(BooleanLiteral):
     def ada_expr(self) -> ada.Expr:
         return ada.TRUE
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         return z3.BoolVal(True)
 
@@ -247,7 +709,7 @@ class BooleanFalse(BooleanLiteral):
     def ada_expr(self) -> ada.Expr:
         return ada.FALSE
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         return z3.BoolVal(False)
 
@@ -276,6 +738,7 @@ class Not(Expr):
     def precedence(self) -> Precedence:
         return Precedence.HIGHEST_PRECEDENCE_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         for relation, inverse_relation in [
             (Less, GreaterEqual),
@@ -292,7 +755,7 @@ class Not(Expr):
     def ada_expr(self) -> ada.Expr:
         return ada.Not(self.expr.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         z3expr = self.expr.z3expr()
         if not isinstance(z3expr, z3.BoolRef):
@@ -341,6 +804,7 @@ class BinExpr(Expr):
             *self.right.findall(match),
         ]
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping["Name", Expr] = None
     ) -> Expr:
@@ -354,6 +818,7 @@ class BinExpr(Expr):
             )
         return expr
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self.__class__(self.left.simplified(), self.right.simplified())
 
@@ -435,6 +900,7 @@ class AssExpr(Expr):
             *[m for t in self.terms for m in t.findall(match)],
         ]
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping["Name", Expr] = None
     ) -> Expr:
@@ -446,6 +912,7 @@ class AssExpr(Expr):
             )
         return expr
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         terms: List[Expr] = []
         all_terms = list(self.terms)
@@ -540,6 +1007,7 @@ class And(BoolAssExpr):
     def precedence(self) -> Precedence:
         return Precedence.BOOLEAN_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         simplified_expr = super().simplified()
         if isinstance(simplified_expr, And) and FALSE in simplified_expr.terms:
@@ -559,7 +1027,7 @@ class And(BoolAssExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.And(*[t.ada_expr() for t in self.terms])
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         z3exprs = [t.z3expr() for t in self.terms]
         boolexprs = [t for t in z3exprs if isinstance(t, z3.BoolRef)]
@@ -585,6 +1053,7 @@ class Or(BoolAssExpr):
     def precedence(self) -> Precedence:
         return Precedence.BOOLEAN_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         simplified_expr = super().simplified()
         if isinstance(simplified_expr, Or) and TRUE in simplified_expr.terms:
@@ -604,7 +1073,7 @@ class Or(BoolAssExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Or(*[t.ada_expr() for t in self.terms])
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         z3exprs = [t.z3expr() for t in self.terms]
         boolexprs = [t for t in z3exprs if isinstance(t, z3.BoolRef)]
@@ -689,6 +1158,8 @@ class Number(Expr):
         return NotImplemented
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if isinstance(other, Number):
             return self.value == other.value
         if isinstance(other, Expr):
@@ -727,13 +1198,14 @@ class Number(Expr):
     def precedence(self) -> Precedence:
         return Precedence.LITERAL
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self
 
     def ada_expr(self) -> ada.Expr:
         return ada.Number(self.value, self.base)
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         return z3.IntVal(self.value)
 
@@ -774,6 +1246,7 @@ class Add(MathAssExpr):
     def operation(self, left: int, right: int) -> int:
         return left + right
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         expr = super().simplified()
         if not isinstance(expr, Add):
@@ -802,7 +1275,7 @@ class Add(MathAssExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Add(*[t.ada_expr() for t in self.terms])
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         terms = [t for t in map(lambda e: e.z3expr(), self.terms) if isinstance(t, z3.ArithRef)]
         if len(terms) != len(self.terms):
@@ -831,7 +1304,7 @@ class Mul(MathAssExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Mul(*[t.ada_expr() for t in self.terms])
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         terms = [t for t in map(lambda e: e.z3expr(), self.terms) if isinstance(t, z3.ArithRef)]
         if len(terms) != len(self.terms):
@@ -858,6 +1331,7 @@ class Sub(MathBinExpr):
     def precedence(self) -> Precedence:
         return Precedence.BINARY_ADDING_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -872,7 +1346,7 @@ class Sub(MathBinExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Sub(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -886,6 +1360,7 @@ class Div(MathBinExpr):
     def precedence(self) -> Precedence:
         return Precedence.MULTIPLYING_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -900,7 +1375,7 @@ class Div(MathBinExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Div(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -914,6 +1389,7 @@ class Pow(MathBinExpr):
     def precedence(self) -> Precedence:
         return Precedence.HIGHEST_PRECEDENCE_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -928,7 +1404,7 @@ class Pow(MathBinExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Pow(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -942,6 +1418,7 @@ class Mod(MathBinExpr):
     def precedence(self) -> Precedence:
         return Precedence.MULTIPLYING_OPERATOR
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         left = self.left.simplified()
         right = self.right.simplified()
@@ -956,7 +1433,7 @@ class Mod(MathBinExpr):
     def ada_expr(self) -> ada.Expr:
         return ada.Mod(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -990,6 +1467,7 @@ class Name(Expr):
     def representation(self) -> str:
         raise NotImplementedError
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping["Name", Expr] = None
     ) -> Expr:
@@ -998,6 +1476,7 @@ class Name(Expr):
         func = substitution(mapping or {}, func)
         return -func(-self) if self.negative else func(self)
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self
 
@@ -1022,6 +1501,8 @@ class Variable(Name):
         super().__init__(negative, immutable, type_, location)
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if isinstance(other, self.__class__):
             return self.negative == other.negative and self.identifier == other.identifier
         return NotImplemented
@@ -1051,7 +1532,7 @@ class Variable(Name):
     def ada_expr(self) -> ada.Expr:
         return ada.Variable(ada.ID(self.identifier), self.negative)
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ArithRef:
         if self.negative:
             return -z3.Int(self.name)
@@ -1078,6 +1559,7 @@ class Attribute(Name):
     def findall(self, match: Callable[["Expr"], bool]) -> Sequence["Expr"]:
         return [self] if match(self) else self.prefix.findall(match)
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -1087,6 +1569,7 @@ class Attribute(Name):
             expr = expr.__class__(expr.prefix.substituted(func))
         return -expr if self.negative else expr
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         expr = self.__class__(self.prefix.simplified())
         return -expr if self.negative else expr
@@ -1203,11 +1686,13 @@ class Val(Attribute):
     def findall(self, match: Callable[[Expr], bool]) -> Sequence[Expr]:
         raise NotImplementedError
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
         return self
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self
 
@@ -1220,7 +1705,7 @@ class Val(Attribute):
             self.prefix.ada_expr(), self.expression.ada_expr(), self.negative
         )
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -1249,7 +1734,7 @@ class Indexed(Name):
             self.prefix.ada_expr(), *[e.ada_expr() for e in self.elements], negative=self.negative
         )
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -1299,6 +1784,7 @@ class Selected(Name):
     def variables(self) -> List["Variable"]:
         return self.prefix.variables()
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -1315,7 +1801,7 @@ class Selected(Name):
     def ada_expr(self) -> ada.Expr:
         return ada.Selected(self.prefix.ada_expr(), ada.ID(self.selector), self.negative)
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -1377,7 +1863,7 @@ class Call(Name):
     def ada_expr(self) -> ada.Expr:
         return ada.Call(ada.ID(self.identifier), [a.ada_expr() for a in self.args], self.negative)
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -1387,6 +1873,7 @@ class Call(Name):
             result.extend(t.variables())
         return result
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -1418,7 +1905,7 @@ class UndefinedExpr(Name):
     def ada_expr(self) -> ada.Expr:
         raise NotImplementedError
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -1447,6 +1934,7 @@ class Aggregate(Expr):
     def precedence(self) -> Precedence:
         return Precedence.LITERAL
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -1458,6 +1946,7 @@ class Aggregate(Expr):
             )
         return expr
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self.__class__(*[e.simplified() for e in self.elements])
 
@@ -1468,7 +1957,7 @@ class Aggregate(Expr):
     def ada_expr(self) -> ada.Expr:
         return ada.Aggregate(*[e.ada_expr() for e in self.elements])
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         return z3.BoolVal(False)
 
@@ -1488,19 +1977,21 @@ class String(Aggregate):
     def precedence(self) -> Precedence:
         return Precedence.LITERAL
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
         func = substitution(mapping or {}, func)
         return func(self)
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self
 
     def ada_expr(self) -> ada.Expr:
         return ada.String(self.data)
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         return z3.BoolVal(False)
 
@@ -1541,13 +2032,14 @@ class Less(Relation):
     def symbol(self) -> str:
         return " < "
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self._simplified(operator.lt)
 
     def ada_expr(self) -> ada.Expr:
         return ada.Less(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -1570,13 +2062,14 @@ class LessEqual(Relation):
     def symbol(self) -> str:
         return " <= "
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self._simplified(operator.le)
 
     def ada_expr(self) -> ada.Expr:
         return ada.LessEqual(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -1596,13 +2089,14 @@ class Equal(Relation):
     def symbol(self) -> str:
         return " = "
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self._simplified(operator.eq)
 
     def ada_expr(self) -> ada.Expr:
         return ada.Equal(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -1625,13 +2119,14 @@ class GreaterEqual(Relation):
     def symbol(self) -> str:
         return " >= "
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self._simplified(operator.ge)
 
     def ada_expr(self) -> ada.Expr:
         return ada.GreaterEqual(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -1654,13 +2149,14 @@ class Greater(Relation):
     def symbol(self) -> str:
         return " > "
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self._simplified(operator.gt)
 
     def ada_expr(self) -> ada.Expr:
         return ada.Greater(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -1680,13 +2176,14 @@ class NotEqual(Relation):
     def symbol(self) -> str:
         return " /= "
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self._simplified(operator.ne)
 
     def ada_expr(self) -> ada.Expr:
         return ada.NotEqual(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         left = self.left.z3expr()
         right = self.right.z3expr()
@@ -1711,7 +2208,7 @@ class In(Relation):
     def ada_expr(self) -> ada.Expr:
         return ada.In(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         raise NotImplementedError
 
@@ -1732,7 +2229,7 @@ class NotIn(Relation):
     def ada_expr(self) -> ada.Expr:
         return ada.NotIn(self.left.ada_expr(), self.right.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.BoolRef:
         raise NotImplementedError
 
@@ -1799,10 +2296,11 @@ class QuantifiedExpression(Expr):
             self.parameter_identifier, self.iterable.ada_expr(), self.predicate.ada_expr()
         )
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -1816,6 +2314,7 @@ class QuantifiedExpression(Expr):
             location=expr.location,
         )
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self.__class__(
             self.parameter_identifier, self.iterable.simplified(), self.predicate.simplified()
@@ -1883,6 +2382,7 @@ class ValueRange(Expr):
     def precedence(self) -> Precedence:
         raise NotImplementedError
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[["Expr"], "Expr"] = None, mapping: Mapping["Name", "Expr"] = None
     ) -> "Expr":
@@ -1895,13 +2395,14 @@ class ValueRange(Expr):
             )
         return expr
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return self.__class__(self.lower.simplified(), self.upper.simplified())
 
     def ada_expr(self) -> ada.Expr:
         return ada.ValueRange(self.lower.ada_expr(), self.upper.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -1961,6 +2462,7 @@ class Conversion(Expr):
     def precedence(self) -> Precedence:
         return Precedence.LITERAL
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -1976,6 +2478,7 @@ class Conversion(Expr):
             )
         return expr
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return Conversion(
             self.identifier,
@@ -1988,7 +2491,7 @@ class Conversion(Expr):
     def ada_expr(self) -> ada.Expr:
         return ada.Conversion(ada.ID(self.identifier), self.argument.ada_expr())
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -2040,6 +2543,7 @@ class Comprehension(Expr):
     def __neg__(self) -> Expr:
         raise NotImplementedError
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return Comprehension(
             self.iterator,
@@ -2049,6 +2553,7 @@ class Comprehension(Expr):
             self.location,
         )
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -2071,7 +2576,7 @@ class Comprehension(Expr):
     def ada_expr(self) -> ada.Expr:
         raise NotImplementedError
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -2170,6 +2675,7 @@ class MessageAggregate(Expr):
     def __neg__(self) -> Expr:
         raise NotImplementedError
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         return MessageAggregate(
             self.identifier,
@@ -2178,6 +2684,7 @@ class MessageAggregate(Expr):
             self.location,
         )
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -2199,7 +2706,7 @@ class MessageAggregate(Expr):
     def ada_expr(self) -> ada.Expr:
         raise NotImplementedError
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -2249,10 +2756,12 @@ class Binding(Expr):
     def __neg__(self) -> Expr:
         raise NotImplementedError
 
+    @memoized_simplification
     def simplified(self) -> Expr:
         facts: Mapping[Name, Expr] = {Variable(k): self.data[k].simplified() for k in self.data}
         return self.expr.substituted(mapping=facts).simplified()
 
+    @memoized_substitution
     def substituted(
         self, func: Callable[[Expr], Expr] = None, mapping: Mapping[Name, Expr] = None
     ) -> Expr:
@@ -2273,7 +2782,7 @@ class Binding(Expr):
     def ada_expr(self) -> ada.Expr:
         raise NotImplementedError
 
-    @lru_cache(maxsize=None)
+    @memoized_z3expr
     def z3expr(self) -> z3.ExprRef:
         raise NotImplementedError
 
@@ -2281,6 +2790,24 @@ class Binding(Expr):
         return self.simplified().variables()
 
 
+_SHARED: "WeakValueDictionary[Tuple[type, str], Expr]" = WeakValueDictionary()
+
+
+def shared(expr: Expr) -> Expr:
+    """Return the shared instance of all expressions of the same kind with the same representation.
+
+    The first expression passed to this function is used as shared instance as long as it is
+    referenced. If expressions are built from shared sub-expressions, equal expressions are
+    identical, so that equality checks are reduced to identity checks. Shared expressions must
+    not be modified.
+    """
+    key = (expr.__class__, str(expr))
+    result = _SHARED.get(key)
+    if result is None:
+        _SHARED[key] = result = expr
+    return result
+
+
 def substitution(
     mapping: Mapping[Name, Expr], func: Callable[["Expr"], "Expr"] = None
 ) -> Callable[[Expr], Expr]:
@@ -5,7 +5,20 @@ from abc import abstractmethod
 from collections import defaultdict
 from copy import copy
 from dataclasses import dataclass, field as dataclass_field
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import rflx.typing_ as rty
 from rflx import expression as expr
@@ -90,10 +103,20 @@ def valid_message_field_types(message: "AbstractMessage") -> bool:
     return True
 
 
+MESSAGE_CONSTRAINTS = (
+    expr.Equal(expr.Mod(expr.First("Message"), expr.Number(8)), expr.Number(1)),
+    expr.Equal(expr.Mod(expr.Size("Message"), expr.Number(8)), expr.Number(0)),
+)
+
+
 class MessageState(Base):
     fields: Optional[Tuple[Field, ...]] = ()
+    field_positions: Optional[Mapping[Field, int]] = None
     definite_predecessors: Optional[Mapping[Field, Tuple[Field, ...]]] = None
     field_condition: Optional[Mapping[Field, expr.Expr]] = None
+    static_prefix: Optional[Tuple[Tuple[Field, int, int], ...]] = None
+    type_constraints: Optional[Tuple[expr.Expr, ...]] = None
+    composite_fields: Optional[FrozenSet[str]] = None
     checksums: Mapping[ID, Sequence[expr.Expr]] = {}
 
 
@@ -115,12 +138,11 @@ class AbstractMessage(mty.Type):
 
         super().__init__(identifier, location, error)
 
-        self.structure = sorted(structure)
+        self.structure = structure
         self.__types = types
         self.__aspects = aspects or {}
         self.__has_unreachable = False
         self._state = state or MessageState()
-        self.__paths_cache: Dict[Field, Set[Tuple[Link, ...]]] = {}
 
         assert len(self.identifier.parts) > 1, "type identifier must contain package"
 
@@ -176,6 +198,22 @@ class AbstractMessage(mty.Type):
                 fields += ";"
         return f"type {self.name} is\n   message\n{indent(fields, 6)}\n   end message"
 
+    @property
+    def structure(self) -> List[Link]:
+        return self.__structure
+
+    @structure.setter
+    def structure(self, structure: Sequence[Link]) -> None:
+        self.__structure = sorted(structure)
+        incoming: Dict[Field, List[Link]] = {}
+        outgoing: Dict[Field, List[Link]] = {}
+        for l in self.__structure:
+            incoming.setdefault(l.target, []).append(l)
+            outgoing.setdefault(l.source, []).append(l)
+        # the links are stored as tuples, so that they can be returned without copying
+        self.__incoming: Dict[Field, Tuple[Link, ...]] = {f: tuple(l) for f, l in incoming.items()}
+        self.__outgoing: Dict[Field, Tuple[Link, ...]] = {f: tuple(l) for f, l in outgoing.items()}
+
     @property
     def serialize(self) -> Dict[str, Any]:
         return {
@@ -191,7 +229,7 @@ class AbstractMessage(mty.Type):
     def type_(self) -> rty.Message:
         return rty.Message(
             self.full_name,
-            {tuple(l.target.name for l in p if l.target != FINAL) for p in self.paths(FINAL)}
+            {tuple(l.target.name for l in p if l.target != FINAL) for p in self.iter_paths(FINAL)}
             if self.structure
             else set(),
             {f.name: t.type_ for f, t in self.types.items()},
@@ -220,7 +258,7 @@ class AbstractMessage(mty.Type):
         raise NotImplementedError
 
     @abstractmethod
-    def proven(self, skip_proof: bool = False) -> "Message":
+    def proven(self, skip_proof: bool = False, workers: int = 1) -> "Message":
         raise NotImplementedError
 
     @property
@@ -245,25 +283,25 @@ class AbstractMessage(mty.Type):
     def checksums(self) -> Mapping[ID, Sequence[expr.Expr]]:
         return self._state.checksums or {}
 
-    def incoming(self, field: Field) -> List[Link]:
-        return [l for l in self.structure if l.target == field]
+    def incoming(self, field: Field) -> Tuple[Link, ...]:
+        return self.__incoming.get(field, ())
 
-    def outgoing(self, field: Field) -> List[Link]:
-        return [l for l in self.structure if l.source == field]
+    def outgoing(self, field: Field) -> Tuple[Link, ...]:
+        return self.__outgoing.get(field, ())
 
     def predecessors(self, field: Field) -> Tuple[Field, ...]:
         if field == INITIAL:
             return ()
         if field == FINAL:
             return self.fields
-        return self.fields[: self.fields.index(field)]
+        return self.fields[: self.__field_position(field)]
 
     def successors(self, field: Field) -> Tuple[Field, ...]:
         if field == INITIAL:
             return self.fields
         if field == FINAL:
             return ()
-        return self.fields[self.fields.index(field) + 1 :]
+        return self.fields[self.__field_position(field) + 1 :]
 
     def direct_predecessors(self, field: Field) -> List[Field]:
         return list(dict.fromkeys([l.source for l in self.incoming(field)]))
@@ -279,6 +317,39 @@ class AbstractMessage(mty.Type):
             }
         return self._state.definite_predecessors[field]
 
+    def static_prefix(self) -> Tuple[Tuple[Field, int, int], ...]:
+        """Return leading fields with a first and size independent of any field value.
+
+        The fields are part of all possible paths. Each element contains the field, its first bit
+        and its size.
+        """
+        if self._state.static_prefix is None:
+            self._state.static_prefix = self.__compute_static_prefix()
+        return self._state.static_prefix
+
+    def static_scalar_prefix(self) -> Tuple[Tuple[Field, int, int], ...]:
+        """Return the leading fields of the static prefix which can be parsed in one step.
+
+        Only scalar fields followed by a single unconditional link are included, so that no
+        condition has to be checked in between. Each field starts either directly after its
+        predecessor or at the same position as its predecessor, i.e. at the position which would be
+        used by a sequential parsing.
+        """
+        result: List[Tuple[Field, int, int]] = []
+        previous_first = previous_end = 0
+        for field, first, size in self.static_prefix():
+            outgoing = self.outgoing(field)
+            if (
+                not isinstance(self.types[field], mty.Scalar)
+                or first not in (previous_first, previous_end)
+                or len(outgoing) != 1
+                or outgoing[0].condition != expr.TRUE
+            ):
+                break
+            result.append((field, first, size))
+            previous_first, previous_end = first, first + size
+        return tuple(result)
+
     def field_condition(self, field: Field) -> expr.Expr:
         if self._state.field_condition is None:
             self._state.field_condition = {
@@ -286,6 +357,19 @@ class AbstractMessage(mty.Type):
             }
         return self._state.field_condition[field]
 
+    def compute_state(self) -> None:
+        """Compute all properties of the message which are otherwise computed on first use.
+
+        The properties are kept in the state of the message, so that a stored message, e.g., in a
+        model snapshot, does not need to compute them again.
+        """
+        if not self.structure:
+            return
+        self.definite_predecessors(FINAL)
+        self.static_prefix()
+        self.field_condition(FINAL)
+        self._constant_type_constraints()
+
     def field_size(self, field: Field) -> expr.Expr:
         if field == FINAL:
             return expr.Number(0)
@@ -299,21 +383,42 @@ class AbstractMessage(mty.Type):
         return expr.UNDEFINED
 
     def paths(self, field: Field) -> Set[Tuple[Link, ...]]:
+        return set(self.iter_paths(field))
+
+    def iter_paths(self, field: Field) -> Iterator[Tuple[Link, ...]]:
+        """Yield the paths to a field one at a time.
+
+        The paths are enumerated by a depth-first traversal of the incoming links, starting at the
+        field. Only the links of the current path are kept during the traversal, so that the memory
+        needed does not depend on the number of paths, and a caller can stop the enumeration as
+        soon as it has found the path it is looking for. A path starts at the first field which has
+        no incoming links, which is usually INITIAL. Links which would lead back to a field of the
+        current path are skipped, so that a cyclic structure (which is reported as an error during
+        the verification) does not cause an endless traversal.
+        """
         if field == INITIAL:
-            return set()
-        if field in self.__paths_cache:
-            return self.__paths_cache[field]
-
-        result = set()
-        for l in self.incoming(field):
-            source = self.paths(l.source)
-            for s in source:
-                result.add(s + (l,))
-            if not source:
-                result.add((l,))
-
-        self.__paths_cache[field] = result
-        return result
+            return
+
+        path: List[Link] = []
+        visited: Set[Field] = {field}
+        pending = [iter(self.__incoming.get(field, ()))]
+
+        while pending:
+            link = next(pending[-1], None)
+            if link is None:
+                pending.pop()
+                if path:
+                    visited.remove(path.pop().source)
+                continue
+            if link.source in visited:
+                continue
+            path.append(link)
+            visited.add(link.source)
+            if self.__incoming.get(link.source):
+                pending.append(iter(self.__incoming[link.source]))
+            else:
+                yield tuple(reversed(path))
+                visited.remove(path.pop().source)
 
     def prefixed(self, prefix: str) -> "AbstractMessage":
         fields = {f.identifier for f in self.fields}
@@ -354,6 +459,12 @@ class AbstractMessage(mty.Type):
         return self.copy(structure=structure, types=types)
 
     def type_constraints(self, expression: expr.Expr) -> List[expr.Expr]:
+        """Return the constraints of all types in the message and of aggregates in the expression.
+
+        Only the constraints of aggregates compared with a field depend on the expression. All
+        other constraints are computed once.
+        """
+
         def get_constraints(aggregate: expr.Aggregate, field: expr.Variable) -> Sequence[expr.Expr]:
             comp = self.types[Field(field.name)]
             assert isinstance(comp, mty.Composite)
@@ -369,13 +480,10 @@ class AbstractMessage(mty.Type):
                 ]
             return [result]
 
-        scalar_types = [
-            (f.name, t)
-            for f, t in self.types.items()
-            if isinstance(t, mty.Scalar)
-            and ID(f.name) not in self._enum_literals
-            and f.name not in ["Message", "Final"]
-        ]
+        constraints = self._constant_type_constraints()
+
+        if not self._state.composite_fields:
+            return list(constraints)
 
         aggregate_constraints: List[expr.Expr] = []
         for r in expression.findall(lambda x: isinstance(x, (expr.Equal, expr.NotEqual))):
@@ -385,9 +493,28 @@ class AbstractMessage(mty.Type):
             if isinstance(r.left, expr.Variable) and isinstance(r.right, expr.Aggregate):
                 aggregate_constraints.extend(get_constraints(r.right, r.left))
 
-        message_constraints: List[expr.Expr] = [
-            expr.Equal(expr.Mod(expr.First("Message"), expr.Number(8)), expr.Number(1)),
-            expr.Equal(expr.Mod(expr.Size("Message"), expr.Number(8)), expr.Number(0)),
+        return [
+            *constraints[: len(MESSAGE_CONSTRAINTS)],
+            *aggregate_constraints,
+            *constraints[len(MESSAGE_CONSTRAINTS) :],
+        ]
+
+    def _constant_type_constraints(self) -> Tuple[expr.Expr, ...]:
+        """Return the type constraints which are independent of any expression."""
+        if self._state.type_constraints is None:
+            self._state.type_constraints = self.__compute_type_constraints()
+            self._state.composite_fields = frozenset(
+                f.name for f, t in self.types.items() if isinstance(t, mty.Composite)
+            )
+        return self._state.type_constraints
+
+    def __compute_type_constraints(self) -> Tuple[expr.Expr, ...]:
+        scalar_types = [
+            (f.name, t)
+            for f, t in self.types.items()
+            if isinstance(t, mty.Scalar)
+            and ID(f.name) not in self._enum_literals
+            and f.name not in ["Message", "Final"]
         ]
 
         scalar_constraints = [
@@ -402,12 +529,7 @@ class AbstractMessage(mty.Type):
             if isinstance(t, mty.Scalar)
         ]
 
-        return [
-            *message_constraints,
-            *aggregate_constraints,
-            *scalar_constraints,
-            *type_size_constraints,
-        ]
+        return (*MESSAGE_CONSTRAINTS, *scalar_constraints, *type_size_constraints)
 
     def __validate(self) -> None:
         # pylint: disable=too-many-branches, too-many-locals
@@ -478,10 +600,7 @@ class AbstractMessage(mty.Type):
         self.error.propagate()
 
         for f in structure_fields:
-            for l in self.structure:
-                if f in (INITIAL, l.target):
-                    break
-            else:
+            if f != INITIAL and not self.__incoming.get(f):
                 self.__has_unreachable = True
                 self.error.append(
                     f'unreachable field "{f.name}" in "{self.identifier}"',
@@ -539,17 +658,18 @@ class AbstractMessage(mty.Type):
 
     def __compute_topological_sorting(self) -> Optional[Tuple[Field, ...]]:
         """Return fields topologically sorted (Kahn's algorithm)."""
-        result: Tuple[Field, ...] = ()
+        result: List[Field] = []
         fields = [INITIAL]
-        visited = set()
+        # links are identified by their identity, as all links have the same hash value
+        visited: Set[int] = set()
         while fields:
             n = fields.pop(0)
-            result += (n,)
+            result.append(n)
             for e in self.outgoing(n):
-                visited.add(e)
-                if set(self.incoming(e.target)) <= visited:
+                visited.add(id(e))
+                if all(id(l) in visited for l in self.incoming(e.target)):
                     fields.append(e.target)
-        if not self.__has_unreachable and set(self.structure) - visited:
+        if not self.__has_unreachable and any(id(l) not in visited for l in self.structure):
             self.error.append(
                 f'structure of "{self.identifier}" contains cycle',
                 Subsystem.MODEL,
@@ -560,13 +680,60 @@ class AbstractMessage(mty.Type):
             return None
         return tuple(f for f in result if f not in [INITIAL, FINAL])
 
+    def __field_position(self, field: Field) -> int:
+        if self._state.field_positions is None:
+            self._state.field_positions = {f: i for i, f in enumerate(self.fields)}
+        return self._state.field_positions[field]
+
     def __compute_definite_predecessors(self, final: Field) -> Tuple[Field, ...]:
         return tuple(
             f
             for f in self.fields
-            if all(any(f == pf.source for pf in p) for p in self.paths(final))
+            if all(any(f == pf.source for pf in p) for p in self.iter_paths(final))
         )
 
+    def __compute_static_prefix(self) -> Tuple[Tuple[Field, int, int], ...]:
+        result: List[Tuple[Field, int, int]] = []
+        mapping: Dict[expr.Name, expr.Expr] = {expr.First("Message"): expr.Number(0)}
+        first = 0
+        field = INITIAL
+
+        while True:
+            outgoing = self.outgoing(field)
+            if len(outgoing) != 1:
+                break
+            link = outgoing[0]
+            if (
+                link.target == FINAL
+                or link.condition != expr.TRUE
+                or len(self.incoming(link.target)) != 1
+            ):
+                break
+
+            if link.first != expr.UNDEFINED:
+                first_expr = link.first.substituted(mapping=mapping).simplified()
+                if not isinstance(first_expr, expr.Number):
+                    break
+                first = first_expr.value
+
+            size_expr = (
+                self.field_size(link.target)
+                if isinstance(self.types[link.target], mty.Scalar)
+                else link.size.substituted(mapping=mapping).simplified()
+            )
+            if not isinstance(size_expr, expr.Number):
+                break
+            size = size_expr.value
+
+            field = link.target
+            result.append((field, first, size))
+            mapping[expr.First(field.name)] = expr.Number(first)
+            mapping[expr.Size(field.name)] = expr.Number(size)
+            mapping[expr.Last(field.name)] = expr.Number(first + size - 1)
+            first += size
+
+        return tuple(result)
+
     def __compute_field_condition(self, final: Field) -> expr.Expr:
         if final == INITIAL:
             return expr.TRUE
@@ -591,30 +758,47 @@ class Message(AbstractMessage):
         error: RecordFluxError = None,
         state: MessageState = None,
         skip_proof: bool = False,
+        workers: int = 1,
     ) -> None:
         super().__init__(identifier, structure, types, aspects, location, error, state)
 
+        self.__link_expressions: Dict[int, List[expr.Expr]] = {}
+
         if not self.error.check() and not skip_proof:
-            self.verify()
+            self.verify(workers)
 
         self.error.propagate()
 
-    def verify(self) -> None:
+    def verify(self, workers: int = 1, cache: expr.ProofCache = None) -> None:
         if self.structure or self.types:
-            self.__verify_expression_types()
-            self.__verify_expressions()
-            self.__verify_checksums()
-
-            self.error.propagate()
-
-            self.__prove_conflicting_conditions()
-            self.__prove_reachability()
-            self.__prove_contradictions()
-            self.__prove_coverage()
-            self.__prove_overlays()
-            self.__prove_field_positions()
-            self.__prove_message_size()
+            self.__link_expressions = {}
+            with expr.ProofManager(workers, cache) as prover:
+                self.__verify_expression_types(prover)
+                self.__verify_expressions()
+                self.__verify_checksums()
+
+                self.error.propagate()
+
+                # all proofs are scheduled before any result is evaluated, except for the proofs of
+                # reachability, which are done on demand to stop at the first satisfiable path, the
+                # errors are reported in the order of the proofs, the proofs of each group are
+                # dispatched together
+                reports = []
+                for prove in [
+                    self.__prove_conflicting_conditions,
+                    self.__prove_reachability,
+                    self.__prove_contradictions,
+                    self.__prove_coverage,
+                    self.__prove_overlays,
+                    self.__prove_field_positions,
+                    self.__prove_message_size,
+                ]:
+                    reports.append(prove(prover))
+                    prover.flush()
+                for report in reports:
+                    report()
 
+            self.__link_expressions = {}
             self.error.propagate()
 
     def copy(
@@ -635,14 +819,14 @@ class Message(AbstractMessage):
             error if error else self.error,
         )
 
-    def proven(self, skip_proof: bool = False) -> "Message":
+    def proven(self, skip_proof: bool = False, workers: int = 1) -> "Message":
         return copy(self)
 
     def is_possibly_empty(self, field: Field) -> bool:
         if isinstance(self.types[field], mty.Scalar):
             return False
 
-        for p in self.paths(FINAL):
+        for p in self.iter_paths(FINAL):
             if not any(l.target == field for l in p):
                 continue
             empty_field = expr.Equal(expr.Size(field.name), expr.Number(0))
@@ -652,7 +836,7 @@ class Message(AbstractMessage):
 
         return False
 
-    def __verify_expression_types(self) -> None:
+    def __verify_expression_types(self, prover: expr.ProofManager) -> None:
         types: Dict[ID, mty.Type] = {}
 
         def typed_variable(expression: expr.Expr) -> expr.Expr:
@@ -666,20 +850,21 @@ class Message(AbstractMessage):
                     expression.type_ = self._enum_literals[expression.identifier].type_
                 elif expression.identifier in self._type_literals:
                     expression.type_ = self._type_literals[expression.identifier].type_
+                expression.invalidate_memoized()
             return expression
 
-        for p in self.paths(FINAL):
+        for p in self.iter_paths(FINAL):
+            try:
+                # check for contradictions in conditions of path
+                proof = self.__prove_path_property(expr.TRUE, p, prover)
+                if proof.result == expr.ProofResult.UNSAT:
+                    continue
+            except expr.Z3TypeError:
+                pass
+
             types = {}
             path = []
             for l in p:
-                try:
-                    # check for contradictions in conditions of path
-                    proof = self.__prove_path_property(expr.TRUE, p)
-                    if proof.result == expr.ProofResult.UNSAT:
-                        break
-                except expr.Z3TypeError:
-                    pass
-
                 path.append(l.target)
 
                 if l.source in self.types:
@@ -831,7 +1016,7 @@ class Message(AbstractMessage):
                         lower_field = (
                             Field(lower.name) if lower.name.lower() != "message" else INITIAL
                         )
-                        for p in self.paths(upper_field):
+                        for p in self.iter_paths(upper_field):
                             if not any(lower_field == l.source for l in p):
                                 self.error.append(
                                     f'invalid range "{e}" in definition of checksum "{name}"',
@@ -862,137 +1047,185 @@ class Message(AbstractMessage):
                 name.location,
             )
 
-    def __prove_conflicting_conditions(self) -> None:
+    def __prove_conflicting_conditions(self, prover: expr.ProofManager) -> Callable[[], None]:
+        conflicts = []
         for f in (INITIAL, *self.fields):
             for i1, c1 in enumerate(self.outgoing(f)):
                 for i2, c2 in enumerate(self.outgoing(f)):
                     if i1 < i2:
                         conflict = expr.And(c1.condition, c2.condition)
-                        proof = conflict.check(self.type_constraints(conflict))
-                        if proof.result == expr.ProofResult.SAT:
-                            c1_message = str(c1.condition).replace("\n", " ")
-                            c2_message = str(c2.condition).replace("\n", " ")
-                            self.error.append(
-                                f'conflicting conditions for field "{f.name}"',
-                                Subsystem.MODEL,
-                                Severity.ERROR,
-                                f.identifier.location,
-                            )
-                            self.error.append(
-                                f"condition {i1} ({f.identifier} -> {c1.target.identifier}):"
-                                f" {c1_message}",
-                                Subsystem.MODEL,
-                                Severity.INFO,
-                                c1.condition.location,
-                            )
-                            self.error.append(
-                                f"condition {i2} ({f.identifier} -> {c2.target.identifier}):"
-                                f" {c2_message}",
-                                Subsystem.MODEL,
-                                Severity.INFO,
-                                c2.condition.location,
-                            )
+                        proof = prover.submit(conflict, self.type_constraints(conflict))
+                        conflicts.append((f, (i1, c1), (i2, c2), proof))
 
-    def __prove_reachability(self) -> None:
-        def has_final(field: Field) -> bool:
-            if field == FINAL:
-                return True
-            for o in self.outgoing(field):
-                if has_final(o.target):
-                    return True
-            return False
-
-        for f in (INITIAL, *self.fields):
-            if not has_final(f):
-                self.error.append(
-                    f'no path to FINAL for field "{f.name}" in "{self.identifier}"',
-                    Subsystem.MODEL,
-                    Severity.ERROR,
-                    f.identifier.location,
-                )
-
-        for f in (*self.fields, FINAL):
-            paths = []
-            for path in self.paths(f):
-                facts = [fact for link in path for fact in self.__link_expression(link)]
-                last_field = path[-1].target
-                outgoing = self.outgoing(last_field)
-                if last_field != FINAL and outgoing:
-                    facts.append(
-                        expr.Or(
-                            *[o.condition for o in outgoing],
-                            location=last_field.identifier.location,
-                        )
-                    )
-                proof = expr.TRUE.check(facts)
+        def report() -> None:
+            for f, (i1, c1), (i2, c2), proof in conflicts:
                 if proof.result == expr.ProofResult.SAT:
-                    break
-
-                paths.append((path, proof.error))
-            else:
-                self.error.append(
-                    f'unreachable field "{f.name}" in "{self.identifier}"',
-                    Subsystem.MODEL,
-                    Severity.ERROR,
-                    f.identifier.location,
-                )
-                for index, (path, errors) in enumerate(sorted(paths)):
+                    c1_message = str(c1.condition).replace("\n", " ")
+                    c2_message = str(c2.condition).replace("\n", " ")
                     self.error.append(
-                        f"path {index} (" + " -> ".join([l.target.name for l in path]) + "):",
+                        f'conflicting conditions for field "{f.name}"',
                         Subsystem.MODEL,
-                        Severity.INFO,
+                        Severity.ERROR,
                         f.identifier.location,
                     )
-                    self.error.extend(
-                        [
-                            (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, l)
-                            for m, l in errors
-                        ]
+                    self.error.append(
+                        f"condition {i1} ({f.identifier} -> {c1.target.identifier}):"
+                        f" {c1_message}",
+                        Subsystem.MODEL,
+                        Severity.INFO,
+                        c1.condition.location,
+                    )
+                    self.error.append(
+                        f"condition {i2} ({f.identifier} -> {c2.target.identifier}):"
+                        f" {c2_message}",
+                        Subsystem.MODEL,
+                        Severity.INFO,
+                        c2.condition.location,
                     )
 
-    def __prove_contradictions(self) -> None:
-        for f in (INITIAL, *self.fields):
-            contradictions = []
-            paths = 0
-            for path in self.paths(f):
-                facts = [fact for link in path for fact in self.__link_expression(link)]
-                for c in self.outgoing(f):
-                    paths += 1
-                    contradiction = c.condition
-                    constraints = self.type_constraints(contradiction)
-                    proof = contradiction.check([*constraints, *facts])
+        return report
+
+    def __prove_reachability(self, prover: expr.ProofManager) -> Callable[[], None]:
+        def reaching_final() -> Set[Field]:
+            result = {FINAL}
+            pending = [FINAL]
+            while pending:
+                for l in self.incoming(pending.pop()):
+                    if l.source not in result:
+                        result.add(l.source)
+                        pending.append(l.source)
+            return result
+
+        def prove_path(path: Tuple[Link, ...]) -> expr.Proof:
+            facts = [fact for link_facts in self.__path_expressions(path) for fact in link_facts]
+            last_field = path[-1].target
+            outgoing = self.outgoing(last_field)
+            if last_field != FINAL and outgoing:
+                facts.append(
+                    expr.Or(
+                        *[o.condition for o in outgoing],
+                        location=last_field.identifier.location,
+                    )
+                )
+            return prover.check(expr.TRUE, facts)
+
+        def unreachable() -> Dict[
+            Field, List[Tuple[Tuple[Link, ...], List[Tuple[str, Optional[Location]]]]]
+        ]:
+            """Return the unsatisfiable paths of all unreachable fields.
+
+            The paths of a field are proven one after another until a satisfiable path is found. A
+            satisfiable path also proves the reachability of all fields on the path, so that the
+            paths of most fields need not be enumerated at all. Starting with FINAL covers as many
+            fields as possible by the first satisfiable path.
+            """
+            reachable: Set[Field] = set()
+            result = {}
+            for f in (FINAL, *self.fields):
+                if f in reachable:
+                    continue
+                paths = []
+                for path in self.iter_paths(f):
+                    proof = prove_path(path)
                     if proof.result == expr.ProofResult.SAT:
-                        continue
+                        reachable.update(l.target for l in path)
+                        break
 
-                    contradictions.append((path, c.condition, proof.error))
+                    paths.append((path, proof.error))
+                else:
+                    result[f] = paths
+            return result
 
-            if paths == len(contradictions):
-                for path, cond, errors in sorted(contradictions):
+        def report() -> None:
+            reaching = reaching_final()
+            for f in (INITIAL, *self.fields):
+                if f not in reaching:
                     self.error.append(
-                        f'contradicting condition in "{self.identifier}"',
+                        f'no path to FINAL for field "{f.name}" in "{self.identifier}"',
                         Subsystem.MODEL,
                         Severity.ERROR,
-                        cond.location,
+                        f.identifier.location,
                     )
-                    self.error.extend(
-                        [
-                            (
-                                f'on path: "{l.target.identifier}"',
-                                Subsystem.MODEL,
-                                Severity.INFO,
-                                l.target.identifier.location,
-                            )
-                            for l in path
-                        ]
+
+            unsatisfied = unreachable()
+            for f in (*self.fields, FINAL):
+                if f in unsatisfied:
+                    paths = unsatisfied[f]
+                    self.error.append(
+                        f'unreachable field "{f.name}" in "{self.identifier}"',
+                        Subsystem.MODEL,
+                        Severity.ERROR,
+                        f.identifier.location,
                     )
-                    self.error.extend(
-                        [
-                            (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, l)
-                            for m, l in errors
-                        ]
+                    for index, (path, errors) in enumerate(sorted(paths)):
+                        self.error.append(
+                            f"path {index} (" + " -> ".join([l.target.name for l in path]) + "):",
+                            Subsystem.MODEL,
+                            Severity.INFO,
+                            f.identifier.location,
+                        )
+                        self.error.extend(
+                            [
+                                (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, l)
+                                for m, l in errors
+                            ]
+                        )
+
+        return report
+
+    def __prove_contradictions(self, prover: expr.ProofManager) -> Callable[[], None]:
+        contradictions = []
+        for f in (INITIAL, *self.fields):
+            proofs = []
+            for path in self.iter_paths(f):
+                path_facts = self.__path_expressions(path)
+                facts = [fact for link_facts in path_facts for fact in link_facts]
+                prefix = self.__constrained(path_facts)
+                for c in self.outgoing(f):
+                    contradiction = c.condition
+                    constraints = self.type_constraints(contradiction)
+                    proofs.append(
+                        (path, c, prover.submit(contradiction, [*constraints, *facts], prefix))
                     )
+            contradictions.append(proofs)
+
+        def report() -> None:
+            for proofs in contradictions:
+                unsatisfied = [
+                    (path, c.condition, proof.error)
+                    for path, c, proof in proofs
+                    if proof.result != expr.ProofResult.SAT
+                ]
 
-    def __prove_coverage(self) -> None:
+                if len(proofs) == len(unsatisfied):
+                    for path, cond, errors in sorted(unsatisfied):
+                        self.error.append(
+                            f'contradicting condition in "{self.identifier}"',
+                            Subsystem.MODEL,
+                            Severity.ERROR,
+                            cond.location,
+                        )
+                        self.error.extend(
+                            [
+                                (
+                                    f'on path: "{l.target.identifier}"',
+                                    Subsystem.MODEL,
+                                    Severity.INFO,
+                                    l.target.identifier.location,
+                                )
+                                for l in path
+                            ]
+                        )
+                        self.error.extend(
+                            [
+                                (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, l)
+                                for m, l in errors
+                            ]
+                        )
+
+        return report
+
+    def __prove_coverage(self, prover: expr.ProofManager) -> Callable[[], None]:
         """
         Prove that the fields of a message cover all message bits, i.e. there are no holes in the
         message definition.
@@ -1004,7 +1237,8 @@ class Message(AbstractMessage):
         effectively pruning the range that this field covers from the bit range of the message. For
         the overall expression, prove that it is false for all f, i.e. no bits are left.
         """
-        for path in [p[:-1] for p in self.paths(FINAL) if p]:
+        coverage = []
+        for path in (p[:-1] for p in self.iter_paths(FINAL) if p):
 
             facts: Sequence[expr.Expr]
 
@@ -1033,57 +1267,70 @@ class Message(AbstractMessage):
             )
 
             # Constraints for links and types
-            facts.extend([f for l in path for f in self.__link_expression(l)])
+            prefix = self.__path_expressions(path)
+            facts.extend([f for link_facts in prefix for f in link_facts])
 
             # Coverage expression must be False, i.e. no bits left
-            proof = expr.TRUE.check(facts)
-            if proof.result == expr.ProofResult.SAT:
-                self.error.append(
-                    "path does not cover whole message",
-                    Subsystem.MODEL,
-                    Severity.ERROR,
-                    self.identifier.location,
-                )
-                self.error.extend(
-                    [
-                        (
-                            f'on path: "{l.target.identifier}"',
-                            Subsystem.MODEL,
-                            Severity.INFO,
-                            l.target.identifier.location,
-                        )
-                        for l in path
-                    ]
-                )
-                return
+            coverage.append((path, prover.submit(expr.TRUE, facts, prefix)))
+
+        def report() -> None:
+            for path, proof in coverage:
+                if proof.result == expr.ProofResult.SAT:
+                    self.error.append(
+                        "path does not cover whole message",
+                        Subsystem.MODEL,
+                        Severity.ERROR,
+                        self.identifier.location,
+                    )
+                    self.error.extend(
+                        [
+                            (
+                                f'on path: "{l.target.identifier}"',
+                                Subsystem.MODEL,
+                                Severity.INFO,
+                                l.target.identifier.location,
+                            )
+                            for l in path
+                        ]
+                    )
+                    return
+
+        return report
 
-    def __prove_overlays(self) -> None:
+    def __prove_overlays(self, prover: expr.ProofManager) -> Callable[[], None]:
+        overlays = []
         for f in (INITIAL, *self.fields):
-            for p, l in [(p, p[-1]) for p in self.paths(f) if p]:
+            for p, l in ((p, p[-1]) for p in self.iter_paths(f) if p):
                 if l.first != expr.UNDEFINED and isinstance(l.first, expr.First):
-                    facts = [f for l in p for f in self.__link_expression(l)]
+                    prefix = self.__path_expressions(p)
+                    facts = [f for link_facts in prefix for f in link_facts]
                     overlaid = expr.Equal(
                         self.__target_last(l), expr.Last(l.first.prefix), l.location
                     )
-                    proof = overlaid.check(facts)
-                    if proof.result != expr.ProofResult.SAT:
-                        self.error.append(
-                            f'field "{f.name}" not congruent with'
-                            f' overlaid field "{l.first.prefix}"',
-                            Subsystem.MODEL,
-                            Severity.ERROR,
-                            self.identifier.location,
-                        )
-                        self.error.extend(
-                            [
-                                (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, l)
-                                for m, l in proof.error
-                            ]
-                        )
+                    overlays.append((f, l.first.prefix, prover.submit(overlaid, facts, prefix)))
 
-    def __prove_field_positions(self) -> None:
+        def report() -> None:
+            for f, prefix, proof in overlays:
+                if proof.result != expr.ProofResult.SAT:
+                    self.error.append(
+                        f'field "{f.name}" not congruent with overlaid field "{prefix}"',
+                        Subsystem.MODEL,
+                        Severity.ERROR,
+                        self.identifier.location,
+                    )
+                    self.error.extend(
+                        [
+                            (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, l)
+                            for m, l in proof.error
+                        ]
+                    )
+
+        return report
+
+    def __prove_field_positions(self, prover: expr.ProofManager) -> Callable[[], None]:
+        positions = []
         for f in (*self.fields, FINAL):
-            for path in self.paths(f):
+            for path in self.iter_paths(f):
 
                 last = path[-1]
                 negative = expr.Less(self.__target_size(last), expr.Number(0), last.size.location)
@@ -1091,7 +1338,8 @@ class Message(AbstractMessage):
                     self.__target_first(last), expr.First("Message"), last.location
                 )
 
-                facts = [fact for link in path for fact in self.__link_expression(link)]
+                path_facts = self.__path_expressions(path)
+                facts = [fact for link_facts in path_facts for fact in link_facts]
 
                 outgoing = self.outgoing(f)
                 if f != FINAL and outgoing:
@@ -1101,15 +1349,57 @@ class Message(AbstractMessage):
 
                 facts.extend(self.type_constraints(negative))
                 facts.extend(self.type_constraints(start))
+                prefix = self.__constrained(path_facts)
+
+                # Only positions of reachable paths are checked, all proofs of a path are scheduled
+                # together to enable their concurrent execution
+                proofs = [
+                    prover.submit(expr.TRUE, facts, prefix),
+                    prover.submit(negative, facts, prefix),
+                    prover.submit(start, facts, prefix),
+                ]
+
+                element_size = None
+                t = self.types.get(f)
+                if isinstance(t, mty.Opaque):
+                    element_size = t.element_size
+                    start_aligned = expr.Not(
+                        expr.Equal(
+                            expr.Mod(self.__target_first(last), element_size),
+                            expr.Number(1),
+                            last.location,
+                        )
+                    )
+                    is_multiple_of_element_size = expr.Not(
+                        expr.Equal(
+                            expr.Mod(self.__target_size(last), element_size),
+                            expr.Number(0),
+                            last.location,
+                        )
+                    )
+                    proofs.extend(
+                        [
+                            prover.submit(
+                                start_aligned,
+                                [*facts, *self.type_constraints(start_aligned)],
+                                prefix,
+                            ),
+                            prover.submit(
+                                is_multiple_of_element_size,
+                                [*facts, *self.type_constraints(is_multiple_of_element_size)],
+                                prefix,
+                            ),
+                        ]
+                    )
 
-                proof = expr.TRUE.check(facts)
+                positions.append((f, path, element_size, proofs))
 
-                # Only check positions of reachable paths
-                if proof.result != expr.ProofResult.SAT:
+        def report() -> None:
+            for f, path, element_size, proofs in positions:
+                if proofs[0].result != expr.ProofResult.SAT:
                     continue
 
-                proof = negative.check(facts)
-                if proof.result != expr.ProofResult.UNSAT:
+                if proofs[1].result != expr.ProofResult.UNSAT:
                     path_message = " -> ".join([l.target.name for l in path])
                     self.error.append(
                         f'negative size for field "{f.name}" ({path_message})',
@@ -1119,8 +1409,7 @@ class Message(AbstractMessage):
                     )
                     return
 
-                proof = start.check(facts)
-                if proof.result != expr.ProofResult.SAT:
+                if proofs[2].result != expr.ProofResult.SAT:
                     path_message = " -> ".join([last.target.name for last in path])
                     self.error.append(
                         f'negative start for field "{f.name}" ({path_message})',
@@ -1131,57 +1420,39 @@ class Message(AbstractMessage):
                     self.error.extend(
                         [
                             (f'unsatisfied "{m}"', Subsystem.MODEL, Severity.INFO, locn)
-                            for m, locn in proof.error
+                            for m, locn in proofs[2].error
                         ]
                     )
                     return
 
-                if f in self.types:
-                    t = self.types[f]
-                    if not isinstance(t, mty.Opaque):
-                        continue
-                    element_size = t.element_size
-                    start_aligned = expr.Not(
-                        expr.Equal(
-                            expr.Mod(self.__target_first(last), element_size),
-                            expr.Number(1),
-                            last.location,
-                        )
-                    )
-                    proof = start_aligned.check([*facts, *self.type_constraints(start_aligned)])
-                    if proof.result != expr.ProofResult.UNSAT:
-                        path_message = " -> ".join([p.target.name for p in path])
-                        self.error.append(
-                            f'opaque field "{f.name}" not aligned to {element_size} bit boundary'
-                            f" ({path_message})",
-                            Subsystem.MODEL,
-                            Severity.ERROR,
-                            f.identifier.location,
-                        )
-                        return
+                if element_size is None:
+                    continue
 
-                    is_multiple_of_element_size = expr.Not(
-                        expr.Equal(
-                            expr.Mod(self.__target_size(last), element_size),
-                            expr.Number(0),
-                            last.location,
-                        )
+                if proofs[3].result != expr.ProofResult.UNSAT:
+                    path_message = " -> ".join([p.target.name for p in path])
+                    self.error.append(
+                        f'opaque field "{f.name}" not aligned to {element_size} bit boundary'
+                        f" ({path_message})",
+                        Subsystem.MODEL,
+                        Severity.ERROR,
+                        f.identifier.location,
                     )
-                    proof = is_multiple_of_element_size.check(
-                        [*facts, *self.type_constraints(is_multiple_of_element_size)]
+                    return
+
+                if proofs[4].result != expr.ProofResult.UNSAT:
+                    path_message = " -> ".join([p.target.name for p in path])
+                    self.error.append(
+                        f'size of opaque field "{f.name}" not multiple of {element_size} bit'
+                        f" ({path_message})",
+                        Subsystem.MODEL,
+                        Severity.ERROR,
+                        f.identifier.location,
                     )
-                    if proof.result != expr.ProofResult.UNSAT:
-                        path_message = " -> ".join([p.target.name for p in path])
-                        self.error.append(
-                            f'size of opaque field "{f.name}" not multiple of {element_size} bit'
-                            f" ({path_message})",
-                            Subsystem.MODEL,
-                            Severity.ERROR,
-                            f.identifier.location,
-                        )
-                        return
+                    return
+
+        return report
 
-    def __prove_message_size(self) -> None:
+    def __prove_message_size(self, prover: expr.ProofManager) -> Callable[[], None]:
         """
         Prove that all message paths lead to a message with a size that is a multiple of 8 bit.
         """
@@ -1192,7 +1463,8 @@ class Message(AbstractMessage):
             if isinstance(t, (mty.Opaque, mty.Array))
         ]
 
-        for path in [p[:-1] for p in self.paths(FINAL) if p]:
+        sizes = []
+        for path in (p[:-1] for p in self.iter_paths(FINAL) if p):
             message_size = expr.Add(
                 *[
                     expr.Size(link.target.name)
@@ -1200,35 +1472,54 @@ class Message(AbstractMessage):
                     if link.target != FINAL and link.first == expr.UNDEFINED
                 ]
             )
+            path_facts = self.__path_expressions(path)
             facts = [
-                *[fact for link in path for fact in self.__link_expression(link)],
+                *[fact for link_facts in path_facts for fact in link_facts],
                 *type_constraints,
                 *field_size_constraints,
             ]
-            proof = expr.NotEqual(expr.Mod(message_size, expr.Number(8)), expr.Number(0)).check(
-                facts
-            )
-            if proof.result == expr.ProofResult.SAT:
-                self.error.append(
-                    "message size must be multiple of 8 bit",
-                    Subsystem.MODEL,
-                    Severity.ERROR,
-                    self.identifier.location,
-                )
-                self.error.append(
-                    "on path " + " -> ".join(l.target.name for l in path),
-                    Subsystem.MODEL,
-                    Severity.INFO,
-                    self.identifier.location,
+            prefix = self.__constrained(path_facts)
+            sizes.append(
+                (
+                    path,
+                    prover.submit(
+                        expr.NotEqual(expr.Mod(message_size, expr.Number(8)), expr.Number(0)),
+                        facts,
+                        prefix,
+                    ),
                 )
-                return
+            )
 
-    def __prove_path_property(self, prop: expr.Expr, path: Sequence[Link]) -> expr.Proof:
+        def report() -> None:
+            for path, proof in sizes:
+                if proof.result == expr.ProofResult.SAT:
+                    self.error.append(
+                        "message size must be multiple of 8 bit",
+                        Subsystem.MODEL,
+                        Severity.ERROR,
+                        self.identifier.location,
+                    )
+                    self.error.append(
+                        "on path " + " -> ".join(l.target.name for l in path),
+                        Subsystem.MODEL,
+                        Severity.INFO,
+                        self.identifier.location,
+                    )
+                    return
+
+        return report
+
+    def __prove_path_property(
+        self, prop: expr.Expr, path: Sequence[Link], prover: expr.ProofManager = None
+    ) -> expr.Proof:
         conditions = [l.condition for l in path if l.condition != expr.TRUE]
         sizes = [
             expr.Equal(expr.Size(l.target.name), l.size) for l in path if l.size != expr.UNDEFINED
         ]
-        return prop.check([*self.type_constraints(prop), *conditions, *sizes])
+        facts = [*self.type_constraints(prop), *conditions, *sizes]
+        if prover is None:
+            return prop.check(facts)
+        return prover.check(prop, facts)
 
     @staticmethod
     def __target_first(link: Link) -> expr.Expr:
@@ -1250,6 +1541,27 @@ class Message(AbstractMessage):
             link.target.identifier.location,
         )
 
+    def __path_expressions(self, path: Sequence[Link]) -> List[List[expr.Expr]]:
+        """Return the facts of each link of a path.
+
+        The facts of a link are computed only once, so that paths with a common prefix share the
+        same expressions.
+        """
+        result = []
+        for link in path:
+            if id(link) not in self.__link_expressions:
+                self.__link_expressions[id(link)] = self.__link_expression(link)
+            result.append(self.__link_expressions[id(link)])
+        return result
+
+    def __constrained(self, path_facts: List[List[expr.Expr]]) -> List[Sequence[expr.Expr]]:
+        """Prepend the constant type constraints to the facts of a path.
+
+        The constraints are shared by all proofs including them, so that they are added to the
+        solver only once.
+        """
+        return [self._constant_type_constraints(), *path_facts]
+
     def __link_expression(self, link: Link) -> List[expr.Expr]:
         name = link.target.name
         target_first = self.__target_first(link)
@@ -1288,6 +1600,8 @@ class DerivedMessage(Message):
         aspects: Mapping[ID, Mapping[ID, Sequence[expr.Expr]]] = None,
         location: Location = None,
         error: RecordFluxError = None,
+        skip_proof: bool = False,
+        workers: int = 1,
     ) -> None:
         if not structure and not types:
             structure = derived_message_structure(base)
@@ -1299,6 +1613,8 @@ class DerivedMessage(Message):
             aspects if aspects else copy(base.aspects),
             location if location else base.location,
             error if error else base.error,
+            skip_proof=skip_proof,
+            workers=workers,
         )
         self.base = base
 
@@ -1321,7 +1637,7 @@ class DerivedMessage(Message):
             error if error else self.error,
         )
 
-    def proven(self, skip_proof: bool = False) -> "DerivedMessage":
+    def proven(self, skip_proof: bool = False, workers: int = 1) -> "DerivedMessage":
         return copy(self)
 
 
@@ -1345,7 +1661,7 @@ class UnprovenMessage(AbstractMessage):
             error if error else self.error,
         )
 
-    def proven(self, skip_proof: bool = False) -> Message:
+    def proven(self, skip_proof: bool = False, workers: int = 1) -> Message:
         return Message(
             identifier=self.identifier,
             structure=self.structure,
@@ -1354,6 +1670,7 @@ class UnprovenMessage(AbstractMessage):
             error=self.error,
             state=self._state,
             skip_proof=skip_proof,
+            workers=workers,
         )
 
     @ensure(lambda result: valid_message_field_types(result))
@@ -1536,15 +1853,17 @@ class UnprovenDerivedMessage(UnprovenMessage):
             error if error else self.error,
         )
 
-    def proven(self, skip_proof: bool = False) -> DerivedMessage:
+    def proven(self, skip_proof: bool = False, workers: int = 1) -> DerivedMessage:
         return DerivedMessage(
             self.identifier,
-            self.base if isinstance(self.base, Message) else self.base.proven(),
+            self.base if isinstance(self.base, Message) else self.base.proven(workers=workers),
             self.structure,
             self.types,
             self.aspects,
             self.location,
             self.error,
+            skip_proof,
+            workers,
         )
 
 
@@ -1,12 +1,21 @@
+import hashlib
+import os
+import pickle
+import stat
+import zlib
+from pathlib import Path
 from typing import Dict, Sequence
 
-from rflx import const
+from rflx import __version__, const
 from rflx.common import Base, verbose_repr
-from rflx.error import RecordFluxError, Severity, Subsystem
+from rflx.error import RecordFluxError, Severity, Subsystem, fail
 from rflx.identifier import ID
 
 from . import message, session, type_
 
+SNAPSHOT_MAGIC = b"RFLXM"
+SNAPSHOT_FORMAT = 2
+
 
 class Model(Base):
     def __init__(
@@ -43,6 +52,115 @@ class Model(Base):
     def sessions(self) -> Sequence[session.Session]:
         return self.__sessions
 
+    def dump(self, filename: Path) -> None:
+        """Store the model in a binary snapshot, which can be restored by `load`.
+
+        The snapshot contains the content hashes of all specification files the types and sessions
+        are declared in. The paths of the files are stored relative to the snapshot if possible, so
+        that the snapshot can be loaded from any working directory and moved together with the
+        specification files. All properties of the messages which are otherwise computed on first
+        use are computed before the model is stored.
+        """
+        for m in self.messages:
+            m.compute_state()
+        directory = filename.resolve().parent
+        sources = {snapshot_path(f, directory): source_hash(f) for f in self.__sources()}
+        data = pickle.dumps((__version__, sources, self), pickle.HIGHEST_PROTOCOL)
+        filename.write_bytes(
+            SNAPSHOT_MAGIC + SNAPSHOT_FORMAT.to_bytes(2, "big") + zlib.compress(data)
+        )
+
+    @staticmethod
+    def load(filename: Path, check_sources: bool = True) -> "Model":
+        """Restore a model from a binary snapshot created by `dump`.
+
+        The model is neither validated nor verified again. If `check_sources` is set, it is
+        ensured that no specification file the model was created from has changed since the
+        snapshot was created.
+
+        A snapshot is stored as a pickle, so loading a snapshot can execute arbitrary code. Only
+        snapshots from trusted sources should be loaded. A snapshot is rejected if it or its
+        directory could be changed by another user than the current user or root.
+        """
+        try:
+            directory = filename.resolve().parent
+            trusted = is_trusted(filename.stat()) and is_trusted(directory.stat())
+            content = filename.read_bytes()
+        except OSError as e:
+            fail(f'unable to read model snapshot "{filename}": {e.strerror}', Subsystem.MODEL)
+
+        if not trusted:
+            fail(f'untrusted model snapshot "{filename}"', Subsystem.MODEL)
+
+        header = SNAPSHOT_MAGIC + SNAPSHOT_FORMAT.to_bytes(2, "big")
+        if not content.startswith(header):
+            fail(f'invalid model snapshot "{filename}"', Subsystem.MODEL)
+
+        try:
+            data = pickle.loads(zlib.decompress(content[len(header) :]))
+        except (
+            zlib.error,
+            EOFError,
+            pickle.PickleError,
+            AttributeError,
+            ImportError,
+            TypeError,
+            ValueError,
+        ):
+            fail(f'invalid model snapshot "{filename}"', Subsystem.MODEL)
+
+        if not (
+            isinstance(data, tuple)
+            and len(data) == 3
+            and isinstance(data[1], dict)
+            and isinstance(data[2], Model)
+        ):
+            fail(f'invalid model snapshot "{filename}"', Subsystem.MODEL)
+
+        version, sources, model = data
+
+        if version != __version__:
+            fail(
+                f'model snapshot "{filename}" was created by RecordFlux {version}',
+                Subsystem.MODEL,
+            )
+
+        if check_sources:
+            missing = [f for f in sources if not (directory / f).is_file()]
+            changed = [
+                f
+                for f, h in sources.items()
+                if f not in missing and source_hash(directory / f) != h
+            ]
+            if missing or changed:
+                error = RecordFluxError()
+                error.append(
+                    f'outdated model snapshot "{filename}"', Subsystem.MODEL, Severity.ERROR
+                )
+                error.extend(
+                    [
+                        (f'missing specification file "{f}"', Subsystem.MODEL, Severity.INFO, None)
+                        for f in missing
+                    ]
+                )
+                error.extend(
+                    [
+                        (f'changed specification file "{f}"', Subsystem.MODEL, Severity.INFO, None)
+                        for f in changed
+                    ]
+                )
+                error.propagate()
+
+        return model
+
+    def __sources(self) -> Sequence[Path]:
+        locations = [
+            *[t.location for t in self.__types],
+            *[s.location for s in self.__sessions],
+        ]
+        sources = {l.source for l in locations if l and l.source}
+        return sorted(f for f in sources if f.is_file())
+
     def __validate(self) -> None:
         error = self.__check_duplicates()
         error += self.__check_conflicts()
@@ -161,3 +279,34 @@ class Model(Base):
             )
 
         return error
+
+
+def snapshot_path(source: Path, directory: Path) -> str:
+    """Return the path of a specification file relative to the directory of a snapshot, or the
+    absolute path if no relative path exists (e.g., on another drive)."""
+    try:
+        return os.path.relpath(source.resolve(), directory)
+    except ValueError:
+        return str(source.resolve())
+
+
+def is_trusted(status: os.stat_result) -> bool:
+    """Return True if a file or directory can only be changed by the current user or root.
+
+    A directory which is writable by other users is accepted if the sticky bit is set, as other
+    users then cannot replace the files in the directory. The check is omitted on platforms
+    without user IDs.
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    writable_by_others = bool(status.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+    sticky_directory = stat.S_ISDIR(status.st_mode) and bool(status.st_mode & stat.S_ISVTX)
+    return status.st_uid in (0, os.getuid()) and (not writable_by_others or sticky_directory)
+
+
+def source_hash(filename: Path) -> str:
+    """Return the content hash of a specification file or an empty string if it cannot be read."""
+    try:
+        return hashlib.sha256(filename.read_bytes()).hexdigest()
+    except OSError:
+        return ""
@@ -474,6 +474,8 @@ class Session(AbstractSession):
                         ]
                     )
 
+            expression.invalidate_memoized()
+
         return expression
 
     @staticmethod
@@ -1,6 +1,7 @@
 from .bitstring import Bitstring  # noqa: F401
+from .columnar import ColumnarDecoder  # noqa: F401
 from .error import PyRFLXError  # noqa: F401
-from .package import Package  # noqa: F401
+from .package import MessagePool, Package  # noqa: F401
 from .pyrflx import PyRFLX  # noqa: F401
 from .typevalue import (  # noqa: F401
     ArrayValue,
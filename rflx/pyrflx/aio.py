@@ -0,0 +1,24 @@
+from asyncio import StreamReader, StreamWriter
+
+from rflx.pyrflx.package import Package
+from rflx.pyrflx.typevalue import MessageValue
+
+
+async def read_message(reader: StreamReader, package: Package, name: str) -> MessageValue:
+    """Read and parse the next message from the stream.
+
+    The message is parsed incrementally and only as many bytes as are needed to complete the
+    message are read. The size of each field must be determined by the preceding fields. An
+    IncompleteReadError is raised if the end of the stream is reached before the message is
+    complete.
+    """
+    message = package[name]
+    missing = message.feed(b"")
+    while missing:
+        missing = message.feed(await reader.readexactly(-(-missing // 8)))
+    return message
+
+
+async def write_message(writer: StreamWriter, message: MessageValue) -> None:
+    writer.write(message.bytestring)
+    await writer.drain()
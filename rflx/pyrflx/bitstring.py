@@ -4,57 +4,104 @@ from rflx.pyrflx.error import PyRFLXError
 
 
 class Bitstring:
+    """View of `length` bits at `offset` of an integer holding `data_length` bits."""
+
+    __slots__ = ("_data", "_data_length", "_offset", "_length")
+
     def __init__(self, bits: str = ""):
         if not self.valid_bitstring(bits):
             raise PyRFLXError("Bitstring does not consist of only 0 and 1")
-        self._bits = bits
+        self._data = int(bits, 2) if bits else 0
+        self._data_length = len(bits)
+        self._offset = 0
+        self._length = len(bits)
+
+    @classmethod
+    def _view(cls, data: int, data_length: int, offset: int, length: int) -> "Bitstring":
+        result = cls.__new__(cls)
+        result._data = data
+        result._data_length = data_length
+        result._offset = offset
+        result._length = length
+        return result
 
     def __add__(self, other: "Bitstring") -> "Bitstring":
-        return Bitstring(self._bits + other._bits)
+        length = self._length + other._length
+        return Bitstring._view((int(self) << other._length) | int(other), length, 0, length)
 
     def __iadd__(self, other: "Bitstring") -> "Bitstring":
-        self._bits += other._bits
+        self._data = (int(self) << other._length) | int(other)
+        self._length += other._length
+        self._data_length = self._length
+        self._offset = 0
         return self
 
     def __getitem__(self, key: Union[int, slice]) -> "Bitstring":
-        if isinstance(key, slice) and isinstance(key.stop, int) and len(self._bits) < key.stop:
-            raise IndexError
-        return Bitstring(self._bits[key])
+        if isinstance(key, slice):
+            if isinstance(key.stop, int) and self._length < key.stop:
+                raise IndexError
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return Bitstring(str(self)[key])
+        else:
+            start = key + self._length if key < 0 else key
+            if not 0 <= start < self._length:
+                raise IndexError
+            stop = start + 1
+        return Bitstring._view(
+            self._data, self._data_length, self._offset + start, max(stop - start, 0)
+        )
 
     def __repr__(self) -> str:
-        return f'Bitstring("{self._bits}")'
+        return f'Bitstring("{self}")'
 
     def __str__(self) -> str:
-        return self._bits
+        if self._length == 0:
+            return ""
+        return format(int(self), f"0{self._length}b")
 
     def __int__(self) -> int:
-        return int(self._bits, 2)
+        return (self._data >> (self._data_length - self._offset - self._length)) & (
+            (1 << self._length) - 1
+        )
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Bitstring):
             return NotImplemented
-        return self._bits == other._bits
+        return self._length == other._length and int(self) == int(other)
 
     def __bytes__(self) -> bytes:
-        return b"".join(
-            [int(self._bits[i : i + 8], 2).to_bytes(1, "big") for i in range(0, len(self._bits), 8)]
-        )
+        full_bytes, remaining_bits = divmod(self._length, 8)
+        value = int(self)
+        if remaining_bits == 0:
+            return value.to_bytes(full_bytes, "big")
+        return (value >> remaining_bits).to_bytes(full_bytes, "big") + (
+            value & ((1 << remaining_bits) - 1)
+        ).to_bytes(1, "big")
 
     def __len__(self) -> int:
-        return len(self._bits)
+        return self._length
+
+    @classmethod
+    def from_bytes(cls, msg: Union[bytes, memoryview]) -> "Bitstring":
+        return cls._view(int.from_bytes(msg, "big"), len(msg) * 8, 0, len(msg) * 8)
 
     @classmethod
-    def from_bytes(cls, msg: bytes) -> "Bitstring":
-        return cls(format(int.from_bytes(msg, "big"), f"0{len(msg) * 8}b"))
+    def from_int(cls, value: int, length: int) -> "Bitstring":
+        if value < 0 or value.bit_length() > length:
+            raise PyRFLXError(f"value {value} cannot be represented by {length} bits")
+        return cls._view(value, length, 0, length)
 
     @staticmethod
     def valid_bitstring(bitstring: str) -> bool:
-        return all((bit in ["0", "1"] for bit in bitstring))
+        return not bitstring.strip("01")
 
     @staticmethod
     def join(iterable: Sequence["Bitstring"]) -> "Bitstring":
-        joined_bitstring = Bitstring()
+        value = 0
+        length = 0
         for i in iterable:
-            joined_bitstring += i
+            value = (value << i._length) | int(i)
+            length += i._length
 
-        return joined_bitstring
+        return Bitstring._view(value, length, 0, length)
@@ -0,0 +1,104 @@
+import sys
+from array import array
+from typing import Dict, List, Tuple, Union
+
+from rflx.expression import TRUE, Number
+from rflx.model import FINAL, Enumeration, Integer, Message
+from rflx.pyrflx.error import PyRFLXError
+
+TYPECODES = {array(t).itemsize: t for t in reversed("BHILQ")}
+
+
+class ColumnarDecoder:
+    """Decoder of a sequence of messages with a static layout into one array per field.
+
+    All records of the sequence have the same size. The fields are extracted by shifting and
+    masking the whole sequence at once. The values of enumeration fields are represented by the
+    values of their literals.
+    """
+
+    def __init__(self, message: Message) -> None:
+        prefix = message.static_prefix()
+
+        if (
+            not message.fields
+            or len(prefix) != len(message.fields)
+            or any(l.condition != TRUE for l in message.incoming(FINAL))
+        ):
+            raise PyRFLXError(f'message "{message.identifier}" has no static layout')
+
+        self.__fields: List[Tuple[str, int, int, Union[Integer, Enumeration]]] = []
+        for field, first, size in prefix:
+            field_type = message.types[field]
+            if not isinstance(field_type, (Integer, Enumeration)):
+                raise PyRFLXError(f'field "{field.name}" of "{message.identifier}" is not scalar')
+            if size > 64:
+                raise PyRFLXError(f'field "{field.name}" of "{message.identifier}" exceeds 64 bits')
+            self.__fields.append((field.name, first, size, field_type))
+
+        # the last field does not necessarily end last, as fields can overlap
+        size = max(first + size for _, first, size in prefix)
+        if size % 8 != 0:
+            raise PyRFLXError(f'size of "{message.identifier}" is not a multiple of 8 bits')
+        self.__record_size = size // 8
+
+    @property
+    def record_size(self) -> int:
+        """Return the size of a record in bytes."""
+        return self.__record_size
+
+    def decode(self, buffer: Union[bytes, memoryview]) -> Dict[str, array]:
+        if len(buffer) % self.__record_size != 0:
+            raise PyRFLXError(
+                f"buffer size {len(buffer)} is not a multiple of record size {self.__record_size}"
+            )
+        count = len(buffer) // self.__record_size
+        data = int.from_bytes(buffer, "big")
+
+        result = {}
+        for name, first, size, field_type in self.__fields:
+            column = self.__extract(data, count, first, size)
+            self.__check(name, column, field_type)
+            result[name] = column
+        return result
+
+    def __extract(self, data: int, count: int, first: int, size: int) -> array:
+        # The field of each record is moved to the end of the record and all other bits are
+        # cleared. The resulting bytes are gathered into the items of an array.
+        record_size = self.__record_size
+        mask = int.from_bytes(((1 << size) - 1).to_bytes(record_size, "big") * count, "big")
+        values = ((data >> (record_size * 8 - first - size)) & mask).to_bytes(
+            record_size * count, "big"
+        )
+        value_size = (size + 7) // 8
+        item_size = next(s for s in sorted(TYPECODES) if s >= value_size)
+        items = bytearray(item_size * count)
+        for i in range(value_size):
+            items[item_size - value_size + i :: item_size] = values[
+                record_size - value_size + i :: record_size
+            ]
+        column = array(TYPECODES[item_size], items)
+        if sys.byteorder == "little":
+            column.byteswap()
+        return column
+
+    @staticmethod
+    def __check(name: str, column: array, field_type: Union[Integer, Enumeration]) -> None:
+        if not column:
+            return
+        if isinstance(field_type, Integer):
+            if min(column) < field_type.first.value or max(column) > field_type.last.value:
+                invalid = next(
+                    v for v in column if not field_type.first.value <= v <= field_type.last.value
+                )
+                raise PyRFLXError(
+                    f"value {invalid} of field {name} not in type range"
+                    f" {field_type.first.value} .. {field_type.last.value}"
+                )
+        elif not field_type.always_valid:
+            literals = {v.value for v in field_type.literals.values() if isinstance(v, Number)}
+            invalid_values = set(column) - literals
+            if invalid_values:
+                raise PyRFLXError(
+                    f"value {min(invalid_values)} of field {name} is not a valid enum value"
+                )
@@ -0,0 +1,310 @@
+import operator
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Sequence, Set, Tuple
+
+from rflx.expression import (
+    FALSE,
+    TRUE,
+    UNDEFINED,
+    Add,
+    And,
+    Div,
+    Equal,
+    Expr,
+    Greater,
+    GreaterEqual,
+    Last,
+    Less,
+    LessEqual,
+    Mod,
+    Mul,
+    Name,
+    NotEqual,
+    Number,
+    Or,
+    Pow,
+    Size,
+    Sub,
+)
+from rflx.model import FINAL, INITIAL, Link, Message
+
+Value = Optional[int]
+Values = Mapping[str, int]
+Evaluator = Callable[[Values], Value]
+
+RELATIONS: Mapping[type, Callable[[int, int], bool]] = {
+    Less: operator.lt,
+    LessEqual: operator.le,
+    Equal: operator.eq,
+    GreaterEqual: operator.ge,
+    Greater: operator.gt,
+    NotEqual: operator.ne,
+}
+
+
+def value(expression: Expr, literals: Mapping[Name, Expr]) -> Value:
+    """Return the value of a constant expression or None if the expression is not constant.
+
+    Booleans are represented by bool, all other values by int.
+    """
+    if expression in literals:
+        assert isinstance(expression, Name)
+        expression = literals[expression]
+    if isinstance(expression, Number):
+        return expression.value
+    if expression == TRUE:
+        return True
+    if expression == FALSE:
+        return False
+    return None
+
+
+def key(name: Name) -> str:
+    return str(name).lower()
+
+
+def compile_expression(expression: Expr, literals: Mapping[Name, Expr]) -> Evaluator:
+    """Translate an expression into a function which evaluates the expression.
+
+    The returned function expects a mapping of the keys of names to their values. The result is
+    None, if the expression cannot be evaluated because of missing values. The evaluation is
+    equivalent to substituting the names and literals in the expression and simplifying the result.
+    """
+    # pylint: disable=too-many-return-statements
+
+    if isinstance(expression, Number) or expression in (TRUE, FALSE):
+        constant = value(expression, {})
+        return lambda _: constant
+
+    if isinstance(expression, Name) and expression != UNDEFINED:
+        return _compile_name(expression, literals)
+
+    if isinstance(expression, And):
+        return _compile_and([compile_expression(t, literals) for t in expression.terms])
+
+    if isinstance(expression, Or):
+        return _compile_or([compile_expression(t, literals) for t in expression.terms])
+
+    if isinstance(expression, (Add, Mul)):
+        return _compile_arithmetic(
+            [compile_expression(t, literals) for t in expression.terms],
+            isinstance(expression, Add),
+        )
+
+    if isinstance(expression, (Sub, Div, Pow, Mod)):
+        return _compile_binary_operation(
+            type(expression),
+            compile_expression(expression.left, literals),
+            compile_expression(expression.right, literals),
+        )
+
+    if type(expression) in RELATIONS:
+        assert isinstance(expression, (Less, LessEqual, Equal, GreaterEqual, Greater, NotEqual))
+        reflexive = isinstance(expression, (Equal, LessEqual, GreaterEqual))
+        if reflexive and expression.left == expression.right:
+            return lambda _: True
+        return _compile_relation(
+            RELATIONS[type(expression)],
+            reflexive,
+            compile_expression(expression.left, literals),
+            compile_expression(expression.right, literals),
+        )
+
+    # The simplification of all other expressions never results in a constant value.
+    return lambda _: None
+
+
+def _compile_name(name: Name, literals: Mapping[Name, Expr]) -> Evaluator:
+    positive = -name if name.negative else name
+    assert isinstance(positive, Name)
+    name_key = key(positive)
+    default = value(positive, literals) if positive in literals else None
+
+    if name.negative:
+
+        def evaluate_negative(values: Values) -> Value:
+            result = values.get(name_key, default)
+            if result is None:
+                return None
+            return not result if isinstance(result, bool) else -result
+
+        return evaluate_negative
+
+    return lambda values: values.get(name_key, default)
+
+
+def _compile_and(terms: Sequence[Evaluator]) -> Evaluator:
+    def evaluate(values: Values) -> Value:
+        result: Value = True
+        for t in terms:
+            term = t(values)
+            if term is None:
+                result = None
+            elif not term:
+                return False
+        return result
+
+    return evaluate
+
+
+def _compile_or(terms: Sequence[Evaluator]) -> Evaluator:
+    def evaluate(values: Values) -> Value:
+        result: Value = False
+        for t in terms:
+            term = t(values)
+            if term is None:
+                result = None
+            elif term:
+                return True
+        return result
+
+    return evaluate
+
+
+def _compile_arithmetic(terms: Sequence[Evaluator], addition: bool) -> Evaluator:
+    def evaluate(values: Values) -> Value:
+        result = 0 if addition else 1
+        for t in terms:
+            term = t(values)
+            if term is None:
+                return None
+            result = result + term if addition else result * term
+        return result
+
+    return evaluate
+
+
+def _compile_binary_operation(
+    operation: type, left_evaluator: Evaluator, right_evaluator: Evaluator
+) -> Evaluator:
+    def evaluate(values: Values) -> Value:
+        left = left_evaluator(values)
+        right = right_evaluator(values)
+        if left is None or right is None or isinstance(left, bool) or isinstance(right, bool):
+            return None
+        if operation is Sub:
+            return left - right
+        if operation is Div:
+            return left // right if left % right == 0 else None
+        if operation is Pow:
+            return left ** right
+        return left % right
+
+    return evaluate
+
+
+def _compile_relation(
+    relation: Callable[[int, int], bool],
+    reflexive: bool,
+    left_evaluator: Evaluator,
+    right_evaluator: Evaluator,
+) -> Evaluator:
+    def evaluate(values: Values) -> Value:
+        left = left_evaluator(values)
+        right = right_evaluator(values)
+        if left is None or right is None:
+            return None
+        if isinstance(left, bool) or isinstance(right, bool):
+            return True if reflexive and left is right else None
+        return relation(left, right)
+
+    return evaluate
+
+
+@dataclass(frozen=True)
+class CompiledLink:
+    link: Link
+    condition: Evaluator
+    size: Evaluator
+    first: Evaluator
+
+
+class MessageLayout:
+    """Conditions, sizes and positions of all fields of a message compiled into functions."""
+
+    def __init__(self, message: Message, literals: Mapping[Name, Expr]) -> None:
+        self.__message = message
+        self.__literals = literals
+
+        def compiled_link(link: Link) -> CompiledLink:
+            return CompiledLink(
+                link,
+                compile_expression(link.condition, literals),
+                compile_expression(link.size, literals),
+                compile_expression(link.first, literals),
+            )
+
+        links = {id(l): compiled_link(l) for l in message.structure}
+        fields = (INITIAL, *message.fields, FINAL)
+
+        self.__incoming: Dict[str, Tuple[CompiledLink, ...]] = {
+            f.name: tuple(links[id(l)] for l in message.incoming(f)) for f in fields
+        }
+        self.__outgoing: Dict[str, Tuple[CompiledLink, ...]] = {
+            f.name: tuple(links[id(l)] for l in message.outgoing(f)) for f in fields
+        }
+        self.__field_condition: Dict[str, Evaluator] = {
+            f.name: compile_expression(message.field_condition(f), literals) for f in fields
+        }
+        self.__static_prefix = tuple(
+            (f.name, first, size) for f, first, size in message.static_scalar_prefix()
+        )
+
+        end_dependent_links = [
+            l
+            for l in message.structure
+            if l.size.findall(lambda x: x in (Last("Message"), Size("Message")))
+        ]
+        self.__end_dependent_fields = tuple(sorted({l.target.name for l in end_dependent_links}))
+        self.__incremental = not end_dependent_links or _reachable(
+            message, {id(l) for l in end_dependent_links}
+        )
+
+    def __reduce__(self) -> Tuple[type, Tuple[Message, Mapping[Name, Expr]]]:
+        # the compiled functions cannot be pickled and are recreated instead
+        return (MessageLayout, (self.__message, self.__literals))
+
+    def incoming(self, field: str) -> Sequence[CompiledLink]:
+        return self.__incoming[field]
+
+    def outgoing(self, field: str) -> Sequence[CompiledLink]:
+        return self.__outgoing[field]
+
+    def field_condition(self, field: str) -> Evaluator:
+        return self.__field_condition[field]
+
+    @property
+    def end_dependent_fields(self) -> Sequence[str]:
+        """Return the fields whose size depends on the end of the message."""
+        return self.__end_dependent_fields
+
+    @property
+    def incremental(self) -> bool:
+        """Return whether the message can be completed without knowing the end of the message."""
+        return self.__incremental
+
+    @property
+    def static_prefix(self) -> Sequence[Tuple[str, int, int]]:
+        """Return the leading scalar fields which can be parsed without any checks in between.
+
+        Each element contains the field name, its first bit and its size.
+        """
+        return self.__static_prefix
+
+
+def _reachable(message: Message, excluded_links: Set[int]) -> bool:
+    """Return whether the final field is reachable without using any of the excluded links."""
+    visited = {INITIAL}
+    pending = [INITIAL]
+    while pending:
+        for l in message.outgoing(pending.pop()):
+            if id(l) not in excluded_links and l.target not in visited:
+                visited.add(l.target)
+                pending.append(l.target)
+    return FINAL in visited
+
+
+def number(result: Value) -> Optional[Number]:
+    if result is None or isinstance(result, bool):
+        return None
+    return Number(result)
@@ -1,6 +1,24 @@
-from typing import Callable, Dict, Iterator
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Union,
+)
 
 from rflx.common import Base
+from rflx.pyrflx.columnar import ColumnarDecoder
+from rflx.pyrflx.error import PyRFLXError
 from rflx.pyrflx.typevalue import MessageValue
 
 
@@ -25,3 +43,189 @@ class Package(Base):
     def set_checksum_functions(self, functions: Dict[str, Dict[str, Callable]]) -> None:
         for key, value in functions.items():
             self.__messages[key].set_checksum_function(value)
+
+    def pool(self, key: str, size: int) -> "MessagePool":
+        return MessagePool(self.__messages[key], size)
+
+    def columnar_decoder(self, key: str) -> ColumnarDecoder:
+        return ColumnarDecoder(self.__messages[key].model)
+
+    def process_pool(self, workers: int = None) -> "ParserPool":
+        """Return a process pool for parsing the messages of the package by `parse_many`."""
+        return ParserPool(self.__messages, workers)
+
+    def parse_many(
+        self,
+        key: str,
+        buffers: Iterable[Union[bytes, memoryview]],
+        executor: Executor = None,
+        chunk_size: int = 64,
+        workers: int = None,
+    ) -> Iterator[Union[MessageValue, PyRFLXError]]:
+        """Parse each buffer into a new instance of a message.
+
+        The results are generated lazily in the order of the buffers. A buffer which cannot be
+        parsed results in the corresponding error. If an executor is given, the buffers are parsed
+        in chunks of the given size by the executor. For parsing in separate processes, a pool
+        created by `process_pool` should be used: Its workers keep the messages of the package, so
+        that only the buffers and the parsed field values have to be transferred. With any other
+        process pool, the message is pickled for each chunk. Checksum functions must be picklable
+        if processes are used. At most two chunks per worker are pending at a time. The number of
+        workers is taken from a pool created by `process_pool`. For other executors it is given by
+        `workers` and defaults to the number of CPUs.
+        """
+        if chunk_size < 1:
+            raise PyRFLXError(f"invalid chunk size {chunk_size}")
+        if workers is not None and workers < 1:
+            raise PyRFLXError(f"invalid number of workers {workers}")
+        message = self.__messages[key]
+        if executor is None:
+            return (_parse(message, b) for b in buffers)
+        if isinstance(executor, ParserPool):
+            workers = executor.workers
+        elif workers is None:
+            workers = os.cpu_count() or 1
+        if isinstance(executor, ParserPool) and executor.package_messages.get(key) is message:
+            return _parse_concurrently(
+                workers,
+                chunk_size,
+                buffers,
+                lambda chunk: executor.submit(_parse_chunk_in_worker, key, chunk),
+                lambda result: _restore(message, result),
+            )
+        return _parse_concurrently(
+            workers,
+            chunk_size,
+            buffers,
+            lambda chunk: executor.submit(_parse_chunk, message, chunk),
+            lambda result: result,
+        )
+
+
+class ParserPool(ProcessPoolExecutor):
+    """Process pool whose workers are initialized with the messages of a package."""
+
+    def __init__(self, messages: Mapping[str, MessageValue], workers: int = None) -> None:
+        self.package_messages = dict(messages)
+        self.workers = workers or os.cpu_count() or 1
+        super().__init__(
+            self.workers, initializer=_initialize_worker, initargs=(self.package_messages,)
+        )
+
+
+class MessagePool:
+    """Bounded pool of reusable instances of a message."""
+
+    def __init__(self, message: MessageValue, size: int) -> None:
+        if size < 1:
+            raise PyRFLXError(f"invalid pool size {size}")
+        self.__message = message
+        self.__size = size
+        self.__available: List[MessageValue] = [message.clone() for _ in range(size)]
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def available(self) -> int:
+        return len(self.__available)
+
+    def acquire(self) -> MessageValue:
+        """Return an instance in the initial state, a new instance is created if none is left."""
+        if self.__available:
+            return self.__available.pop()
+        return self.__message.clone()
+
+    def release(self, message: MessageValue) -> None:
+        """Reset the instance and return it to the pool, if the pool is not full."""
+        if message.identifier != self.__message.identifier:
+            raise PyRFLXError(
+                f'cannot release "{message.identifier}" to pool of "{self.__message.identifier}"'
+            )
+        if any(m is message for m in self.__available):
+            raise PyRFLXError(f'"{message.identifier}" already released')
+        if len(self.__available) < self.__size:
+            message.reset()
+            self.__available.append(message)
+
+    @contextmanager
+    def borrow(self) -> Iterator[MessageValue]:
+        message = self.acquire()
+        try:
+            yield message
+        finally:
+            self.release(message)
+
+
+def _parse(
+    message: MessageValue, buffer: Union[bytes, memoryview]
+) -> Union[MessageValue, PyRFLXError]:
+    result = message.clone()
+    try:
+        result.parse(buffer)
+    except PyRFLXError as e:
+        return e
+    return result
+
+
+def _parse_chunk(
+    message: MessageValue, buffers: Sequence[bytes]
+) -> List[Union[MessageValue, PyRFLXError]]:
+    return [_parse(message, b) for b in buffers]
+
+
+# messages of the package of the pool the worker process belongs to
+_worker_messages: Dict[str, MessageValue] = {}
+
+
+def _initialize_worker(messages: Mapping[str, MessageValue]) -> None:
+    _worker_messages.update(messages)
+
+
+def _parse_chunk_in_worker(
+    key: str, buffers: Sequence[bytes]
+) -> List[Union[MessageValue.Changes, PyRFLXError]]:
+    message = _worker_messages[key]
+    result: List[Union[MessageValue.Changes, PyRFLXError]] = []
+    for buffer in buffers:
+        parsed = _parse(message, buffer)
+        result.append(
+            parsed
+            if isinstance(parsed, PyRFLXError)
+            else parsed._changes()  # pylint: disable=protected-access
+        )
+    return result
+
+
+def _restore(
+    message: MessageValue, result: Union[MessageValue.Changes, PyRFLXError]
+) -> Union[MessageValue, PyRFLXError]:
+    if isinstance(result, PyRFLXError):
+        return result
+    restored = message.clone()
+    restored._apply(result)  # pylint: disable=protected-access
+    return restored
+
+
+def _parse_concurrently(
+    workers: int,
+    chunk_size: int,
+    buffers: Iterable[Union[bytes, memoryview]],
+    submit: Callable[[List[bytes]], Future],
+    convert: Callable[[Any], Union[MessageValue, PyRFLXError]],
+) -> Iterator[Union[MessageValue, PyRFLXError]]:
+    # the number of pending chunks is limited to keep the memory usage independent of the number
+    # of buffers, two chunks per worker keep all workers busy while the results are consumed
+    max_pending = 2 * workers
+    pending: Deque[Future] = deque()
+    iterator = iter(buffers)
+
+    while True:
+        chunk = [bytes(b) for b in islice(iterator, chunk_size)]
+        if chunk:
+            pending.append(submit(chunk))
+        if not pending:
+            return
+        if not chunk or len(pending) >= max_pending:
+            yield from (convert(r) for r in pending.popleft().result())
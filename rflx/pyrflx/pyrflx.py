@@ -50,6 +50,20 @@ class PyRFLX:
         model = parser.create_model()
         return cls(model, skip_message_verification)
 
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: str,
+        skip_message_verification: bool = False,
+        check_sources: bool = True,
+    ) -> "PyRFLX":
+        """Create an instance from a model snapshot created by `rflx compile-model`.
+
+        Loading a snapshot can execute arbitrary code, so only snapshots from trusted sources should
+        be loaded.
+        """
+        return cls(Model.load(Path(snapshot), check_sources), skip_message_verification)
+
     def __getitem__(self, key: str) -> Package:
         return self.__packages[key]
 
@@ -1,7 +1,19 @@
 # pylint: disable=too-many-lines
 from abc import abstractmethod
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, replace
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from rflx.common import Base
 from rflx.const import BUILTINS_PACKAGE
@@ -40,6 +52,7 @@ from rflx.model import (
 )
 from rflx.pyrflx.bitstring import Bitstring
 from rflx.pyrflx.error import PyRFLXError, Severity, Subsystem
+from rflx.pyrflx.layout import MessageLayout, key, number, value as constant_value
 
 
 class TypeValue(Base):
@@ -85,7 +98,7 @@ class TypeValue(Base):
         raise NotImplementedError
 
     @abstractmethod
-    def parse(self, value: Union[Bitstring, bytes], check: bool = True) -> None:
+    def parse(self, value: Union[Bitstring, bytes, memoryview], check: bool = True) -> None:
         raise NotImplementedError
 
     @property
@@ -111,6 +124,15 @@ class TypeValue(Base):
     def clone(self) -> "TypeValue":
         return self.__class__(self._type)
 
+    def copy(self) -> "TypeValue":
+        return _shallow_copy(self)
+
+    def restore(self, other: "TypeValue") -> None:
+        """Take over the state of a value of the same type."""
+        assert self.__class__ is other.__class__
+        self.__dict__.clear()
+        self.__dict__.update(other.__dict__)
+
     @classmethod
     def construct(
         cls, vtype: Type, imported: bool = False, refinements: Sequence["RefinementValue"] = None
@@ -162,21 +184,12 @@ class IntegerValue(ScalarValue):
         return self._type.last.value
 
     def assign(self, value: int, check: bool = True) -> None:
-        if check and (
-            And(*self._type.constraints("__VALUE__", check))
-            .substituted(
-                mapping={Variable("__VALUE__"): Number(value), Size("__VALUE__"): self._type.size}
-            )
-            .simplified()
-            != TRUE
-        ):
+        if check and not self._first <= value <= self._last:
             raise PyRFLXError(f"value {value} not in type range {self._first} .. {self._last}")
         self._value = value
 
-    def parse(self, value: Union[Bitstring, bytes], check: bool = True) -> None:
-        if isinstance(value, bytes):
-            value = Bitstring.from_bytes(value)
-        self.assign(int(value), check)
+    def parse(self, value: Union[Bitstring, bytes, memoryview], check: bool = True) -> None:
+        self.assign(_int_value(value), check)
 
     @property
     def expr(self) -> Number:
@@ -191,7 +204,7 @@ class IntegerValue(ScalarValue):
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
-        return Bitstring(format(self._value, f"0{self.size}b"))
+        return Bitstring.from_int(self._value, self.size.value)
 
     @property
     def accepted_type(self) -> type:
@@ -246,10 +259,8 @@ class EnumValue(ScalarValue):
             self._type.literals[prefixed_value.name],
         )
 
-    def parse(self, value: Union[Bitstring, bytes], check: bool = True) -> None:
-        if isinstance(value, bytes):
-            value = Bitstring.from_bytes(value)
-        value_as_number = Number(int(value))
+    def parse(self, value: Union[Bitstring, bytes, memoryview], check: bool = True) -> None:
+        value_as_number = Number(_int_value(value))
         if value_as_number not in self.literals.values():
             if self._type.always_valid:
                 self._value = "UNKNOWN", value_as_number
@@ -281,7 +292,7 @@ class EnumValue(ScalarValue):
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
-        return Bitstring(format(self._value[1].value, f"0{self.size}b"))
+        return Bitstring.from_int(self._value[1].value, self.size.value)
 
     @property
     def accepted_type(self) -> type:
@@ -301,9 +312,9 @@ class CompositeValue(TypeValue):
         self._expected_size = expected_size
 
     def _check_size_of_assigned_value(
-        self, value: Union[bytes, Bitstring, List[TypeValue]]
+        self, value: Union[bytes, memoryview, Bitstring, List[TypeValue]]
     ) -> None:
-        if isinstance(value, bytes):
+        if isinstance(value, (bytes, memoryview)):
             size_of_value = len(value) * 8
         elif isinstance(value, Bitstring):
             size_of_value = len(value)
@@ -329,7 +340,7 @@ class CompositeValue(TypeValue):
 
 class OpaqueValue(CompositeValue):
 
-    _value: Optional[bytes]
+    _value: Optional[Union[bytes, memoryview]]
     _nested_message: Optional["MessageValue"] = None
 
     def __init__(self, vtype: Opaque) -> None:
@@ -339,7 +350,7 @@ class OpaqueValue(CompositeValue):
     def assign(self, value: bytes, check: bool = True) -> None:
         self.parse(value, check)
 
-    def parse(self, value: Union[Bitstring, bytes], check: bool = True) -> None:
+    def parse(self, value: Union[Bitstring, bytes, memoryview], check: bool = True) -> None:
         if check:
             self._check_size_of_assigned_value(value)
         if self._refinement_message is not None:
@@ -356,6 +367,8 @@ class OpaqueValue(CompositeValue):
             assert nested_msg.valid_message
             self._nested_message = nested_msg
             self._value = nested_msg.bytestring
+        elif isinstance(value, memoryview):
+            self._value = value
         else:
             self._value = bytes(value)
 
@@ -377,22 +390,27 @@ class OpaqueValue(CompositeValue):
     def value(self) -> bytes:
         self._raise_initialized()
         assert self._value is not None
+        if isinstance(self._value, memoryview):
+            self._value = self._value.tobytes()
         return self._value
 
     @property
     def bitstring(self) -> Bitstring:
         self._raise_initialized()
         assert self._value is not None
-        size = self.size
-        assert isinstance(size, Number)
-        if size.value == 0:
-            return Bitstring("")
-        return Bitstring(format(int.from_bytes(self._value, "big"), f"0{size}b"))
+        return Bitstring.from_bytes(self._value)
 
     @property
     def accepted_type(self) -> type:
         return bytes
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # memoryviews cannot be pickled
+        state = dict(self.__dict__)
+        if isinstance(self._value, memoryview):
+            state["_value"] = self._value.tobytes()
+        return state
+
 
 class ArrayValue(CompositeValue):
 
@@ -434,9 +452,9 @@ class ArrayValue(CompositeValue):
 
         self._value = value
 
-    def parse(self, value: Union[Bitstring, bytes], check: bool = True) -> None:
+    def parse(self, value: Union[Bitstring, bytes, memoryview], check: bool = True) -> None:
         self._check_size_of_assigned_value(value)
-        if isinstance(value, bytes):
+        if isinstance(value, (bytes, memoryview)):
             value = Bitstring.from_bytes(value)
         if self._is_message_array:
 
@@ -458,23 +476,30 @@ class ArrayValue(CompositeValue):
                 value = value[len(nested_message.bitstring) :]
 
         elif isinstance(self._element_type, Scalar):
-            value_str = str(value)
             type_size = self._element_type.size
             type_size_int = type_size.value
             new_value = []
 
-            while len(value_str) != 0:
+            for i in range(0, len(value), type_size_int):
                 nested_value = TypeValue.construct(
                     self._element_type, imported=self._element_type.package != self._type.package
                 )
-                nested_value.parse(Bitstring(value_str[:type_size_int]), check)
+                nested_value.parse(value[i : min(i + type_size_int, len(value))], check)
                 new_value.append(nested_value)
-                value_str = value_str[type_size_int:]
 
             self._value = new_value
         else:
             raise PyRFLXError(f"Arrays of {self._element_type.identifier} currently not supported")
 
+    def copy(self) -> "ArrayValue":
+        result = _shallow_copy(self)
+        result._value = list(self._value)
+        return result
+
+    def restore(self, other: TypeValue) -> None:
+        super().restore(other)
+        self._value = list(self._value)
+
     @property
     def size(self) -> Expr:
         if not self._value:
@@ -552,14 +577,25 @@ class MessageValue(TypeValue):
             }
         )
 
+        self._layout = (
+            state.layout
+            if state and state.layout
+            else MessageLayout(self._type, self.__type_literals)
+        )
+
         self.__message_first_name = First("Message")
         initial = self._fields[INITIAL.name]
         initial.first = Number(0)
         initial.typeval.assign(bytes())
-        self._simplified_mapping: Dict[Name, Expr] = dict.fromkeys(
-            [initial.name_size, initial.name_last, initial.name_first, self.__message_first_name],
-            Number(0),
-        )
+        self._simplified_mapping: Dict[Name, Expr] = {}
+        self._values: Dict[str, int] = {}
+        for name in [
+            initial.name_size,
+            initial.name_last,
+            initial.name_first,
+            self.__message_first_name,
+        ]:
+            self.__set_simplified_mapping(name, Number(0))
         self.accessible_fields: List[str] = []
         if self._skip_verification:
             self._last_field = INITIAL.name
@@ -567,11 +603,85 @@ class MessageValue(TypeValue):
             self._preset_fields(INITIAL.name)
         self.__message_last_name = Last("Message")
         self.__message_size_name = Size("Message")
+        self.__prototype: Optional[MessageValue] = None
+        self.__stream: Optional[MessageValue.Stream] = None
 
     def add_refinement(self, refinement: "RefinementValue") -> None:
         self._refinements = [*(self._refinements or []), refinement]
+        self.__prototype = None
 
     def clone(self) -> "MessageValue":
+        # the initial state is created once and copied for each new instance
+        prototype = self.__get_prototype()
+        result = prototype.copy()
+        result.__prototype = prototype
+        return result
+
+    def reset(self) -> None:
+        """Return to the initial state without creating new fields and values."""
+        prototype = self.__get_prototype()
+        for name, field in self._fields.items():
+            field.restore(prototype._fields[name])
+        self._simplified_mapping.clear()
+        self._simplified_mapping.update(prototype._simplified_mapping)
+        self._values.clear()
+        self._values.update(prototype._values)
+        self.accessible_fields[:] = prototype.accessible_fields
+        self._last_field = prototype._last_field
+        self.__stream = None
+
+    def __get_prototype(self) -> "MessageValue":
+        if self.__prototype is None:
+            self.__prototype = self.__initial_state()
+        return self.__prototype
+
+    def copy(self) -> "MessageValue":
+        result = _shallow_copy(self)
+        result._fields = {k: v.copy() for k, v in self._fields.items()}
+        result._simplified_mapping = dict(self._simplified_mapping)
+        result._values = dict(self._values)
+        result.accessible_fields = list(self.accessible_fields)
+        if self.__stream is not None:
+            result.__stream = replace(
+                self.__stream,
+                buffer=bytearray(self.__stream.buffer),
+                position=replace(self.__stream.position) if self.__stream.position else None,
+            )
+        return result
+
+    def _changes(self) -> "MessageValue.Changes":
+        """Return the attributes which differ from the initial state.
+
+        The changes contain only the values set since the instance was cloned, so they are much
+        cheaper to pickle than the whole instance, which also includes the message model.
+        """
+        prototype = self.__get_prototype()
+        return MessageValue.Changes(
+            {
+                name: (
+                    _changed_attributes(field, prototype._fields[name], {"typeval"}),
+                    _changed_attributes(field.typeval, prototype._fields[name].typeval),
+                )
+                for name, field in self._fields.items()
+            },
+            self._simplified_mapping,
+            self._values,
+            self.accessible_fields,
+            self._last_field,
+        )
+
+    def _apply(self, changes: "MessageValue.Changes") -> None:
+        """Apply the changes of another instance of the same message in the initial state."""
+        for name, (field_changes, typeval_changes) in changes.fields.items():
+            field = self._fields[name]
+            field.__dict__.update(field_changes)
+            field.typeval.__dict__.update(typeval_changes)
+        self._simplified_mapping = changes.simplified_mapping
+        self._values = changes.values
+        self.accessible_fields = changes.accessible_fields
+        self._last_field = changes.last_field
+
+    def __initial_state(self) -> "MessageValue":
         return MessageValue(
             self._type,
             self._refinements,
@@ -590,6 +700,7 @@ class MessageValue(TypeValue):
                 },
                 self._checksums,
                 self.__type_literals,
+                self._layout,
             ),
         )
 
@@ -601,6 +712,10 @@ class MessageValue(TypeValue):
     def equal_type(self, other: Type) -> bool:
         return self.identifier == other.identifier
 
+    @property
+    def model(self) -> Message:
+        return self._type
+
     def _valid_refinement_condition(self, refinement: "RefinementValue") -> bool:
         return self.__simplified(refinement.condition) == TRUE
 
@@ -610,12 +725,12 @@ class MessageValue(TypeValue):
         if self._skip_verification and self._fields[fld].next:
             return self._fields[fld].next
         if fld == INITIAL.name:
-            links = self._type.outgoing(INITIAL)
-            return links[0].target.name if links else FINAL.name
+            links = self._layout.outgoing(INITIAL.name)
+            return links[0].link.target.name if links else FINAL.name
 
-        for l in self._type.outgoing(Field(fld)):
-            if self.__simplified(l.condition) == TRUE:
-                return l.target.name
+        for l in self._layout.outgoing(fld):
+            if l.condition(self._values) is True:
+                return l.link.target.name
         return ""
 
     def _prev_field(self, fld: str) -> str:
@@ -624,9 +739,9 @@ class MessageValue(TypeValue):
         if self._skip_verification:
             return self._fields[fld].prev
         prev: List[str] = [
-            l.source.name
-            for l in self._type.incoming(Field(fld))
-            if self.__simplified(l.condition) == TRUE
+            l.link.source.name
+            for l in self._layout.incoming(fld)
+            if l.condition(self._values) is True
         ]
 
         if len(prev) == 1:
@@ -641,23 +756,21 @@ class MessageValue(TypeValue):
         if isinstance(typeval, ScalarValue):
             return typeval.size
         assert isinstance(typeval, CompositeValue)
-        for l in self._type.incoming(Field(fld)):
+        for l in self._layout.incoming(fld):
             if (
-                self._fields[l.source.name].set
-                and l.size != UNDEFINED
-                and (self._skip_verification or self.__simplified(l.condition) == TRUE)
+                self._fields[l.link.source.name].set
+                and l.link.size != UNDEFINED
+                and (self._skip_verification or l.condition(self._values) is True)
             ):
-                size = self.__simplified(l.size)
-                return size if isinstance(size, Number) else None
+                return number(l.size(self._values))
         return None
 
     def _get_first(self, fld: str) -> Optional[Number]:
-        for l in self._type.incoming(Field(fld)):
-            if l.first != UNDEFINED and (
-                self._skip_verification or self.__simplified(l.condition) == TRUE
+        for l in self._layout.incoming(fld):
+            if l.link.first != UNDEFINED and (
+                self._skip_verification or l.condition(self._values) is True
             ):
-                first = self.__simplified(l.first)
-                return first if isinstance(first, Number) else None
+                return number(l.first(self._values))
         prv = self._prev_field(fld)
         if self._skip_verification and prv:
             first = self._fields[prv].first
@@ -665,9 +778,11 @@ class MessageValue(TypeValue):
             assert isinstance(first, Number)
             assert isinstance(size, Number)
             return first + size
-        if prv and UNDEFINED not in (self._fields[prv].first, self._fields[prv].typeval.size):
-            first = self.__simplified(Add(self._fields[prv].first, self._fields[prv].typeval.size))
-            return first if isinstance(first, Number) else None
+        if prv:
+            first = self._fields[prv].first
+            size = self._fields[prv].typeval.size
+            if isinstance(first, Number) and isinstance(size, Number):
+                return first + size
         return None
 
     @property
@@ -681,70 +796,159 @@ class MessageValue(TypeValue):
     def assign(self, value: bytes, check: bool = True) -> None:
         raise NotImplementedError
 
-    def parse(self, value: Union[Bitstring, bytes], check: bool = True) -> None:
+    def restore(self, other: TypeValue) -> None:
+        raise NotImplementedError
+
+    def parse(self, value: Union[Bitstring, bytes, memoryview], check: bool = True) -> None:
+        """Parse the message from the given data.
+
+        A bytes object or a memoryview of a bytes object is not copied, the values of byte aligned
+        fields refer to it. Any other buffer, e.g., a bytearray or a memoryview of a bytearray, is
+        copied, so that later changes of the buffer do not affect the parsed message.
+        """
         assert not self._skip_verification
-        if isinstance(value, bytes):
-            value = Bitstring.from_bytes(value)
-        current_field_name = self._next_field(INITIAL.name)
-        last_field_first_in_bitstr = current_field_first_in_bitstr = 0
+        self.__stream = None
+        data = _MessageData(value)
+        self.__parse_fields(data, self.__parse_static_prefix(data), False)
+
+    def feed(self, chunk: Union[bytes, memoryview]) -> int:
+        """Append a chunk of data to the message and parse all fields which are complete.
+
+        Parsing is resumed at the first field which has not been parsed yet. The result is the
+        number of bits which are at least missing before parsing can be continued, or 0 if the
+        message is complete. Messages which contain fields whose size depends on the size of the
+        message can only be fed if the message can also be completed without such a field.
+        """
+        assert not self._skip_verification
+        if self.__stream is None:
+            if not self._layout.incremental:
+                raise PyRFLXError(
+                    f"cannot parse message {self.identifier} incrementally: size of "
+                    + ", ".join(self._layout.end_dependent_fields)
+                    + " depends on end of message"
+                )
+            self.__stream = MessageValue.Stream(bytearray())
+        stream = self.__stream
+        stream.buffer += chunk
+        stream.missing -= len(chunk) * 8
+        if stream.missing > 0 or (stream.position and stream.position.field == FINAL.name):
+            return max(stream.missing, 0)
+
+        data = _MessageData(bytes(stream.buffer), stream.offset)
+        if stream.position is None:
+            stream.position = self.__parse_static_prefix(data)
+            if stream.position is None:
+                stream.missing = max(
+                    first + size for _, first, size in self._layout.static_prefix
+                ) - (data.length)
+                return stream.missing
+        try:
+            stream.missing = self.__parse_fields(data, stream.position, True)
+        finally:
+            # the data preceding the current field is not needed anymore
+            consumed = stream.position.last // 8 - stream.offset // 8
+            del stream.buffer[:consumed]
+            stream.offset += consumed * 8
+        return stream.missing
+
+    @property
+    def unparsed_data(self) -> bytes:
+        """Return the fed data following the message, if the message is complete."""
+        if self.__stream is None:
+            return b""
+        position = self.__stream.position
+        if position is None or position.field != FINAL.name:
+            return b""
+        return bytes(self.__stream.buffer[(position.current - self.__stream.offset) // 8 :])
+
+    def __parse_static_prefix(self, data: "_MessageData") -> Optional["MessageValue.Position"]:
+        # the values of all fields at static positions are extracted from a single integer
+        # and the message state is updated only once after all of these fields have been set
+        prefix = self._layout.static_prefix
+        if not prefix or self._checksums:
+            return MessageValue.Position(self._next_field(INITIAL.name))
+        end = max(first + size for _, first, size in prefix)
+        if data.length < end:
+            return None
+        value = data.integer(end)
+
+        parsed = MessageValue.Position(INITIAL.name)
+        try:
+            for name, first, size in prefix:
+                field = self._fields[name]
+                field.first = Number(first)
+                try:
+                    field.typeval.parse(
+                        Bitstring.from_int(
+                            (value >> (end - first - size)) & ((1 << size) - 1), size
+                        )
+                    )
+                except PyRFLXError as e:
+                    e.appendleft(
+                        f"cannot set value for field {name}",
+                        Subsystem.PYRFLX,
+                        Severity.ERROR,
+                    )
+                    raise e
+                parsed = MessageValue.Position(name, first, first + size)
+        finally:
+            if parsed.field != INITIAL.name:
+                self.__update_simplified_mapping()
+                self._preset_fields(parsed.field)
+        parsed.field = self._next_field(parsed.field)
+        return parsed
+
+    def __parse_fields(
+        self,
+        data: "_MessageData",
+        position: Optional["MessageValue.Position"],
+        incremental: bool,
+    ) -> int:
+        position = position or MessageValue.Position(self._next_field(INITIAL.name))
 
         def get_current_pos_in_bitstr(field_name: str) -> int:
             # if the previous node is a virtual node i.e. has the same first as the current node
             # set the current pos in bitstring back to the first position of its predecessor
+            assert position
             this_first = self._fields[field_name].first
             prev_first = self._fields[self._prev_field(field_name)].first
 
             if not isinstance(prev_first, Number) or not isinstance(this_first, Number):
-                return current_field_first_in_bitstr
+                return position.current
 
-            return (
-                last_field_first_in_bitstr
-                if prev_first.value == this_first.value
-                else current_field_first_in_bitstr
-            )
-
-        def set_field_without_size(field_name: str, field: MessageValue.Field) -> Tuple[int, int]:
-            last_pos_in_bitstr = current_pos_in_bitstring = get_current_pos_in_bitstr(field_name)
-            assert isinstance(field.typeval, OpaqueValue)
-            first = self._get_first(field_name)
-            assert first is not None
-            field.first = first
-            self.set(field_name, value[current_pos_in_bitstring:])
-            return last_pos_in_bitstr, current_pos_in_bitstring
-
-        def set_field_with_size(field_name: str, field_size: int) -> Tuple[int, int]:
-            assert isinstance(value, Bitstring)
-            last_pos_in_bitstr = current_pos_in_bitstring = get_current_pos_in_bitstr(field_name)
-            self.set(
-                field_name,
-                value[current_pos_in_bitstring : current_pos_in_bitstring + field_size],
-            )
-            current_pos_in_bitstring += field_size
-            return last_pos_in_bitstr, current_pos_in_bitstring
+            return position.last if prev_first.value == this_first.value else position.current
 
-        while current_field_name != FINAL.name:
-            current_field = self._fields[current_field_name]
-            size = self._get_size(current_field_name)
+        while position.field != FINAL.name:
+            current_field = self._fields[position.field]
+            size = self._get_size(position.field)
+            if size is None and incremental:
+                raise PyRFLXError(
+                    f"cannot parse field {position.field} incrementally:"
+                    " size depends on end of message"
+                )
             if isinstance(current_field.typeval, OpaqueValue) and size is None:
-                (
-                    last_field_first_in_bitstr,
-                    current_field_first_in_bitstr,
-                ) = set_field_without_size(current_field_name, current_field)
+                start = get_current_pos_in_bitstr(position.field)
+                first = self._get_first(position.field)
+                assert first is not None
+                current_field.first = first
+                self.set(position.field, data.value(start))
+                position.last = position.current = start
 
             else:
                 assert size is not None
-                current_field_size = size.value
-                try:
-                    (
-                        last_field_first_in_bitstr,
-                        current_field_first_in_bitstr,
-                    ) = set_field_with_size(current_field_name, current_field_size)
-                except IndexError:
+                start = get_current_pos_in_bitstr(position.field)
+                if start + size.value > data.length:
+                    if incremental:
+                        return start + size.value - data.length
                     raise PyRFLXError(
                         f"Bitstring representing the message is too short - "
-                        f"stopped while parsing field: {current_field_name}"
-                    ) from None
-            current_field_name = self._next_field(current_field_name)
+                        f"stopped while parsing field: {position.field}"
+                    )
+                self.set(position.field, data.value(start, size.value))
+                position.last, position.current = start, start + size.value
+            position.field = self._next_field(position.field)
+
+        return 0
 
     def _set_unchecked(
         self, field_name: str, value: Union[bytes, int, str, Sequence[TypeValue]]
@@ -766,7 +970,7 @@ class MessageValue(TypeValue):
     def set(
         self,
         field_name: str,
-        value: Union[bytes, int, str, Sequence[TypeValue], Bitstring],
+        value: Union[bytes, int, str, Sequence[TypeValue], Bitstring, memoryview],
         checksum_calculation: bool = True,
     ) -> None:
         def set_refinement(fld: MessageValue.Field, fld_name: str) -> None:
@@ -780,19 +984,17 @@ class MessageValue(TypeValue):
                         fld.typeval.set_refinement(ref.sdu)
 
         def check_outgoing_condition_satisfied() -> None:
-            if all(
-                self.__simplified(o.condition) == FALSE
-                for o in self._type.outgoing(Field(field_name))
-            ):
+            if all(o.condition(self._values) is False for o in self._layout.outgoing(field_name)):
                 self._fields[field_name].typeval.clear()
                 raise PyRFLXError(
                     f"none of the field conditions "
                     f"{[str(o.condition) for o in self._type.outgoing(Field(field_name))]}"
-                    f" for field {field_name} have been met by the assigned value: {value!s}"
+                    f" for field {field_name} have been met by the assigned value: "
+                    f"{Bitstring.from_bytes(value) if isinstance(value, memoryview) else value!s}"
                 )
 
         if self._skip_verification:
-            assert not isinstance(value, Bitstring)
+            assert not isinstance(value, (Bitstring, memoryview))
             self._set_unchecked(field_name, value)
             return
 
@@ -816,7 +1018,7 @@ class MessageValue(TypeValue):
                 field.typeval.set_expected_size(field_size)
             set_refinement(field, field_name)
             try:
-                if isinstance(value, Bitstring):
+                if isinstance(value, (Bitstring, memoryview)):
                     field.typeval.parse(value)
                 elif isinstance(value, field.typeval.accepted_type):
                     field.typeval.assign(value)
@@ -857,7 +1059,7 @@ class MessageValue(TypeValue):
             if first is None:
                 break
 
-            if (self.__simplified(self._type.field_condition(Field(nxt))) == TRUE) and (
+            if (self._layout.field_condition(nxt)(self._values) is True) and (
                 self._is_valid_opaque_field(nxt)
                 if isinstance(self._fields[nxt].typeval, OpaqueValue)
                 else size is not None
@@ -962,7 +1164,7 @@ class MessageValue(TypeValue):
 
     def update_checksums(self) -> None:
         for checksum in self._checksums.values():
-            self._simplified_mapping[ValidChecksum(checksum.field_name)] = TRUE
+            self.__set_simplified_mapping(ValidChecksum(checksum.field_name), TRUE)
             self._is_checksum_settable(checksum)
             checksum_value = self._calculate_checksum(checksum)
             self._fields[checksum.field_name].typeval.assign(checksum_value)
@@ -1015,7 +1217,7 @@ class MessageValue(TypeValue):
 
     @property
     def bitstring(self) -> Bitstring:
-        bits = ""
+        bits = Bitstring()
         field = self._next_field(INITIAL.name)
         while field and field != FINAL.name:
             field_val = self._fields[field]
@@ -1025,21 +1227,19 @@ class MessageValue(TypeValue):
                 or not field_val.first.value <= len(bits)
             ):
                 break
-            bits = f"{bits[: field_val.first.value]}{str(self._fields[field].typeval.bitstring)}"
+            bits = bits[: field_val.first.value] + self._fields[field].typeval.bitstring
             field = self._next_field(field)
 
-        return Bitstring(bits)
+        return bits
 
     @property
     def value(self) -> Any:
         raise NotImplementedError
 
     def _unchecked_bytestring(self) -> bytes:
-        bits = str(self.bitstring)
+        bits = self.bitstring
         assert len(bits) % 8 == 0
-        return b"".join(
-            [int(bits[i : i + 8], 2).to_bytes(1, "big") for i in range(0, len(bits), 8)]
-        )
+        return bytes(bits)
 
     @property
     def bytestring(self) -> bytes:
@@ -1054,15 +1254,13 @@ class MessageValue(TypeValue):
     def _is_valid_opaque_field(self, field: str) -> bool:
 
         assert isinstance(self._fields[field].typeval, CompositeValue)
-        incoming = self._type.incoming(Field(field))
-
-        for l in incoming:
+        for l in self._layout.incoming(field):
             if (
-                l.size != UNDEFINED
-                and self._fields[l.source.name].set
-                and self.__simplified(l.condition) == TRUE
+                l.link.size != UNDEFINED
+                and self._fields[l.link.source.name].set
+                and l.condition(self._values) is True
             ):
-                valid_edge = l
+                valid_edge = l.link
                 break
         else:
             return False
@@ -1079,10 +1277,8 @@ class MessageValue(TypeValue):
             for f in self.accessible_fields
             if (
                 self._fields[f].set
-                and self.__simplified(self._type.field_condition(Field(f))) == TRUE
-                and any(
-                    self.__simplified(o.condition) == TRUE for o in self._type.outgoing(Field(f))
-                )
+                and self._layout.field_condition(f)(self._values) is True
+                and any(o.condition(self._values) is True for o in self._layout.outgoing(f))
             )
         ]
 
@@ -1107,26 +1303,28 @@ class MessageValue(TypeValue):
     def __update_simplified_mapping(self, field: Optional[Field] = None) -> None:
         if field:
             if isinstance(field.typeval, ScalarValue):
-                self._simplified_mapping[field.name_variable] = field.typeval.expr
+                self.__set_simplified_mapping(field.name_variable, field.typeval.expr)
             last = field.last
             assert isinstance(last, Number)
-            self._simplified_mapping[field.name_size] = field.typeval.size
-            self._simplified_mapping[field.name_first] = field.first
-            self._simplified_mapping[field.name_last] = last
-            self._simplified_mapping[self.__message_last_name] = last
-            self._simplified_mapping[self.__message_size_name] = last + Number(1)
+            self.__set_simplified_mapping(field.name_size, field.typeval.size)
+            self.__set_simplified_mapping(field.name_first, field.first)
+            self.__set_simplified_mapping(field.name_last, last)
+            self.__set_simplified_mapping(self.__message_last_name, last)
+            self.__set_simplified_mapping(self.__message_size_name, last + Number(1))
             return
 
-        self._simplified_mapping = {self.__message_first_name: Number(0)}
+        self._simplified_mapping = {}
+        self._values = {}
+        self.__set_simplified_mapping(self.__message_first_name, Number(0))
         for v in self._fields.values():
             if isinstance(v.typeval, ScalarValue) and v.set:
-                self._simplified_mapping[v.name_variable] = v.typeval.expr
+                self.__set_simplified_mapping(v.name_variable, v.typeval.expr)
             if isinstance(v.typeval, ScalarValue) or v.set:
-                self._simplified_mapping[v.name_size] = v.typeval.size
+                self.__set_simplified_mapping(v.name_size, v.typeval.size)
             if isinstance(v.first, Number):
-                self._simplified_mapping[v.name_first] = v.first
+                self.__set_simplified_mapping(v.name_first, v.first)
             if isinstance(v.last, Number):
-                self._simplified_mapping[v.name_last] = v.last
+                self.__set_simplified_mapping(v.name_last, v.last)
 
         nxt = self._next_field(INITIAL.name)
         while nxt:
@@ -1137,12 +1335,21 @@ class MessageValue(TypeValue):
                 break
             if nxt:
                 continue
-            if any(l.target == FINAL for l in self._type.outgoing(Field(last_field))):
-                self._simplified_mapping[self.__message_last_name] = last
-                self._simplified_mapping[self.__message_size_name] = last + Number(1)
+            if any(l.link.target == FINAL for l in self._layout.outgoing(last_field)):
+                self.__set_simplified_mapping(self.__message_last_name, last)
+                self.__set_simplified_mapping(self.__message_size_name, last + Number(1))
 
         # ISSUE: Componolit/RecordFlux#422
-        self._simplified_mapping.update({ValidChecksum(f): TRUE for f in self._checksums})
+        for f in self._checksums:
+            self.__set_simplified_mapping(ValidChecksum(f), TRUE)
+
+    def __set_simplified_mapping(self, name: Name, expr: Expr) -> None:
+        self._simplified_mapping[name] = expr
+        value = constant_value(expr, self.__type_literals)
+        if value is None:
+            self._values.pop(key(name), None)
+        else:
+            self._values[key(name)] = value
 
     def __simplified(self, expr: Expr) -> Expr:
         if expr in {TRUE, FALSE}:
@@ -1160,20 +1367,20 @@ class MessageValue(TypeValue):
         return expr.substituted(func=subst).substituted(func=subst).simplified()
 
     class Checksum:
+        @dataclass
+        class ExpressionTuple:
+            expression: Expr
+            evaluated_expression: Expr = UNDEFINED
+
         def __init__(self, field_name: str, parameters: Sequence[Expr]):
             self.field_name = field_name
             self.function: Optional[Callable] = None
             self.calculated = False
 
-            @dataclass
-            class ExpressionTuple:
-                expression: Expr
-                evaluated_expression: Expr = UNDEFINED
-
-            self.parameters: List[ExpressionTuple] = []
+            self.parameters: List[MessageValue.Checksum.ExpressionTuple] = []
             for expr in parameters:
                 assert isinstance(expr, (ValueRange, Attribute, Variable))
-                self.parameters.append(ExpressionTuple(expr))
+                self.parameters.append(self.ExpressionTuple(expr))
 
     @dataclass
     class Field(Base):
@@ -1245,11 +1452,119 @@ class MessageValue(TypeValue):
         def last(self) -> Expr:
             return self.__last if self.__is_scalar else self._last()
 
+        def copy(self) -> "MessageValue.Field":
+            result = _shallow_copy(self)
+            result.typeval = self.typeval.copy()
+            return result
+
+        def restore(self, other: "MessageValue.Field") -> None:
+            typeval = self.typeval
+            self.__dict__.update(other.__dict__)
+            self.typeval = typeval
+            typeval.restore(other.typeval)
+
+    @dataclass
+    class Position:
+        field: str
+        last: int = 0
+        current: int = 0
+
+    @dataclass
+    class Stream:
+        buffer: bytearray
+        # position of the first byte of the buffer in the message in bits
+        offset: int = 0
+        position: Optional["MessageValue.Position"] = None
+        missing: int = 0
+
     @dataclass
     class State:
         fields: Optional[Mapping[str, "MessageValue.Field"]] = None
         checksums: Optional[Mapping[str, "MessageValue.Checksum"]] = None
         type_literals: Optional[Mapping[Name, Expr]] = None
+        layout: Optional[MessageLayout] = None
+
+    @dataclass
+    class Changes:
+        fields: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]]
+        simplified_mapping: Dict[Name, Expr]
+        values: Dict[str, int]
+        accessible_fields: List[str]
+        last_field: str
+
+
+T = TypeVar("T")
+
+
+def _shallow_copy(obj: T) -> T:
+    result = obj.__class__.__new__(obj.__class__)
+    result.__dict__.update(obj.__dict__)
+    return result
+
+
+def _changed_attributes(obj: object, original: object, ignored: Set[str] = None) -> Dict[str, Any]:
+    # copies share all attributes with the original until they are reassigned, the state defined
+    # for pickling is used, as some attributes are not picklable (e.g. memoryviews)
+    getstate = getattr(obj, "__getstate__", None)
+    state: Dict[str, Any] = getstate() if getstate else obj.__dict__
+    return {
+        k: v
+        for k, v in state.items()
+        if (not ignored or k not in ignored)
+        and (k not in original.__dict__ or original.__dict__[k] is not obj.__dict__[k])
+    }
+
+
+def _readonly_buffer(value: Union[bytes, memoryview]) -> memoryview:
+    # only buffers of bytes objects are used without copying, as the parsed values refer to the
+    # buffer: a buffer of a mutable object could be changed later, and the object could not be
+    # resized as long as the buffer is exported
+    if isinstance(value, memoryview) and isinstance(value.obj, bytes):
+        return value.cast("B") if value.format != "B" else value
+    return memoryview(bytes(value))
+
+
+class _MessageData:
+    def __init__(self, value: Union[Bitstring, bytes, memoryview], offset: int = 0) -> None:
+        # the data starts at the given byte aligned bit position of the message
+        assert offset % 8 == 0
+        self.__offset = offset
+        self.__buffer: Optional[memoryview] = None
+        self.__bits: Optional[Bitstring] = None
+        if isinstance(value, Bitstring):
+            self.__bits = value
+            self.length = offset + len(value)
+        else:
+            self.__buffer = _readonly_buffer(value)
+            self.length = offset + len(self.__buffer) * 8
+
+    def value(self, start: int, size: int = None) -> Union[Bitstring, memoryview]:
+        # byte aligned fields are passed as views into the buffer, all other fields are
+        # extracted from a bitstring which is only created if it is needed
+        stop = self.length if size is None else start + size
+        start -= self.__offset
+        stop -= self.__offset
+        assert start >= 0
+        if self.__buffer is not None and start % 8 == 0 and stop % 8 == 0:
+            return self.__buffer[start // 8 : stop // 8]
+        if self.__bits is None:
+            assert self.__buffer is not None
+            self.__bits = Bitstring.from_bytes(self.__buffer)
+        return self.__bits[start:stop]
+
+    def integer(self, size: int) -> int:
+        """Return the value of the first bits."""
+        assert self.__offset == 0
+        if self.__buffer is None:
+            assert self.__bits is not None
+            return int(self.__bits[:size])
+        return int.from_bytes(self.__buffer[: -(-size // 8)], "big") >> (-size % 8)
+
+
+def _int_value(value: Union[Bitstring, bytes, memoryview]) -> int:
+    if isinstance(value, Bitstring):
+        return int(value)
+    return int.from_bytes(value, "big")
 
 
 class RefinementValue:
@@ -1 +1 @@
-from .parser import Parser  # noqa: F401
+from .parser import Parser, Workspace  # noqa: F401
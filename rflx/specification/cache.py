@@ -1,59 +1,750 @@
 import hashlib
+import hmac
+import http.server
 import json
+import logging
+import os
 import pathlib
-from typing import Dict
+import pickle
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
-from rflx import __version__
-from rflx.model.message import AbstractMessage
+import z3
+
+from rflx import __version__, model
+from rflx.expression import ProofCache, ProofResult
+
+log = logging.getLogger(__name__)
 
 CACHE_DIR = pathlib.Path.home() / ".cache" / "RecordFlux"
-VERIFICATION_FILE = "verification.json"
+CACHE_DIR_VARIABLE = "RFLX_CACHE_DIR"
+CACHE_URL_VARIABLE = "RFLX_CACHE_URL"
+CACHE_TOKEN_VARIABLE = "RFLX_CACHE_TOKEN"
+VERIFICATION_FILE = "verification.db"
+SPECIFICATION_DIRECTORY = "specifications"
+SPECIFICATION_KEY_FILE = ".key"
+SPECIFICATION_KEY_SIZE = 32
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+MAX_ENTRIES = 100000
+MAX_SPECIFICATIONS = 1000
+TIMEOUT = 60
+HTTP_TIMEOUT = 10
+FETCH_CHUNK_SIZE = 500
+MAX_REQUEST_SIZE = 32 * 1024 ** 2
 
+# The format of the stored keys. It must be changed if the translation of expressions into Z3
+# changes, as otherwise results of an incompatible version of RecordFlux would be used.
+KEY_FORMAT = 1
+# The results of proofs depend on the translation of expressions and on the solver, so that the
+# versions of both are part of each key.
+KEY_VERSION = f"{KEY_FORMAT}|{__version__}|{z3.get_version_string()}"
+# The format of the stored specifications. It must be changed if the representation of types or
+# sessions changes, as otherwise entries of an incompatible version of RecordFlux would be used.
+SPECIFICATION_FORMAT = 1
 
-class Cache:
-    def __init__(self, enabled: bool = True) -> None:
-        self._enabled = enabled
 
-        if not enabled:
+class Backend(ABC):
+    """Storage of proof results."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch(self, keys: Sequence[str]) -> Dict[str, ProofResult]:
+        """Return the stored results of the given keys."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def store(self, results: Mapping[str, ProofResult], used: Iterable[str]) -> None:
+        """Store new results and mark the given stored results as recently used."""
+        raise NotImplementedError
+
+
+class SQLiteBackend(Backend):
+    """Store proof results in a local database.
+
+    The database can be shared by concurrent processes. It is used in write-ahead logging mode, so
+    that readers are not blocked by a writer, and all changes of a store are written in a single
+    transaction. The least recently used entries are evicted if the number of entries exceeds the
+    maximum.
+    """
+
+    def __init__(self, file: pathlib.Path, max_entries: int = MAX_ENTRIES) -> None:
+        self._file = file
+        self._max_entries = max_entries
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        return state
+
+    def __len__(self) -> int:
+        connection = self._connect(create=False)
+        return connection.execute("SELECT COUNT(*) FROM proofs").fetchone()[0] if connection else 0
+
+    def fetch(self, keys: Sequence[str]) -> Dict[str, ProofResult]:
+        connection = self._connect(create=False)
+        if connection is None:
+            return {}
+
+        results = {}
+
+        for i in range(0, len(keys), FETCH_CHUNK_SIZE):
+            chunk = keys[i : i + FETCH_CHUNK_SIZE]
+            rows = connection.execute(
+                f"SELECT key, result FROM proofs WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            results.update({key: ProofResult[result] for key, result in rows})
+
+        return results
+
+    def store(self, results: Mapping[str, ProofResult], used: Iterable[str]) -> None:
+        now = time.time()
+
+        try:
+            connection = self._connect(create=True)
+            assert connection is not None
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO proofs VALUES (?, ?, ?)",
+                    [(key, result.name, now) for key, result in results.items()],
+                )
+                connection.executemany(
+                    "UPDATE proofs SET used = ? WHERE key = ?", [(now, key) for key in used]
+                )
+                connection.execute(
+                    "DELETE FROM proofs WHERE key IN"
+                    " (SELECT key FROM proofs ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,),
+                )
+        except sqlite3.OperationalError as e:
+            log.warning("Unable to update verification cache %s: %s", self._file, e)
+
+    def _connect(self, create: bool) -> Optional[sqlite3.Connection]:
+        if self._connection is not None:
+            return self._connection
+
+        if not create and not self._file.exists():
+            return None
+
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            self._connection = self._open(self._file)
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError:
+            log.warning("Replacing invalid verification cache %s", self._file)
+            self._replace()
+            self._connection = self._open(self._file)
+
+        return self._connection
+
+    def _replace(self) -> None:
+        """Replace the database file by an empty database.
+
+        The new database is created beside the invalid file and atomically renamed, so that
+        concurrent processes never see a partially initialized database.
+        """
+        fd, name = tempfile.mkstemp(prefix=f".{self._file.name}.", dir=self._file.parent)
+        os.close(fd)
+        temporary = pathlib.Path(name)
+        try:
+            self._open(temporary).close()
+            os.replace(temporary, self._file)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+
+    @staticmethod
+    def _open(file: pathlib.Path) -> sqlite3.Connection:
+        # the connection may be used by different threads of a cache server, which serializes all
+        # accesses to the backend
+        connection = sqlite3.connect(str(file), timeout=TIMEOUT, check_same_thread=False)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS proofs"
+                " (key TEXT PRIMARY KEY, result TEXT NOT NULL, used REAL NOT NULL)"
+            )
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+
+class HTTPBackend(Backend):
+    """Store proof results on a cache server (cf. `CacheServer`).
+
+    If the server cannot be accessed or sends an invalid response, a warning is logged and the
+    server is not used anymore by this backend, so that an unavailable or faulty server does not
+    slow down or break the verification. If the server is read-only, only the storing of results
+    is omitted. The token is sent to servers which
+    require authentication.
+    """
+
+    def __init__(self, url: str, timeout: float = HTTP_TIMEOUT, token: str = None) -> None:
+        self._url = url.rstrip("/")
+        self._timeout = timeout
+        self._token = token
+        self._available = True
+        self._writable = True
+
+    def __len__(self) -> int:
+        response = self._request("count")
+        try:
+            return int(response.get("count", 0))
+        except (TypeError, ValueError) as e:
+            self._disable(e)
+            return 0
+
+    def fetch(self, keys: Sequence[str]) -> Dict[str, ProofResult]:
+        if not keys:
+            return {}
+        response = self._request("fetch", {"keys": list(keys)})
+        try:
+            return {
+                str(key): ProofResult[result] for key, result in response.get("results", {}).items()
+            }
+        except (AttributeError, KeyError, TypeError) as e:
+            self._disable(e)
+            return {}
+
+    def store(self, results: Mapping[str, ProofResult], used: Iterable[str]) -> None:
+        if not self._writable:
             return
+        self._request(
+            "store",
+            {
+                "results": {key: result.name for key, result in results.items()},
+                "used": list(used),
+            },
+        )
+
+    def _request(self, path: str, data: Mapping[str, Any] = None) -> Dict[str, Any]:
+        if not self._available:
+            return {}
 
-        self._verification: Dict[str, str] = {}
+        headers = {"Content-Type": "application/json"}
+        if self._token:
+            headers["Authorization"] = f"Bearer {self._token}"
+        request = urllib.request.Request(
+            f"{self._url}/{path}",
+            data=json.dumps(data).encode("utf-8") if data is not None else None,
+            headers=headers,
+        )
 
-        self._load_cache()
+        try:
+            with urllib.request.urlopen(request, timeout=self._timeout) as response:
+                result = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 403 and path == "store":
+                log.warning("Verification cache %s is read-only", self._url)
+                self._writable = False
+                return {}
+            self._disable(e)
+            return {}
+        except (OSError, ValueError) as e:
+            self._disable(e)
+            return {}
+
+        if not isinstance(result, dict):
+            self._disable(f"invalid response {result!r}")
+            return {}
+
+        return result
+
+    def _disable(self, reason: object) -> None:
+        log.warning("Unable to access verification cache %s: %s", self._url, reason)
+        self._available = False
+
+
+class Cache(ProofCache):
+    """Persistent cache of proof results.
+
+    Each result is stored under the structural hash of its proof obligation, so that a change of a
+    message only invalidates the proofs which are actually affected by the change. The hash only
+    depends on the text of the proof obligation, so that results can be shared between machines.
+    New results are collected in memory and written to the backend by `flush`.
+
+    By default, the results are stored in a local database in the cache directory (cf.
+    `cache_directory`). If `url` or the environment variable RFLX_CACHE_URL is set, the results
+    are stored on the cache server with the given URL instead. The token set by RFLX_CACHE_TOKEN is
+    used to authenticate at the server.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        enabled: bool = True,
+        max_entries: int = MAX_ENTRIES,
+        directory: pathlib.Path = None,
+        url: str = None,
+        backend: Backend = None,
+    ) -> None:
+        self._enabled = enabled
+        self._backend = backend or default_backend(max_entries, directory, url)
+        self._fetched: Dict[str, ProofResult] = {}
+        self._added: Dict[str, ProofResult] = {}
+        self._used: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._backend) + len(self._added)
 
-    def is_verified(self, message: AbstractMessage) -> bool:
+    def get(self, key: str) -> Optional[ProofResult]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, ProofResult]:
+        """Return the known results of the given keys, fetching all unknown keys at once."""
+        if not self._enabled:
+            return {}
+
+        versioned_keys = {self._versioned_key(k): k for k in keys}
+        missing = [k for k in versioned_keys if k not in self._added and k not in self._fetched]
+
+        if missing:
+            fetched = self._backend.fetch(missing)
+            self._fetched.update(fetched)
+            self._used.update(fetched)
+
+        results = {}
+
+        for versioned_key, key in versioned_keys.items():
+            result = self._added.get(versioned_key, self._fetched.get(versioned_key))
+            if result is not None:
+                results[key] = result
+
+        return results
+
+    def add(self, key: str, result: ProofResult) -> None:
         if not self._enabled:
-            return False
+            return
 
-        return message.full_name in self._verification and self._verification[
-            message.full_name
-        ] == self._message_hash(message)
+        self._added[self._versioned_key(key)] = result
 
-    def add_verified(self, message: AbstractMessage) -> None:
+    def merge(self, other: "Cache") -> None:
+        """Take over the results which were added to or used from another cache, e.g., by a worker
+        process, so that they are written by the next flush of this cache."""
         if not self._enabled:
             return
 
-        message_hash = self._message_hash(message)
-        if (
-            message.full_name not in self._verification
-            or message_hash != self._verification[message.full_name]
+        self._added.update(other._added)
+        self._used |= other._used
+
+    def flush(self) -> None:
+        if not self._added and not self._used:
+            return
+
+        self._backend.store(self._added, self._used - self._added.keys())
+
+        self._fetched.update(self._added)
+        self._added = {}
+        self._used = set()
+
+    @staticmethod
+    def _versioned_key(key: str) -> str:
+        return hashlib.sha256(f"{KEY_VERSION}|{key}".encode("utf-8")).hexdigest()
+
+
+class SpecificationCache:
+    """Persistent cache of the types and sessions declared in specification files.
+
+    An entry is stored under a key derived from the path and the content of a specification file
+    and the keys of all specifications it depends on, so that an entry is invalidated by a change
+    of the file or any of its dependencies. The names of the files a specification depends on are
+    stored separately as JSON under a key derived from the specification file only, so that the
+    dependencies can be determined without parsing the file. Each entry is stored in a separate
+    file, which is replaced atomically, so that the cache can be shared by concurrent processes.
+    The least recently used entries are removed if the number of entries exceeds the maximum.
+
+    The types and sessions are serialized by pickle. As loading a pickle can execute arbitrary
+    code, and the dependencies determine which specifications are not parsed, each entry is signed
+    by a secret key, which is created on first use and only accessible by its owner. Entries with
+    an invalid signature are ignored, and the cache is disabled if the key is accessible by other
+    users.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = MAX_SPECIFICATIONS,
+        directory: pathlib.Path = None,
+    ) -> None:
+        self._enabled = enabled
+        self._max_entries = max_entries
+        self._directory = cache_directory(directory) / SPECIFICATION_DIRECTORY
+        self._secret: Optional[bytes] = None
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def key(self, filename: pathlib.Path, dependencies: Sequence[str]) -> Optional[str]:
+        """Return the key of a specification file or None if the file cannot be read."""
+        source = self._source_key(filename)
+
+        if source is None:
+            return None
+
+        key = hashlib.sha256(f"{SPECIFICATION_FORMAT}|{source}|".encode("utf-8"))
+        for dependency in dependencies:
+            key.update(dependency.encode("utf-8"))
+        return key.hexdigest()
+
+    def get(
+        self, key: str, verified: bool = True
+    ) -> Optional[Tuple[List[model.Type], List[model.Session]]]:
+        """Return the types and sessions stored under the given key.
+
+        If `verified` is set, results which were stored without verifying the messages are
+        ignored.
+        """
+        content = self._read_signed(key)
+
+        if content is None:
+            return None
+
+        try:
+            entry_verified, types, sessions = pickle.loads(content)
+        except (
+            EOFError,
+            pickle.PickleError,
+            AttributeError,
+            ImportError,
+            TypeError,
+            ValueError,
+        ) as e:
+            log.warning("Ignoring invalid specification cache entry %s: %s", key, e)
+            return None
+
+        if verified and not entry_verified:
+            return None
+
+        return types, sessions
+
+    def add(
+        self,
+        key: str,
+        types: Sequence[model.Type],
+        sessions: Sequence[model.Session],
+        verified: bool = True,
+    ) -> None:
+        if not self._enabled:
+            return
+
+        self._write_signed(
+            key, pickle.dumps((verified, list(types), list(sessions)), pickle.HIGHEST_PROTOCOL)
+        )
+
+    def dependencies(self, filename: pathlib.Path) -> Optional[List[str]]:
+        """Return the names of the files a specification file depends on.
+
+        None is returned if the dependencies of the current content of the file are unknown.
+        """
+        key = self._dependencies_key(filename)
+        content = self._read_signed(key) if key is not None else None
+
+        if content is None:
+            return None
+
+        try:
+            dependencies = json.loads(content.decode("utf-8"))
+        except ValueError as e:
+            log.warning("Ignoring invalid specification cache entry %s: %s", key, e)
+            return None
+
+        if not isinstance(dependencies, list) or not all(
+            isinstance(d, str) and d == pathlib.Path(d).name for d in dependencies
         ):
-            self._verification[message.full_name] = message_hash
-            self._write_cache()
+            log.warning("Ignoring invalid specification cache entry %s", key)
+            return None
+
+        return dependencies
+
+    def add_dependencies(self, filename: pathlib.Path, dependencies: Sequence[str]) -> None:
+        key = self._dependencies_key(filename)
+
+        if key is None:
+            return
+
+        self._write_signed(key, json.dumps(list(dependencies)).encode("utf-8"))
+
+    def _source_key(self, filename: pathlib.Path) -> Optional[str]:
+        if not self._enabled:
+            return None
 
-    def _load_cache(self) -> None:
         try:
-            with open(CACHE_DIR / VERIFICATION_FILE) as f:
-                self._verification = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
+            content = filename.read_bytes()
+        except OSError:
+            return None
+
+        key = hashlib.sha256(f"{SPECIFICATION_FORMAT}|{filename.resolve()}|".encode("utf-8"))
+        key.update(hashlib.sha256(content).digest())
+        return key.hexdigest()
 
-    def _write_cache(self) -> None:
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        with open(CACHE_DIR / VERIFICATION_FILE, "w") as f:
-            json.dump(self._verification, f)
+    def _dependencies_key(self, filename: pathlib.Path) -> Optional[str]:
+        source = self._source_key(filename)
+        return f"{source}.json" if source is not None else None
+
+    def _signing_key(self) -> Optional[bytes]:
+        """Return the secret key used to sign the entries, or None if there is no usable key."""
+        if self._secret is not None:
+            return self._secret
+
+        file = self._directory / SPECIFICATION_KEY_FILE
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            if not file.exists():
+                fd, name = tempfile.mkstemp(
+                    prefix=f"{SPECIFICATION_KEY_FILE}.", dir=self._directory
+                )
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(secrets.token_bytes(SPECIFICATION_KEY_SIZE))
+                    try:
+                        os.link(name, file)
+                    except FileExistsError:
+                        pass
+                finally:
+                    os.unlink(name)
+            status = file.stat()
+            secret = file.read_bytes()
+        except OSError as e:
+            log.warning("Disabling specification cache %s: %s", self._directory, e)
+            self._enabled = False
+            return None
+
+        if (
+            hasattr(os, "getuid") and (status.st_uid != os.getuid() or status.st_mode & 0o077)
+        ) or len(secret) != SPECIFICATION_KEY_SIZE:
+            log.warning(
+                "Disabling specification cache %s: key %s is not private", self._directory, file
+            )
+            self._enabled = False
+            return None
+
+        self._secret = secret
+        return secret
 
     @staticmethod
-    def _message_hash(message: AbstractMessage) -> str:
-        types = "|".join(str(t) for t in message.types.values())
-        return hashlib.md5(f"{__version__}|{message}|{types}".encode("utf-8")).hexdigest()
+    def _signature(secret: bytes, key: str, content: bytes) -> bytes:
+        return hmac.new(secret, key.encode("utf-8") + b"|" + content, hashlib.sha256).digest()
+
+    def _read_signed(self, key: str) -> Optional[bytes]:
+        """Return the content of an entry, or None if the entry does not exist or its signature
+        is invalid."""
+        data = self._read(key)
+        secret = self._signing_key() if data is not None else None
+
+        if data is None or secret is None:
+            return None
+
+        signature, content = data[:SIGNATURE_SIZE], data[SIGNATURE_SIZE:]
+
+        if not hmac.compare_digest(signature, self._signature(secret, key, content)):
+            log.warning(
+                "Ignoring specification cache entry %s with invalid signature",
+                self._directory / key,
+            )
+            return None
+
+        return content
+
+    def _write_signed(self, key: str, content: bytes) -> None:
+        secret = self._signing_key()
+
+        if secret is None:
+            return
+
+        self._write(key, self._signature(secret, key, content) + content)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if not self._enabled:
+            return None
+
+        entry = self._directory / key
+
+        try:
+            data = entry.read_bytes()
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log.warning("Ignoring invalid specification cache entry %s: %s", entry, e)
+            return None
+
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(prefix=f".{key}.", dir=self._directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(name, self._directory / key)
+            finally:
+                if os.path.exists(name):
+                    os.unlink(name)
+            self._evict()
+        except OSError as e:
+            log.warning("Unable to update specification cache %s: %s", self._directory, e)
+
+    def _entries(self) -> List[pathlib.Path]:
+        if not self._directory.exists():
+            return []
+        return [e for e in self._directory.iterdir() if not e.name.startswith(".")]
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        if len(entries) <= self._max_entries:
+            return
+
+        used = {}
+        for e in entries:
+            try:
+                used[e] = e.stat().st_mtime
+            except OSError:
+                pass
+
+        for e in sorted(used, key=used.__getitem__)[: len(used) - self._max_entries]:
+            try:
+                e.unlink()
+            except OSError:
+                pass
+
+
+def cache_directory(directory: pathlib.Path = None) -> pathlib.Path:
+    """Return the given directory, the directory set by RFLX_CACHE_DIR or `CACHE_DIR`."""
+    if directory is not None:
+        return directory
+    if os.environ.get(CACHE_DIR_VARIABLE):
+        return pathlib.Path(os.environ[CACHE_DIR_VARIABLE])
+    return CACHE_DIR
+
+
+def default_backend(
+    max_entries: int = MAX_ENTRIES, directory: pathlib.Path = None, url: str = None
+) -> Backend:
+    url = url or os.environ.get(CACHE_URL_VARIABLE)
+    if url:
+        return HTTPBackend(url, token=os.environ.get(CACHE_TOKEN_VARIABLE))
+    return SQLiteBackend(cache_directory(directory) / VERIFICATION_FILE, max_entries)
+
+
+class CacheServer(http.server.ThreadingHTTPServer):
+    """Key/value server sharing proof results between machines.
+
+    The results are stored by the given backend. The bodies of all requests and responses are JSON
+    objects:
+
+    - POST /fetch {"keys": [KEY, ...]} -> {"results": {KEY: RESULT, ...}}
+    - POST /store {"results": {KEY: RESULT, ...}, "used": [KEY, ...]} -> {}
+    - GET /count -> {"count": NUMBER}
+
+    Requests are handled concurrently, the accesses to the backend are serialized. Requests larger
+    than `MAX_REQUEST_SIZE` are rejected. The server is
+    read-only unless `writable` is set. If a token is given, each request must contain it in an
+    "Authorization: Bearer TOKEN" header. The requests are not encrypted, so the server must only
+    be used in a trusted network: Anybody who can write to the server can make wrong proof results
+    be used by all clients.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        backend: Backend,
+        writable: bool = False,
+        token: str = None,
+    ) -> None:
+        super().__init__(address, CacheRequestHandler)
+        self.backend = backend
+        self.writable = writable
+        self.token = token
+        self.lock = threading.Lock()
+
+
+class CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: CacheServer
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        if not self._authorized():
+            return
+
+        if self.path != "/count":
+            self.send_error(404)
+            return
+
+        with self.server.lock:
+            count = len(self.server.backend)
+        self._respond({"count": count})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        if not self._authorized():
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.send_error(400)
+            return
+
+        if length < 0:
+            self.send_error(400)
+            return
+
+        if length > MAX_REQUEST_SIZE:
+            self.send_error(413)
+            return
+
+        try:
+            data = json.loads(self.rfile.read(length))
+            if self.path == "/fetch":
+                keys = [str(k) for k in data["keys"]]
+                with self.server.lock:
+                    results = self.server.backend.fetch(keys)
+                self._respond({"results": {k: r.name for k, r in results.items()}})
+            elif self.path == "/store":
+                if not self.server.writable:
+                    self.send_error(403)
+                    return
+                results = {str(k): ProofResult[r] for k, r in data["results"].items()}
+                used = [str(k) for k in data["used"]]
+                with self.server.lock:
+                    self.server.backend.store(results, used)
+                self._respond({})
+            else:
+                self.send_error(404)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.send_error(400)
+
+    def _authorized(self) -> bool:
+        if self.server.token is None:
+            return True
+        if hmac.compare_digest(
+            self.headers.get("Authorization", "").encode("utf-8"),
+            f"Bearer {self.server.token}".encode("utf-8"),
+        ):
+            return True
+        self.send_error(401)
+        return False
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        log.debug("%s - %s", self.address_string(), format % args)
+
+    def _respond(self, data: Mapping[str, Any]) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
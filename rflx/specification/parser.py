@@ -2,12 +2,26 @@
 
 import logging
 from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Type, Union
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from librflxlang import (
     AnalysisContext,
+    AnalysisUnit,
     ArrayTypeDef,
     Aspect,
     ChecksumAspect,
@@ -47,7 +61,7 @@ from rflx.error import Location, RecordFluxError, Severity, Subsystem, fail
 from rflx.identifier import ID, StrID
 from rflx.specification.const import RESERVED_WORDS
 
-from .cache import Cache
+from .cache import Cache, SpecificationCache
 
 log = logging.getLogger(__name__)
 STDIN = Path("<stdin>")
@@ -265,8 +279,7 @@ def create_array(
     identifier: ID,
     array: ArrayTypeDef,
     types: Sequence[model.Type],
-    _skip_verification: bool,
-    _cache: Cache,
+    _verifier: "Verifier",
     filename: Path,
 ) -> model.Array:
     element_identifier = model.qualified_type_identifier(
@@ -712,8 +725,7 @@ def create_modular(
     identifier: ID,
     modular: ModularTypeDef,
     _types: Sequence[model.Type],
-    _skip_verification: bool,
-    _cache: Cache,
+    _verifier: "Verifier",
     filename: Path,
 ) -> model.ModularInteger:
     return model.ModularInteger(
@@ -727,8 +739,7 @@ def create_range(
     identifier: ID,
     rangetype: RangeTypeDef,
     _types: Sequence[model.Type],
-    _skip_verification: bool,
-    _cache: Cache,
+    _verifier: "Verifier",
     filename: Path,
 ) -> model.RangeInteger:
     if rangetype.f_size.f_identifier.text != "Size":
@@ -752,8 +763,7 @@ def create_null_message(
     identifier: ID,
     message: MessageTypeDef,
     _types: Sequence[model.Type],
-    _skip_verification: bool,
-    _cache: Cache,
+    _verifier: "Verifier",
     _filename: Path,
 ) -> model.Message:
     return model.Message(identifier, [], {}, location=type_location(identifier, message))
@@ -763,8 +773,7 @@ def create_message(
     identifier: ID,
     message: MessageTypeDef,
     types: Sequence[model.Type],
-    skip_verification: bool,
-    cache: Cache,
+    verifier: "Verifier",
     filename: Path,
 ) -> model.Message:
 
@@ -778,12 +787,10 @@ def create_message(
     aspects = {ID("Checksum"): create_message_aspects(message.f_checksums, filename)}
 
     try:
-        result = create_proven_message(
+        result = verifier.proven(
             model.UnprovenMessage(
                 identifier, structure, field_types, aspects, type_location(identifier, message)
-            ).merged(),
-            skip_verification,
-            cache,
+            ).merged()
         )
     except RecordFluxError as e:
         error.extend(e)
@@ -981,8 +988,7 @@ def create_derived_message(
     identifier: ID,
     derivation: TypeDerivationDef,
     types: Sequence[model.Type],
-    skip_verification: bool,
-    cache: Cache,
+    verifier: "Verifier",
     filename: Path,
 ) -> model.Message:
     base_id = create_id(derivation.f_base, filename)
@@ -1016,12 +1022,10 @@ def create_derived_message(
         )
         error.propagate()
 
-    return create_proven_message(
+    return verifier.proven(
         model.UnprovenDerivedMessage(
             identifier, base_messages[0], location=type_location(identifier, derivation)
-        ).merged(),
-        skip_verification,
-        cache,
+        ).merged()
     )
 
 
@@ -1029,8 +1033,7 @@ def create_enumeration(
     identifier: ID,
     enumeration: EnumerationTypeDef,
     _types: Sequence[model.Type],
-    _skip_verification: bool,
-    _cache: Cache,
+    _verifier: "Verifier",
     filename: Path,
 ) -> model.Enumeration:
     literals: List[Tuple[StrID, expr.Number]] = []
@@ -1095,15 +1098,172 @@ def create_enumeration(
 def create_proven_message(
     unproven_message: model.UnprovenMessage, skip_verification: bool, cache: Cache
 ) -> model.Message:
-    proven_message = unproven_message.proven(
-        skip_verification or cache.is_verified(unproven_message)
-    )
+    proven_message = unproven_message.proven(skip_proof=True)
 
-    cache.add_verified(unproven_message)
+    if not skip_verification:
+        proven_message.verify(cache=cache)
 
     return proven_message
 
 
+def verify_message(message: model.Message, cache: Cache) -> Tuple[RecordFluxError, Cache]:
+    """Verify a message and return the found errors and the cache containing the new results.
+
+    The cache is not written by the worker process. Its results are merged into the cache of the
+    main process, which writes all results at once at the end of the verification.
+    """
+    try:
+        message.verify(cache=cache)
+    except RecordFluxError as e:
+        return e, cache
+    return RecordFluxError(), cache
+
+
+class Verifier:
+    """Verify messages in the current process or by a pool of worker processes.
+
+    With a single worker, each message is verified when it is created. With multiple workers,
+    messages are created without proofs and their verification is dispatched to the pool. The
+    result of a pending verification must be collected by `wait` before the message is used by
+    another declaration. Messages which have already been verified in the given workspace are not
+    verified again.
+    """
+
+    def __init__(
+        self,
+        skip_verification: bool = False,
+        cache: Cache = None,
+        workers: int = 1,
+        workspace: "Workspace" = None,
+    ):
+        self.skip_verification = skip_verification
+        self.cache = cache if cache is not None else Cache(enabled=False)
+        self.workers = workers
+        self.workspace = workspace
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__pending: Dict[ID, Tuple[model.AbstractMessage, Future]] = {}
+
+    def __enter__(self) -> "Verifier":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        if self.__executor is not None:
+            for _message, future in self.__pending.values():
+                future.cancel()
+            self.__executor.shutdown()
+        self.cache.flush()
+
+    @property
+    def pending(self) -> List[ID]:
+        return list(self.__pending)
+
+    def proven(self, unproven_message: model.UnprovenMessage) -> model.Message:
+        if self.workspace is not None and self.workspace.verified(unproven_message):
+            return unproven_message.proven(skip_proof=True)
+
+        if self.workers == 1 or self.skip_verification:
+            message = create_proven_message(unproven_message, self.skip_verification, self.cache)
+            if self.workspace is not None and not self.skip_verification:
+                self.workspace.add_verified(unproven_message)
+            return message
+
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.workers)
+
+        message = unproven_message.proven(skip_proof=True)
+        self.__pending[message.identifier] = (
+            unproven_message,
+            self.__executor.submit(verify_message, message, self.cache),
+        )
+        return message
+
+    def wait(self, identifier: ID) -> RecordFluxError:
+        """Return the errors found by the pending verification of a message."""
+        unproven_message, future = self.__pending.pop(identifier)
+        error, cache = future.result()
+        self.cache.merge(cache)
+        if self.workspace is not None and not error.check():
+            self.workspace.add_verified(unproven_message)
+        return error
+
+
+class Workspace:
+    """State kept between consecutive runs of the parser on the same specifications.
+
+    A specification file is only parsed again if it has been modified since it was last parsed.
+    A message is not verified again if an equal message has been verified before. As the
+    comparison includes the types of all fields, a message is verified again if any type it
+    depends on has changed.
+    """
+
+    def __init__(self) -> None:
+        self.__context = AnalysisContext()
+        self.__modification_times: Dict[Path, Optional[Tuple[int, int]]] = {}
+        self.__verified: Dict[ID, model.AbstractMessage] = {}
+
+    @property
+    def files(self) -> List[Path]:
+        return list(self.__modification_times)
+
+    def unit(self, filename: Path) -> AnalysisUnit:
+        modification_time = file_modification_time(filename)
+        reparse = (
+            filename not in self.__modification_times
+            or self.__modification_times[filename] != modification_time
+        )
+        self.__modification_times[filename] = modification_time
+        return self.__context.get_from_file(str(filename), reparse=reparse)
+
+    def modified(self, files: Iterable[Path] = ()) -> bool:
+        """Return True if a parsed file or one of the given files has changed since it was parsed.
+
+        A given file which has not been parsed is regarded as modified if it exists.
+        """
+        return any(
+            self.__modification_times.get(f) != file_modification_time(f)
+            for f in [*self.__modification_times, *files]
+        )
+
+    def verified(self, message: model.AbstractMessage) -> bool:
+        return self.__verified.get(message.identifier) == message
+
+    def add_verified(self, message: model.AbstractMessage) -> None:
+        self.__verified[message.identifier] = message
+
+
+def file_modification_time(filename: Path) -> Optional[Tuple[int, int]]:
+    try:
+        status = filename.stat()
+    except OSError:
+        return None
+    return (status.st_mtime_ns, status.st_size)
+
+
+def declaration_dependencies(
+    declaration: RFLXNode, package: ID, filename: Path
+) -> Optional[Set[ID]]:
+    """Return the identifiers of the types a declaration refers to.
+
+    None is returned if the declaration may refer to any type. The result includes the identifier
+    of the declared type itself, as a redeclaration must not be evaluated before the previous
+    declaration.
+    """
+    if isinstance(declaration, TypeDecl):
+        definition = declaration.f_definition
+        references = [declaration.f_identifier]
+        if definition.kind_name == "MessageTypeDef":
+            references.extend(c.f_type_identifier for c in definition.f_components.f_components)
+        elif definition.kind_name == "TypeDerivationDef":
+            references.append(definition.f_base)
+        elif definition.kind_name == "ArrayTypeDef":
+            references.append(definition.f_element_type)
+    elif isinstance(declaration, RefinementDecl):
+        references = [declaration.f_pdu, declaration.f_sdu]
+    else:
+        return None
+    return {model.qualified_type_identifier(create_id(r, filename), package) for r in references}
+
+
 def create_refinement(
     refinement: RefinementDecl, package: ID, types: Sequence[model.Type], filename: Path
 ) -> model.Refinement:
@@ -1188,20 +1348,37 @@ def check_naming(error: RecordFluxError, package: PackageNode, name: Path) -> No
 @dataclass(frozen=True)
 class SpecificationNode:
     filename: Path
-    spec: Specification
+    # None if the specification was not parsed, as it is contained in the specification cache
+    spec: Optional[Specification]
     withed_files: List[str]
 
 
 class Parser:
-    def __init__(self, skip_verification: bool = False, cached: bool = False) -> None:
+    def __init__(
+        self,
+        skip_verification: bool = False,
+        cached: bool = False,
+        workers: int = 1,
+        cache_directory: Path = None,
+        cache_url: str = None,
+        workspace: Workspace = None,
+    ) -> None:
         self.skip_verification = skip_verification
+        self.workers = workers
+        self.workspace = workspace
         self.__specifications: OrderedDict[str, SpecificationNode] = OrderedDict()
         self.__types: List[model.Type] = [
             *model.BUILTIN_TYPES.values(),
             *model.INTERNAL_TYPES.values(),
         ]
         self.__sessions: List[model.Session] = []
-        self.__cache = Cache(not skip_verification and cached)
+        # handlers of the results of pending message verifications
+        self.__verification_handlers: Dict[ID, Callable[[RecordFluxError], None]] = {}
+        self.__cache = Cache(
+            not skip_verification and cached, directory=cache_directory, url=cache_url
+        )
+        self.__specification_cache = SpecificationCache(cached, directory=cache_directory)
+        self.__context = AnalysisContext()
 
     def __convert_unit(
         self, spec: Specification, filename: Path, transitions: List[ID] = None
@@ -1254,7 +1431,9 @@ class Parser:
                     Subsystem.PARSER,
                     Severity.INFO,
                     node_location(
-                        self.__specifications[packagefile].spec.f_package_declaration.f_identifier,
+                        self.__specification(
+                            self.__specifications[packagefile]
+                        ).f_package_declaration.f_identifier,
                         self.__specifications[packagefile].filename,
                     ),
                 )
@@ -1266,12 +1445,57 @@ class Parser:
         error = RecordFluxError()
         transitions = transitions or []
 
+        # the workspace reparses only modified files and needs to know all files to detect changes
+        if self.workspace is None and self.__add_cached_specification(filename):
+            return error
+
         log.info("Parsing %s", filename)
-        unit = AnalysisContext().get_from_file(str(filename))
+        unit = (
+            self.workspace.unit(filename)
+            if self.workspace is not None
+            else self.__context.get_from_file(str(filename))
+        )
         if diagnostics_to_error(unit.diagnostics, error, filename):
             return error
         return self.__convert_unit(unit.root, filename, transitions)
 
+    def __add_cached_specification(self, filename: Path, transitions: Tuple[str, ...] = ()) -> bool:
+        """Add a specification whose dependencies are known by the specification cache without
+        parsing it.
+
+        A specification is only added if all its dependencies can be added in the same way, so
+        that all changed specifications are parsed and checked.
+        """
+        if filename.name in self.__specifications:
+            return self.__specifications[filename.name].filename == filename
+        if filename.name in transitions:
+            return False
+
+        withed_files = self.__specification_cache.dependencies(filename)
+
+        if withed_files is None or not all(
+            self.__add_cached_specification(filename.parent / f, (*transitions, filename.name))
+            for f in withed_files
+        ):
+            return False
+
+        log.info("Using cached dependencies of %s", filename)
+        self.__specifications[filename.name] = SpecificationNode(filename, None, withed_files)
+        return True
+
+    def __specification(self, spec_node: SpecificationNode) -> Specification:
+        """Return the syntax tree of a specification, which is parsed first if the specification
+        was added without parsing it."""
+        if spec_node.spec is not None:
+            return spec_node.spec
+
+        error = RecordFluxError()
+        log.info("Parsing %s", spec_node.filename)
+        unit = self.__context.get_from_file(str(spec_node.filename))
+        diagnostics_to_error(unit.diagnostics, error, spec_node.filename)
+        error.propagate()
+        return unit.root
+
     def __sort_specs_topologically(self) -> None:
         """
         (Reverse) Topologically sort specifications using Kahn's algorithm.
@@ -1319,11 +1543,26 @@ class Parser:
 
     def create_model(self) -> model.Model:
         error = RecordFluxError()
-        for spec_node in self.__specifications.values():
-            try:
-                self.__evaluate_specification(spec_node.spec, spec_node.filename)
-            except RecordFluxError as e:
-                error.extend(e)
+        keys: Dict[str, Optional[str]] = {}
+        with Verifier(
+            self.skip_verification, self.__cache, self.workers, self.workspace
+        ) as verifier:
+            # the verification of messages is only waited for when another declaration depends on
+            # the message, the results of all other verifications are collected at the end
+            completions = []
+            for name, spec_node in self.__specifications.items():
+                keys[name] = self.__specification_key(spec_node, keys)
+                try:
+                    completions.append(
+                        self.__evaluate_cached_specification(spec_node, keys[name], verifier)
+                    )
+                except RecordFluxError as e:
+                    completions.append(e.propagate)
+            for complete in completions:
+                try:
+                    complete()
+                except RecordFluxError as e:
+                    error.extend(e)
         try:
             result = model.Model(self.__types, self.__sessions)
         except RecordFluxError as e:
@@ -1332,14 +1571,73 @@ class Parser:
         error.propagate()
         return result
 
+    def __specification_key(
+        self, spec_node: SpecificationNode, keys: Mapping[str, Optional[str]]
+    ) -> Optional[str]:
+        """Return the key of a specification in the specification cache.
+
+        The dependencies precede the specification in the topological order, so that their keys
+        are already known. None is returned if the specification cannot be cached.
+        """
+        if spec_node.filename == STDIN:
+            return None
+        dependencies = [keys.get(f) for f in spec_node.withed_files]
+        if None in dependencies:
+            return None
+        return self.__specification_cache.key(
+            spec_node.filename, [d for d in dependencies if d is not None]
+        )
+
+    def __evaluate_cached_specification(
+        self, spec_node: SpecificationNode, key: Optional[str], verifier: Verifier
+    ) -> Callable[[], None]:
+        """Take the types and sessions of a specification from the specification cache, or
+        evaluate the specification.
+
+        The returned function completes the evaluation by waiting for the pending verifications of
+        the specification. It raises the errors of the specification or adds its types and
+        sessions to the cache.
+        """
+        verified = not self.skip_verification
+        cached = self.__specification_cache.get(key, verified) if key is not None else None
+
+        if cached is not None:
+            log.info("Using cached %s", spec_node.filename)
+            types, sessions = cached
+            self.__types.extend(types)
+            self.__sessions.extend(sessions)
+            return lambda: None
+
+        new_types, new_sessions, complete_evaluation = self.__evaluate_specification(
+            self.__specification(spec_node), spec_node.filename, verifier
+        )
+
+        def complete() -> None:
+            complete_evaluation()
+            if key is not None:
+                self.__specification_cache.add(key, new_types, new_sessions, verified)
+                self.__specification_cache.add_dependencies(
+                    spec_node.filename, spec_node.withed_files
+                )
+
+        return complete
+
     @property
     def specifications(self) -> Dict[str, Specification]:
-        return {
-            spec_node.spec.f_package_declaration.f_identifier.text: spec_node.spec
-            for spec_node in self.__specifications.values()
-        }
-
-    def __evaluate_specification(self, spec: Specification, filename: Path) -> None:
+        specs = [self.__specification(spec_node) for spec_node in self.__specifications.values()]
+        return {spec.f_package_declaration.f_identifier.text: spec for spec in specs}
+
+    def __evaluate_specification(
+        self, spec: Specification, filename: Path, verifier: Verifier
+    ) -> Tuple[List[model.Type], List[model.Session], Callable[[], None]]:
+        """Evaluate all declarations of a specification.
+
+        The verification of a message is only waited for before a declaration which depends on the
+        message is evaluated. The types and sessions created for the specification are returned
+        together with a function, which waits for all remaining verifications of the
+        specification and raises the errors of the specification.
+        """
+        # pylint: disable=too-many-locals
         handlers = {
             "ArrayTypeDef": create_array,
             "ModularTypeDef": create_modular,
@@ -1350,10 +1648,31 @@ class Parser:
             "EnumerationTypeDef": create_enumeration,
         }
         log.info("Processing %s", spec.f_package_declaration.f_identifier.text)
-        error = RecordFluxError()
         package_id = create_id(spec.f_package_declaration.f_identifier, filename)
+        declarations = list(spec.f_package_declaration.f_declarations)
+        # errors are collected per declaration to keep the source order when the verification of
+        # messages finishes later
+        errors = [RecordFluxError() for _ in declarations]
+        pending: List[ID] = []
+        # the types are collected separately, as the list of all types is replaced when the
+        # verification of a message of another specification fails
+        new_types: List[model.Type] = []
+        new_sessions: List[model.Session] = []
+
+        def handle_verification(identifier: ID, position: int, new_type: model.Type) -> None:
+            def handle(error: RecordFluxError) -> None:
+                errors[position].extend(error)
+                if error.check():
+                    self.__types = [t for t in self.__types if t is not new_type]
+
+            self.__verification_handlers[identifier] = handle
+            pending.append(identifier)
+
+        for i, t in enumerate(declarations):
+            error = errors[i]
+            dependencies = declaration_dependencies(t, package_id, filename)
+            self.__wait(verifier, verifier.pending if dependencies is None else dependencies)
 
-        for t in spec.f_package_declaration.f_declarations:
             if isinstance(t, TypeDecl):
                 identifier = model.qualified_type_identifier(
                     create_id(t.f_identifier, filename), package_id
@@ -1363,11 +1682,13 @@ class Parser:
                         identifier,
                         t.f_definition,
                         self.__types,
-                        self.skip_verification,
-                        self.__cache,
+                        verifier,
                         filename,
                     )
                     self.__types.append(new_type)
+                    new_types.append(new_type)
+                    if identifier in verifier.pending:
+                        handle_verification(identifier, i, new_type)
                     error.extend(new_type.error)
                 except RecordFluxError as e:
                     error.extend(e)
@@ -1376,13 +1697,28 @@ class Parser:
                     try:
                         new_type = create_refinement(t, package_id, self.__types, filename)
                         self.__types.append(new_type)
+                        new_types.append(new_type)
                         error.extend(new_type.error)
                     except RecordFluxError as e:
                         error.extend(e)
                 elif t.kind_name == "SessionDecl":
                     new_session = create_session(t, package_id, filename, self.__types)
                     self.__sessions.append(new_session)
+                    new_sessions.append(new_session)
                     error.extend(new_session.error)
                 else:
                     raise NotImplementedError(f"Declaration kind {t.kind_name} unsupported")
-        error.propagate()
+
+        def complete() -> None:
+            self.__wait(verifier, pending)
+            error = RecordFluxError()
+            for declaration_error in errors:
+                error.extend(declaration_error)
+            error.propagate()
+
+        return new_types, new_sessions, complete
+
+    def __wait(self, verifier: Verifier, identifiers: Iterable[ID]) -> None:
+        for identifier in identifiers:
+            if identifier in verifier.pending:
+                self.__verification_handlers.pop(identifier)(verifier.wait(identifier))
@@ -9,16 +9,23 @@ from typing import Generator
 
 from tqdm import tqdm  # type: ignore
 
-from rflx.pyrflx import PyRFLX
+from rflx.identifier import ID
+from rflx.model import Model
+from rflx.pyrflx import MessageValue, PyRFLX
+from rflx.specification import Parser
 
 
 class Benchmark:
-    def __init__(self, specdir: Path) -> None:
+    def __init__(self, specdir: Path, snapshot: Path = None) -> None:
         print("Loading...")
         start = perf_counter()
-        self.__pyrflx = PyRFLX.from_specs(
-            [str(specdir / "ipv4.rflx"), str(specdir / "icmp.rflx")], True, True
-        )
+        if snapshot:
+            self.__model = Model.load(snapshot, check_sources=False)
+        else:
+            parser = Parser(skip_verification=True)
+            parser.parse(specdir / "ipv4.rflx", specdir / "icmp.rflx")
+            self.__model = parser.create_model()
+        self.__pyrflx = PyRFLX(self.__model, skip_message_verification=True)
         self.__ipv4 = self.__pyrflx["IPv4"]
         self.__icmp = self.__pyrflx["ICMP"]
         print(f"Loaded in {perf_counter() - start} seconds")
@@ -55,6 +62,40 @@ class Benchmark:
             pkt.set("Payload", msg.bytestring)
             yield pkt.bytestring
 
+    def instantiate(self, count: int = 2 ** 12) -> None:
+        """Compare the instantiation of a message by copying its prototype with the construction
+        of a new message value, which was used for each instantiation before.
+
+        The speedup is checked against the construction including the verification of the
+        message. The speedup against the construction without verification is only reported.
+        """
+        packet = next(m for m in self.__model.messages if m.identifier == ID("IPv4::Packet"))
+        start = perf_counter()
+        for _ in range(count):
+            MessageValue(packet)
+        construction = perf_counter() - start
+        start = perf_counter()
+        for _ in range(count):
+            MessageValue(packet, skip_verification=True)
+        unverified_construction = perf_counter() - start
+        start = perf_counter()
+        for _ in range(count):
+            self.__ipv4["Packet"]  # pylint: disable=pointless-statement
+        instantiation = perf_counter() - start
+        print(
+            f"Instantiation is {construction / instantiation:.1f}x faster than construction"
+            " with verification (MessageValue(message))"
+        )
+        print(
+            f"Instantiation is {unverified_construction / instantiation:.1f}x faster than"
+            " construction without verification (MessageValue(message, skip_verification=True))"
+        )
+        if construction < 10 * instantiation:
+            print(
+                "Instantiation speedup < 10x compared to construction with verification, stopping"
+            )
+            sys.exit(1)
+
     def run(self) -> None:
         i = 0
         start = perf_counter()
@@ -71,10 +112,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-p", "--profile", action="store_true", help="run profiler")
     parser.add_argument("-o", "--outfile", type=str, help="print profiler output to file")
+    parser.add_argument(
+        "-i", "--instantiation", action="store_true", help="compare instantiation and construction"
+    )
+    parser.add_argument(
+        "-m", "--model", type=Path, help="load model from snapshot created by rflx compile-model"
+    )
     parser.add_argument("specdir", type=Path, help="specification directory")
     args = parser.parse_args(sys.argv[1:])
-    benchmark = Benchmark(args.specdir)
-    if args.profile:
+    benchmark = Benchmark(args.specdir, args.model)
+    if args.instantiation:
+        benchmark.instantiate()
+    elif args.profile:
         print("Profiling...")
 
         def run() -> None:
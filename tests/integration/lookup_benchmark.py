@@ -0,0 +1,67 @@
+#!/usr/bin/env -S python3 -O
+
+import argparse
+import sys
+from time import perf_counter
+
+from rflx.expression import Equal, Number, Pow, Variable
+from rflx.model import FINAL, INITIAL, Field, Link, Message, ModularInteger
+
+
+def synthetic_message(size: int) -> Message:
+    """Create a message with a sequence of fields, each of which can be skipped."""
+    fields = [Field(f"F_{i}") for i in range(size)]
+    structure = [Link(INITIAL, fields[0])]
+    for i, f in enumerate(fields):
+        structure.append(Link(f, fields[i + 1] if i + 1 < size else FINAL))
+        if i + 2 < size:
+            structure.append(Link(f, fields[i + 2], Equal(Variable(f.name), Number(0))))
+    return Message(
+        "P::M",
+        structure,
+        {f: ModularInteger("P::T", Pow(Number(2), Number(8))) for f in fields},
+        skip_proof=True,
+    )
+
+
+def scan(message: Message) -> float:
+    """Look up all adjacent links and neighbouring fields by linear searches."""
+    start = perf_counter()
+    for f in message.all_fields:
+        [l for l in message.structure if l.target == f]  # pylint: disable=expression-not-assigned
+        [l for l in message.structure if l.source == f]  # pylint: disable=expression-not-assigned
+        if f not in (INITIAL, FINAL):
+            message.fields.index(f)
+    return perf_counter() - start
+
+
+def lookup(message: Message) -> float:
+    """Look up all adjacent links and neighbouring fields by the indexes of the message."""
+    start = perf_counter()
+    for f in message.all_fields:
+        message.incoming(f)
+        message.outgoing(f)
+        message.predecessors(f)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-s", "--size", type=int, default=500, help="number of fields (default: 500)"
+    )
+    args = parser.parse_args(sys.argv[1:])
+
+    print("Creating message...")
+    start = perf_counter()
+    message = synthetic_message(args.size)
+    print(f"Created message with {args.size} fields in {perf_counter() - start:.2f} seconds")
+
+    scan_time = scan(message)
+    lookup_time = lookup(message)
+    print(f"Linear search: {scan_time:.4f} seconds")
+    print(f"Index lookup: {lookup_time:.4f} seconds")
+    print(f"Index lookup is {scan_time / lookup_time:.1f}x faster than linear search")
+    if scan_time < lookup_time:
+        print("Index lookup slower than linear search, stopping")
+        sys.exit(1)
@@ -1,3 +1,5 @@
+import socket
+import time
 from pathlib import Path
 from typing import Any
 
@@ -7,6 +9,8 @@ import pytest
 import rflx.specification
 from rflx import cli
 from rflx.error import Location, Severity, Subsystem, fail
+from rflx.model import Model
+from rflx.specification import cache
 from tests.const import SPEC_DIR
 
 SPEC_FILE = str(SPEC_DIR / "tlv.rflx")
@@ -39,6 +43,21 @@ def test_main_check_quiet() -> None:
     assert cli.main(["rflx", "--quiet", "check", SPEC_FILE]) == 0
 
 
+def test_main_check_workers() -> None:
+    assert cli.main(["rflx", "check", "--workers", "2", SPEC_FILE]) == 0
+
+
+def test_main_check_invalid_workers() -> None:
+    assert "cli: error: invalid number of workers: 0" in str(
+        cli.main(["rflx", "check", "--workers", "0", SPEC_FILE])
+    )
+
+
+def test_main_check_cache_directory(tmp_path: Path) -> None:
+    assert cli.main(["rflx", "check", "--cache-directory", str(tmp_path), SPEC_FILE]) == 0
+    assert (tmp_path / cache.VERIFICATION_FILE).exists()
+
+
 def test_main_check_parser_error(monkeypatch: Any) -> None:
     monkeypatch.setattr(cli, "check", lambda x: raise_parser_error())
     assert "<stdin>:8:22: parser: error: TEST" in str(cli.main(["rflx", "check", "README.md"]))
@@ -158,5 +177,103 @@ def test_main_graph_no_output_files(tmp_path: Path) -> None:
     )
 
 
+def test_main_watch(monkeypatch: Any, tmp_path: Path) -> None:
+    def interrupt(_: float) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(time, "sleep", interrupt)
+    assert cli.main(["rflx", "watch", "--cache-directory", str(tmp_path), SPEC_FILE]) == 0
+
+
+def test_main_watch_error(monkeypatch: Any, tmp_path: Path) -> None:
+    def interrupt(_: float) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(time, "sleep", interrupt)
+    monkeypatch.setattr(cli, "parse", lambda *args, **kwargs: raise_model_error())
+    assert "<stdin>:8:22: model: error: TEST" in str(
+        cli.main(["rflx", "watch", "--cache-directory", str(tmp_path), SPEC_FILE])
+    )
+
+
+def test_main_watch_invalid_interval() -> None:
+    assert "cli: error: invalid interval: 0.0" in str(
+        cli.main(["rflx", "watch", "--interval", "0", SPEC_FILE])
+    )
+
+
+def test_main_watch_invalid_workers() -> None:
+    assert "cli: error: invalid number of workers: 0" in str(
+        cli.main(["rflx", "watch", "--workers", "0", SPEC_FILE])
+    )
+
+
+def test_main_cache_server(monkeypatch: Any, tmp_path: Path) -> None:
+    servers = []
+
+    def interrupt(self: cache.CacheServer) -> None:
+        servers.append(self)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(cache.CacheServer, "serve_forever", interrupt)
+    assert (
+        cli.main(["rflx", "cache-server", "--port", "0", "--cache-directory", str(tmp_path)]) == 0
+    )
+    assert not servers[0].writable
+    assert servers[0].token is None
+    monkeypatch.setenv(cache.CACHE_TOKEN_VARIABLE, "secret")
+    assert (
+        cli.main(
+            [
+                "rflx",
+                "cache-server",
+                "--port",
+                "0",
+                "--writable",
+                "--cache-directory",
+                str(tmp_path),
+            ]
+        )
+        == 0
+    )
+    assert servers[1].writable
+    assert servers[1].token == "secret"
+
+
+def test_main_cache_server_error(tmp_path: Path) -> None:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        s.listen()
+        port = str(s.getsockname()[1])
+        assert "cli: error: unable to start cache server" in str(
+            cli.main(["rflx", "cache-server", "--port", port, "--cache-directory", str(tmp_path)])
+        )
+
+
+def test_main_compile_model(tmp_path: Path) -> None:
+    snapshot = tmp_path / "model.rflxm"
+    assert (
+        cli.main(
+            [
+                "rflx",
+                "compile-model",
+                "--cache-directory",
+                str(tmp_path),
+                "-o",
+                str(snapshot),
+                SPEC_FILE,
+            ]
+        )
+        == 0
+    )
+    assert [str(m.identifier) for m in Model.load(snapshot).messages] == ["TLV::Message"]
+
+
+def test_main_compile_model_invalid_output(tmp_path: Path) -> None:
+    assert "cli: error: unable to write model snapshot" in str(
+        cli.main(["rflx", "compile-model", "-o", str(tmp_path), SPEC_FILE])
+    )
+
+
 def test_main_export(tmp_path: Path) -> None:
     assert cli.main(["rflx", "export", "-o", str(tmp_path / "model.json"), SPEC_FILE]) == 0
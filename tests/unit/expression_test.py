@@ -1,6 +1,7 @@
 # pylint: disable=too-many-lines
 
-from typing import Callable, Mapping
+from copy import copy
+from typing import Any, Callable, Dict, Mapping, Optional
 
 import pytest
 import z3
@@ -41,6 +42,7 @@ from rflx.expression import (
     MessageAggregate,
     Mod,
     Mul,
+    Name,
     Not,
     NotEqual,
     NotIn,
@@ -51,6 +53,9 @@ from rflx.expression import (
     Pow,
     Precedence,
     Present,
+    ProofCache,
+    ProofManager,
+    ProofResult,
     Selected,
     Size,
     String,
@@ -61,6 +66,12 @@ from rflx.expression import (
     ValueRange,
     Variable,
     Z3TypeError,
+    clear_caches,
+    proof_key,
+    shared,
+    simplified_cache_info,
+    substituted_cache_info,
+    z3expr_cache_info,
 )
 from rflx.identifier import ID, StrID
 from tests.utils import assert_equal, multilinestr
@@ -487,6 +498,202 @@ def test_number_hashable() -> None:
     assert {Number(1), Number(2)}
 
 
+def test_expr_hash() -> None:
+    assert hash(Add(Variable("X"), Number(1))) == hash(Add(Variable("X"), Number(1)))
+    assert hash(First("X")) == hash(First(Variable("X")))
+    assert hash(Number(16, 16)) == hash(Number(16))
+    assert len({Add(Variable("X"), Number(1)), Add(Variable("X"), Number(2))}) == 2
+    assert len({Add(Variable("X"), Number(1)), Add(Variable("X"), Number(1))}) == 1
+
+
+def test_simplified_memoized() -> None:
+    clear_caches()
+    expr = Add(Variable("X"), Number(1), Number(2))
+    simplified = expr.simplified()
+    assert simplified == Add(Variable("X"), Number(3))
+    assert simplified_cache_info().hits == 0
+    assert expr.simplified() is simplified
+    assert simplified_cache_info().hits == 1
+    assert "_simplified" not in repr(expr)
+    variable = Variable("X")
+    assert variable.simplified() is variable
+    assert copy(variable).simplified() is not variable
+
+
+def test_substituted_memoized() -> None:
+    clear_caches()
+    expr = Add(Variable("X"), Number(1))
+    mapping: Dict[Name, Expr] = {Variable("X"): Number(2)}
+    substituted = expr.substituted(mapping=mapping)
+    assert substituted == Add(Number(2), Number(1))
+    assert substituted_cache_info() == (0, 1)
+    assert expr.substituted(mapping=mapping) is substituted
+    assert expr.substituted(mapping={Variable("X"): Number(3)}) == Add(Number(3), Number(1))
+    assert Add(Variable("X"), Number(1)).substituted(mapping=mapping) == substituted
+    assert substituted_cache_info() == (1, 3)
+    assert expr.substituted(lambda e: e) == expr
+    assert substituted_cache_info() == (1, 3)
+
+
+def test_substituted_memoized_type_and_location() -> None:
+    clear_caches()
+    expr = Variable("X")
+    assert expr.substituted(mapping={expr: Variable("Y", type_=rty.BOOLEAN)}).type_ == (rty.BOOLEAN)
+    assert expr.substituted(mapping={expr: Variable("Y", type_=rty.OPAQUE)}).type_ == rty.OPAQUE
+    location = Location((1, 2))
+    assert expr.substituted(mapping={expr: Variable("Y", location=location)}).location == (location)
+    assert substituted_cache_info().hits == 0
+
+
+def test_memoized_results_invalidated_by_change() -> None:
+    clear_caches()
+    expr = Add(Variable("X"), Number(1), Number(2))
+    mapping: Dict[Name, Expr] = {Variable("X"): Number(3)}
+    assert expr.simplified() == Add(Variable("X"), Number(3))
+    assert expr.substituted(mapping=mapping) == Add(Number(3), Number(1), Number(2))
+    expr.terms = [Variable("X"), Number(2), Number(2)]
+    expr.invalidate_memoized()
+    assert expr.simplified() == Add(Variable("X"), Number(4))
+    assert expr.substituted(mapping=mapping) == Add(Number(3), Number(2), Number(2))
+    assert simplified_cache_info().hits == 0
+    assert substituted_cache_info().hits == 0
+    assert "_generation" not in repr(expr)
+
+
+def test_memoized_results_invalidated_by_type_check() -> None:
+    clear_caches()
+    expr = Add(Variable("X", type_=rty.Integer("I", rty.Bounds(0, 10))), Number(1), Number(2))
+    assert expr.simplified() == Add(Variable("X"), Number(3))
+    assert not expr.check_type_instance(rty.AnyInteger).errors
+    assert expr.simplified() == Add(Variable("X"), Number(3))
+    assert simplified_cache_info().hits == 0
+
+
+def test_z3expr_memoized() -> None:
+    clear_caches()
+    z3expr = Add(Variable("X"), Number(1)).z3expr()
+    assert z3expr_cache_info() == (0, 3)
+    assert Add(Variable("X"), Number(1)).z3expr() is z3expr
+    assert z3expr_cache_info() == (1, 3)
+
+
+def test_proof_shared_solver() -> None:
+    solver = z3.Solver()
+    facts = [Greater(Variable("X"), Number(10))]
+    assert Less(Variable("X"), Number(5)).check(facts, solver).result == ProofResult.UNSAT
+    proof = Less(Variable("X"), Number(20)).check(facts, solver)
+    assert proof.result == ProofResult.SAT
+    proof = Equal(Variable("X"), Number(5), Location((1, 2))).check(facts, solver)
+    assert proof.result == ProofResult.UNSAT
+    assert proof.error == [("X > 10", None), ("X = 5", Location((1, 2)))]
+    assert proof.error is proof.error
+    assert len(solver.assertions()) == 0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_proof_manager(workers: int) -> None:
+    facts = [Greater(Variable("X"), Number(10))]
+    with ProofManager(workers) as prover:
+        unsat = prover.submit(Less(Variable("X"), Number(5)), facts)
+        sat = prover.submit(Less(Variable("X"), Number(20)), facts)
+        assert prover.check(Equal(Variable("X"), Number(5)), facts).result == ProofResult.UNSAT
+        assert sat.result == ProofResult.SAT
+        assert unsat.result == ProofResult.UNSAT
+        assert unsat.error == [("X > 10", None), ("X < 5", None)]
+
+
+def test_proof_manager_batches(monkeypatch: Any) -> None:
+    monkeypatch.setattr(ProofManager, "BATCH_SIZE", 2)
+    facts = [Greater(Variable("X"), Number(10))]
+    with ProofManager(2) as prover:
+        proofs = [prover.submit(Less(Variable("X"), Number(n)), facts) for n in range(8, 13)]
+        prover.flush()
+        later = prover.submit(Less(Variable("X"), Number(5)), facts)
+        assert [p.result for p in proofs] == [
+            ProofResult.UNSAT,
+            ProofResult.UNSAT,
+            ProofResult.UNSAT,
+            ProofResult.UNSAT,
+            ProofResult.SAT,
+        ]
+        assert later.result == ProofResult.UNSAT
+        assert later.error == [("X > 10", None), ("X < 5", None)]
+
+
+def test_proof_manager_prefix() -> None:
+    x_greater = [Greater(Variable("X"), Number(10))]
+    x_less = [Less(Variable("X"), Number(5))]
+    y_greater = [Greater(Variable("Y"), Variable("X"))]
+    with ProofManager() as prover:
+        proofs = [
+            prover.submit(Less(Variable("X"), Number(20)), x_greater, [x_greater]),
+            prover.submit(
+                Less(Variable("Y"), Number(10)), [*x_greater, *y_greater], [x_greater, y_greater]
+            ),
+            prover.submit(TRUE, [*x_greater, *x_less, *y_greater], [x_greater, x_less, y_greater]),
+            prover.submit(
+                Equal(Variable("Y"), Number(20)),
+                [*x_less, Greater(Variable("Y"), Number(30))],
+                [x_less],
+            ),
+        ]
+        assert [p.result for p in proofs] == [
+            ProofResult.SAT,
+            ProofResult.UNSAT,
+            ProofResult.UNSAT,
+            ProofResult.UNSAT,
+        ]
+        assert proofs[2].error == [("X > 10", None), ("X < 5", None)]
+        assert proofs[3].error == [("Y > 30", None), ("Y = 20", None)]
+        later = prover.submit(Equal(Variable("X"), Number(3)), x_less, [x_less])
+        assert later.result == ProofResult.SAT
+
+
+def test_proof_manager_cache() -> None:
+    class DictCache(ProofCache):
+        def __init__(self) -> None:
+            self.results: Dict[str, ProofResult] = {}
+
+        def get(self, key: str) -> Optional[ProofResult]:
+            return self.results.get(key)
+
+        def add(self, key: str, result: ProofResult) -> None:
+            self.results[key] = result
+
+    cache = DictCache()
+    facts = [Greater(Variable("X"), Number(10))]
+    unsat = Less(Variable("X"), Number(5))
+    sat = Less(Variable("X"), Number(20))
+    with ProofManager(cache=cache) as prover:
+        assert prover.check(unsat, facts).result == ProofResult.UNSAT
+        assert prover.submit(sat, facts).result == ProofResult.SAT
+        assert prover.submit(sat, [*facts, Less(Variable("X"), Number(15))], [facts]).result == (
+            ProofResult.SAT
+        )
+    assert len(cache.results) == 3
+    assert cache.results[proof_key(unsat, facts)] == ProofResult.UNSAT
+    assert proof_key(sat, [Number(1), Number(2)]) == proof_key(sat, [Number(2), Number(1)])
+
+    cache.results[proof_key(unsat, facts)] = ProofResult.SAT
+    with ProofManager(cache=cache) as prover:
+        assert prover.check(unsat, facts).result == ProofResult.SAT
+        assert prover.submit(unsat, facts, [facts]).result == ProofResult.SAT
+
+
+def test_proof_manager_invalid_workers() -> None:
+    with pytest.raises(ValueError, match=r"^invalid number of workers: 0$"):
+        ProofManager(0)
+
+
+def test_shared() -> None:
+    x = shared(Variable("X"))
+    assert shared(Variable("X")) is x
+    assert shared(-Variable("X")) is not x
+    expr = shared(Add(x, shared(Number(1))))
+    assert shared(Add(shared(Variable("X")), shared(Number(1)))) is expr
+    assert shared(Mul(x, Number(1))) is not expr
+
+
 @pytest.mark.parametrize("operation", [Add, Mul, Sub, Div, Pow])
 def test_math_expr_type(operation: Callable[[Expr, Expr], Expr]) -> None:
     assert_type(
@@ -435,10 +435,10 @@ def test_field_condition() -> None:
 
 
 def test_incoming() -> None:
-    assert_equal(ETHERNET_FRAME.incoming(INITIAL), [])
+    assert_equal(ETHERNET_FRAME.incoming(INITIAL), ())
     assert_equal(
         ETHERNET_FRAME.incoming(Field("Type_Length")),
-        [
+        (
             Link(Field("TCI"), Field("Type_Length")),
             Link(
                 Field("Type_Length_TPID"),
@@ -446,11 +446,11 @@ def test_incoming() -> None:
                 NotEqual(Variable("Type_Length_TPID"), Number(0x8100, 16)),
                 first=First("Type_Length_TPID"),
             ),
-        ],
+        ),
     )
     assert_equal(
         ETHERNET_FRAME.incoming(FINAL),
-        [
+        (
             Link(
                 Field("Payload"),
                 FINAL,
@@ -458,16 +458,16 @@ def test_incoming() -> None:
                     GreaterEqual(Div(Size("Payload"), Number(8)), Number(46)),
                     LessEqual(Div(Size("Payload"), Number(8)), Number(1500)),
                 ),
-            )
-        ],
+            ),
+        ),
     )
 
 
 def test_outgoing() -> None:
-    assert_equal(ETHERNET_FRAME.outgoing(INITIAL), [Link(INITIAL, Field("Destination"))])
+    assert_equal(ETHERNET_FRAME.outgoing(INITIAL), (Link(INITIAL, Field("Destination")),))
     assert_equal(
         ETHERNET_FRAME.outgoing(Field("Type_Length")),
-        [
+        (
             Link(
                 Field("Type_Length"),
                 Field("Payload"),
@@ -480,9 +480,23 @@ def test_outgoing() -> None:
                 GreaterEqual(Variable("Type_Length"), Number(1536)),
                 Sub(Last("Message"), Last("Type_Length")),
             ),
-        ],
+        ),
+    )
+    assert_equal(ETHERNET_FRAME.outgoing(FINAL), ())
+
+
+def test_incoming_outgoing_structure_changed() -> None:
+    message = UnprovenMessage(
+        "P::M",
+        [Link(INITIAL, Field("F")), Link(Field("F"), FINAL)],
+        {Field("F"): MODULAR_INTEGER},
     )
-    assert_equal(ETHERNET_FRAME.outgoing(FINAL), [])
+    message.structure = [Link(INITIAL, FINAL)]
+    assert_equal(message.incoming(Field("F")), ())
+    assert_equal(message.outgoing(INITIAL), (Link(INITIAL, FINAL),))
+    assert_equal(message.incoming(FINAL), (Link(INITIAL, FINAL),))
+    assert message.incoming(FINAL) is message.incoming(FINAL)
+    assert message.outgoing(INITIAL) is message.outgoing(INITIAL)
 
 
 def test_direct_predecessors() -> None:
@@ -500,6 +514,24 @@ def test_direct_successors() -> None:
     assert_equal(ETHERNET_FRAME.direct_successors(FINAL), [])
 
 
+def test_type_constraints() -> None:
+    constraints = TLV_MESSAGE.type_constraints(TRUE)
+    assert all(
+        a is b
+        for a, b in zip(
+            constraints, TLV_MESSAGE.type_constraints(Equal(Variable("Length"), Number(1)))
+        )
+    )
+    assert_equal(
+        TLV_MESSAGE.type_constraints(Equal(Variable("Value"), Aggregate(Number(1), Number(2)))),
+        [
+            *constraints[:2],
+            Equal(Mul(Number(2), Number(8)), Size(Variable("Value"))),
+            *constraints[2:],
+        ],
+    )
+
+
 def test_definite_predecessors() -> None:
     assert_equal(
         ETHERNET_FRAME.definite_predecessors(FINAL),
@@ -517,6 +549,64 @@ def test_definite_predecessors() -> None:
     )
 
 
+def test_static_prefix() -> None:
+    assert ETHERNET_FRAME.static_prefix() == (
+        (Field("Destination"), 0, 48),
+        (Field("Source"), 48, 48),
+        (Field("Type_Length_TPID"), 96, 16),
+    )
+    assert TLV_MESSAGE.static_prefix() == ((Field("Tag"), 0, 8),)
+    assert NULL_MESSAGE.static_prefix() == ()
+
+
+def test_static_prefix_first_and_size() -> None:
+    message = Message(
+        "P::M",
+        [
+            Link(INITIAL, Field("F1")),
+            Link(Field("F1"), Field("F2"), first=First("F1")),
+            Link(Field("F2"), Field("F3"), size=Mul(Size("F1"), Number(2))),
+            Link(Field("F3"), Field("F4"), size=Mul(Variable("F1"), Number(8))),
+            Link(Field("F4"), FINAL),
+        ],
+        {
+            Field("F1"): MODULAR_INTEGER,
+            Field("F2"): MODULAR_INTEGER,
+            Field("F3"): Opaque(),
+            Field("F4"): Opaque(),
+        },
+    )
+    assert message.static_prefix() == (
+        (Field("F1"), 0, 8),
+        (Field("F2"), 0, 8),
+        (Field("F3"), 8, 16),
+    )
+
+
+def test_static_scalar_prefix() -> None:
+    assert ETHERNET_FRAME.static_scalar_prefix() == (
+        (Field("Destination"), 0, 48),
+        (Field("Source"), 48, 48),
+    )
+    assert TLV_MESSAGE.static_scalar_prefix() == ()
+    message = Message(
+        "P::M",
+        [
+            Link(INITIAL, Field("F1")),
+            Link(Field("F1"), Field("F2"), first=First("F1")),
+            Link(Field("F2"), Field("F3"), first=Add(Last("F2"), Number(9))),
+            Link(Field("F3"), FINAL),
+        ],
+        {
+            Field("F1"): MODULAR_INTEGER,
+            Field("F2"): MODULAR_INTEGER,
+            Field("F3"): MODULAR_INTEGER,
+        },
+        skip_proof=True,
+    )
+    assert message.static_scalar_prefix() == ((Field("F1"), 0, 8), (Field("F2"), 0, 8))
+
+
 def test_predecessors() -> None:
     assert_equal(
         ETHERNET_FRAME.predecessors(FINAL),
@@ -1244,6 +1334,29 @@ def test_no_valid_path() -> None:
     )
 
 
+def test_verify_workers() -> None:
+    structure = [
+        Link(INITIAL, Field("F1")),
+        Link(Field("F1"), Field("F2"), condition=LessEqual(Variable("F1"), Number(80))),
+        Link(Field("F1"), Field("F3"), condition=Greater(Variable("F1"), Number(80))),
+        Link(Field("F2"), Field("F3"), condition=Greater(Variable("F1"), Number(80))),
+        Link(Field("F3"), FINAL, condition=LessEqual(Variable("F1"), Number(80))),
+    ]
+    types = {
+        Field("F1"): RANGE_INTEGER,
+        Field("F2"): RANGE_INTEGER,
+        Field("F3"): RANGE_INTEGER,
+    }
+    errors = []
+    for workers in [1, 2]:
+        message = Message("P::M", structure, types, skip_proof=True)
+        with pytest.raises(RecordFluxError) as e:
+            message.verify(workers)
+        errors.append(str(e.value))
+    assert errors[0] == errors[1]
+    assert 'unreachable field "F2" in "P::M"' in errors[0]
+
+
 def test_invalid_path_1(monkeypatch: Any) -> None:
     f1 = Field(ID("F1", Location((20, 10))))
     structure = [
@@ -1253,7 +1366,7 @@ def test_invalid_path_1(monkeypatch: Any) -> None:
     types = {
         Field("F1"): RANGE_INTEGER,
     }
-    monkeypatch.setattr(Message, "_Message__prove_reachability", lambda x: None)
+    monkeypatch.setattr(Message, "_Message__prove_reachability", lambda x, y: lambda: None)
     assert_message_model_error(
         structure,
         types,
@@ -1274,7 +1387,7 @@ def test_invalid_path_2(monkeypatch: Any) -> None:
         Field("F1"): RANGE_INTEGER,
         Field("F2"): RANGE_INTEGER,
     }
-    monkeypatch.setattr(Message, "_Message__prove_reachability", lambda x: None)
+    monkeypatch.setattr(Message, "_Message__prove_reachability", lambda x, y: lambda: None)
     assert_message_model_error(
         structure,
         types,
@@ -2890,6 +3003,53 @@ def test_paths() -> None:
     }
 
 
+def test_iter_paths() -> None:
+    structure = [
+        Link(INITIAL, Field("L")),
+        Link(Field("L"), Field("O"), condition=Greater(Variable("L"), Number(100))),
+        Link(Field("L"), Field("O"), condition=LessEqual(Variable("L"), Number(100))),
+        Link(Field("O"), FINAL),
+    ]
+    message = Message("P::M", structure, {Field("L"): MODULAR_INTEGER, Field("O"): MODULAR_INTEGER})
+    paths = message.iter_paths(FINAL)
+    assert next(paths) == (structure[0], structure[1], structure[3])
+    assert next(paths) == (structure[0], structure[2], structure[3])
+    assert next(paths, None) is None
+    assert list(message.iter_paths(Field("L"))) == [(structure[0],)]
+    assert list(message.iter_paths(INITIAL)) == []
+    assert set(message.iter_paths(Field("O"))) == message.paths(Field("O"))
+
+
+def test_iter_paths_many_branches() -> None:
+    fields = [Field(f"F{i}") for i in range(40)]
+    structure = [Link(INITIAL, fields[0])]
+    for source, target in zip(fields, fields[1:]):
+        structure.append(Link(source, target, condition=Equal(Variable(source.name), Number(1))))
+        structure.append(Link(source, target, condition=NotEqual(Variable(source.name), Number(1))))
+    structure.append(Link(fields[-1], FINAL))
+    message = UnprovenMessage("P::M", structure, {f: MODULAR_INTEGER for f in fields})
+    path = next(message.iter_paths(FINAL))
+    assert [l.target for l in path] == [*fields, FINAL]
+
+
+def test_iter_paths_cycle() -> None:
+    structure = [
+        Link(INITIAL, Field("X")),
+        Link(Field("X"), Field("Y")),
+        Link(Field("Y"), Field("Z")),
+        Link(Field("Z"), Field("X")),
+        Link(Field("X"), FINAL),
+    ]
+    message = UnprovenMessage(
+        "P::M",
+        structure,
+        {Field("X"): MODULAR_INTEGER, Field("Y"): MODULAR_INTEGER, Field("Z"): MODULAR_INTEGER},
+    )
+    assert list(message.iter_paths(FINAL)) == [(structure[0], structure[4])]
+    assert list(message.iter_paths(Field("Z"))) == [(structure[0], structure[1], structure[2])]
+    assert message.paths(Field("X")) == {(structure[0],)}
+
+
 def test_message_str() -> None:
     message = Message(
         "P::M",
@@ -1,8 +1,13 @@
+import os
+import pickle
+import zlib
 from copy import copy
-from typing import Sequence
+from pathlib import Path
+from typing import Any, Sequence
 
 import pytest
 
+from rflx import __version__, model
 from rflx.error import Location, RecordFluxError
 from rflx.expression import Number
 from rflx.identifier import ID
@@ -140,3 +145,115 @@ def test_invalid_enumeration_type_identical_literals() -> None:
         r"<stdin>:4:16: model: error: conflicting literals: Bar\n"
         r'<stdin>:3:33: model: info: previous occurrence of "Bar"',
     )
+
+
+def test_dump_load(tmp_path: Path) -> None:
+    snapshot = tmp_path / "model.rflxm"
+    m = Model(models.ETHERNET_MODEL.types, [models.SESSION])
+    m.dump(snapshot)
+    loaded = Model.load(snapshot)
+    assert loaded == m
+    assert all(
+        message._state.definite_predecessors is not None  # pylint: disable=protected-access
+        for message in loaded.messages
+    )
+
+
+def test_load_outdated(tmp_path: Path) -> None:
+    specfile = tmp_path / "p.rflx"
+    specfile.write_text("package P is type T is mod 256; end P;")
+    snapshot = tmp_path / "model.rflxm"
+    Model([ModularInteger("P::T", Number(256), Location((1, 14), specfile))]).dump(snapshot)
+    assert Model.load(snapshot).types[0].identifier == ID("P::T")
+    specfile.write_text("package P is type T is mod 2**16; end P;")
+    with pytest.raises(
+        RecordFluxError,
+        match=(
+            r"^"
+            rf'model: error: outdated model snapshot "{snapshot}"\n'
+            r'model: info: changed specification file "p.rflx"'
+            r"$"
+        ),
+    ):
+        Model.load(snapshot)
+    assert Model.load(snapshot, check_sources=False).types[0].identifier == ID("P::T")
+    specfile.unlink()
+    with pytest.raises(
+        RecordFluxError,
+        match=(
+            r"^"
+            rf'model: error: outdated model snapshot "{snapshot}"\n'
+            r'model: info: missing specification file "p.rflx"'
+            r"$"
+        ),
+    ):
+        Model.load(snapshot)
+
+
+def test_load_other_working_directory(monkeypatch: Any, tmp_path: Path) -> None:
+    (tmp_path / "specs").mkdir()
+    (tmp_path / "specs" / "p.rflx").write_text("package P is type T is mod 256; end P;")
+    (tmp_path / "other").mkdir()
+    monkeypatch.chdir(tmp_path)
+    Model([ModularInteger("P::T", Number(256), Location((1, 14), Path("specs/p.rflx")))]).dump(
+        Path("model.rflxm")
+    )
+    monkeypatch.chdir(tmp_path / "other")
+    assert Model.load(Path("../model.rflxm")).types[0].identifier == ID("P::T")
+    (tmp_path / "moved").mkdir()
+    (tmp_path / "model.rflxm").rename(tmp_path / "moved" / "model.rflxm")
+    (tmp_path / "specs").rename(tmp_path / "moved" / "specs")
+    (tmp_path / "moved").rename(tmp_path / "other" / "moved")
+    assert Model.load(Path("moved/model.rflxm")).types[0].identifier == ID("P::T")
+
+
+def test_load_invalid(tmp_path: Path) -> None:
+    snapshot = tmp_path / "model.rflxm"
+    with pytest.raises(RecordFluxError, match=r'^model: error: unable to read model snapshot "'):
+        Model.load(snapshot)
+    header = model.model.SNAPSHOT_MAGIC + model.model.SNAPSHOT_FORMAT.to_bytes(2, "big")
+    for content in [
+        b"invalid",
+        header + b"invalid",
+        header + zlib.compress(pickle.dumps(1)),
+        header + zlib.compress(pickle.dumps((1, 2))),
+        header + zlib.compress(pickle.dumps((__version__, {}, "model"))),
+    ]:
+        snapshot.write_bytes(content)
+        with pytest.raises(
+            RecordFluxError, match=rf'^model: error: invalid model snapshot "{snapshot}"$'
+        ):
+            Model.load(snapshot)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="file permissions not supported")
+def test_load_untrusted(tmp_path: Path) -> None:
+    snapshot = tmp_path / "model.rflxm"
+    models.TLV_MODEL.dump(snapshot)
+    snapshot.chmod(0o666)
+    with pytest.raises(
+        RecordFluxError, match=rf'^model: error: untrusted model snapshot "{snapshot}"$'
+    ):
+        Model.load(snapshot)
+    snapshot.chmod(0o644)
+    assert Model.load(snapshot) == models.TLV_MODEL
+    tmp_path.chmod(0o777)
+    with pytest.raises(
+        RecordFluxError, match=rf'^model: error: untrusted model snapshot "{snapshot}"$'
+    ):
+        Model.load(snapshot)
+    tmp_path.chmod(0o1777)
+    assert Model.load(snapshot) == models.TLV_MODEL
+    tmp_path.chmod(0o755)
+
+
+def test_load_incompatible_version(monkeypatch: Any, tmp_path: Path) -> None:
+    snapshot = tmp_path / "model.rflxm"
+    monkeypatch.setattr(model.model, "__version__", "0.1.0")
+    models.TLV_MODEL.dump(snapshot)
+    monkeypatch.undo()
+    with pytest.raises(
+        RecordFluxError,
+        match=rf'^model: error: model snapshot "{snapshot}" was created by RecordFlux 0.1.0$',
+    ):
+        Model.load(snapshot)
@@ -1,5 +1,8 @@
 # pylint: disable=too-many-lines
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, List, Union
 
 import pytest
 
@@ -11,6 +14,7 @@ from rflx.model import (
     INITIAL,
     Array,
     Enumeration,
+    Field,
     Link,
     Message,
     ModularInteger,
@@ -21,6 +25,7 @@ from rflx.model import (
 from rflx.pyrflx import (
     ArrayValue,
     Bitstring,
+    ColumnarDecoder,
     EnumValue,
     IntegerValue,
     MessageValue,
@@ -28,10 +33,13 @@ from rflx.pyrflx import (
     Package,
     PyRFLX,
     TypeValue,
+    aio,
+    layout,
     utils,
 )
 from rflx.pyrflx.error import PyRFLXError
-from tests.const import EX_SPEC_DIR, SPEC_DIR
+from tests.const import CAPTURED_DIR, EX_SPEC_DIR, SPEC_DIR
+from tests.data import models
 
 
 def assert_bytestring_error(msg: MessageValue, msg_name: ID) -> None:
@@ -48,6 +56,14 @@ def test_file_not_found(tmp_path: Path) -> None:
         PyRFLX.from_specs([f"{tmp_path}/test.rflx"])
 
 
+def test_from_snapshot(tmp_path: Path) -> None:
+    models.TLV_MODEL.dump(tmp_path / "model.rflxm")
+    pyrflx_ = PyRFLX.from_snapshot(str(tmp_path / "model.rflxm"))
+    message = pyrflx_["TLV"]["Message"]
+    message.set("Tag", "Msg_Error")
+    assert message.valid_message
+
+
 def test_package_name() -> None:
     p = Package("Test")
     assert p.name == "Test"
@@ -437,6 +453,489 @@ def test_message_value_parse_from_bitstring(
     msg_array.parse(tlv_message_value.bytestring)
 
 
+def test_message_value_parse_from_memoryview(tlv_message_value: MessageValue) -> None:
+    # pylint: disable=protected-access
+    test_bytes = b"\x01\x00\x04\x01\x02\x03\x04"
+    tlv_message_value.parse(memoryview(test_bytes))
+    assert tlv_message_value.valid_message
+    value = tlv_message_value._fields["Value"].typeval
+    assert isinstance(value._value, memoryview)
+    assert value._value.obj is test_bytes
+    assert tlv_message_value.get("Value") == b"\x01\x02\x03\x04"
+    assert isinstance(value._value, bytes)
+    assert tlv_message_value.bytestring == test_bytes
+
+
+@pytest.mark.parametrize("readonly", [False, True])
+def test_message_value_parse_from_bytearray(readonly: bool) -> None:
+    message = MessageValue(models.TLV_MESSAGE)
+    test_bytes = bytearray(b"\x01\x00\x04\x01\x02\x03\x04")
+    view = memoryview(test_bytes)
+    message.parse(view.toreadonly() if readonly else view)
+    view.release()
+    test_bytes[3:7] = b"\xff\xff\xff\xff"
+    test_bytes.append(0)
+    assert message.valid_message
+    assert message.get("Value") == b"\x01\x02\x03\x04"
+
+
+def test_message_value_parse_static_prefix() -> None:
+    # pylint: disable=protected-access
+    range_integer = RangeInteger("P::Range", expr.Number(1), expr.Number(100), expr.Number(8))
+    modular_integer = ModularInteger("P::Modular", expr.Number(16))
+    message = Message(
+        "P::M",
+        [
+            Link(INITIAL, Field("F1")),
+            Link(Field("F1"), Field("F2")),
+            Link(Field("F2"), Field("F3")),
+            Link(
+                Field("F3"),
+                Field("F4"),
+                condition=expr.Greater(expr.Variable("F3"), expr.Number(1)),
+                size=expr.Mul(expr.Variable("F1"), expr.Number(8)),
+            ),
+            Link(Field("F3"), FINAL, condition=expr.LessEqual(expr.Variable("F3"), expr.Number(1))),
+            Link(Field("F4"), FINAL),
+        ],
+        {
+            Field("F1"): range_integer,
+            Field("F2"): modular_integer,
+            Field("F3"): modular_integer,
+            Field("F4"): Opaque(),
+        },
+    )
+    msg = MessageValue(message)
+    assert msg._layout.static_prefix == (("F1", 0, 8), ("F2", 8, 4))
+    msg.parse(b"\x02\x32\xab\xcd")
+    assert msg.valid_message
+    assert msg.get("F1") == 2
+    assert msg.get("F2") == 3
+    assert msg.get("F3") == 2
+    assert msg.get("F4") == b"\xab\xcd"
+    assert msg.bytestring == b"\x02\x32\xab\xcd"
+    msg = MessageValue(message)
+    msg.parse(Bitstring("0000000100010001"))
+    assert msg.valid_message
+    assert msg.valid_fields == ["F1", "F2", "F3"]
+    msg = MessageValue(message)
+    with pytest.raises(
+        PyRFLXError,
+        match=(
+            "^"
+            "pyrflx: error: cannot set value for field F1\n"
+            "pyrflx: error: value 101 not in type range 1 .. 100"
+            "$"
+        ),
+    ):
+        msg.parse(b"\x65\x32")
+    msg = MessageValue(message)
+    with pytest.raises(
+        PyRFLXError,
+        match=(
+            "^"
+            "pyrflx: error: Bitstring representing the message is too short"
+            " - stopped while parsing field: F2"
+            "$"
+        ),
+    ):
+        msg.parse(b"\x02")
+
+
+def test_message_value_clone() -> None:
+    frame = MessageValue(models.ETHERNET_FRAME)
+    first = frame.clone()
+    second = frame.clone()
+    assert first == second
+    assert first is not second
+    first.set("Destination", 1)
+    assert first.valid_fields == ["Destination"]
+    assert second.valid_fields == []
+    assert frame.clone().valid_fields == []
+    copied = first.copy()
+    copied.set("Source", 2)
+    assert copied.valid_fields == ["Destination", "Source"]
+    assert first.valid_fields == ["Destination"]
+    assert first.clone().valid_fields == []
+    assert copied.clone().accessible_fields == frame.accessible_fields
+
+
+def test_message_value_reset() -> None:
+    frame = MessageValue(models.ETHERNET_FRAME)
+    msg = frame.clone()
+    fields = dict(msg._fields)  # pylint: disable=protected-access
+    msg.parse(b"\xe0\x28\x61\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x2e" + bytes(46))
+    assert msg.valid_message
+    msg.reset()
+    assert msg == frame.clone()
+    assert msg.valid_fields == []
+    assert msg.accessible_fields == frame.clone().accessible_fields
+    assert all(f is fields[n] for n, f in msg._fields.items())  # pylint: disable=protected-access
+    msg.set("Destination", 1)
+    assert msg.valid_fields == ["Destination"]
+
+
+def test_package_pool() -> None:
+    package = Package("Ethernet")
+    package["Frame"] = MessageValue(models.ETHERNET_FRAME)
+    pool = package.pool("Frame", 2)
+    assert pool.size == 2
+    assert pool.available == 2
+    first = pool.acquire()
+    second = pool.acquire()
+    third = pool.acquire()
+    assert pool.available == 0
+    assert first is not second and second is not third
+    first.set("Destination", 1)
+    pool.release(first)
+    with pytest.raises(PyRFLXError, match='^pyrflx: error: "Ethernet::Frame" already released$'):
+        pool.release(first)
+    pool.release(second)
+    pool.release(third)
+    assert pool.available == 2
+    with pool.borrow() as msg:
+        assert msg is second
+        assert pool.available == 1
+    with pool.borrow() as msg:
+        assert msg is second
+        assert msg.valid_fields == []
+    assert pool.acquire() is second
+    assert pool.acquire() is first
+    assert first.valid_fields == []
+    with pytest.raises(
+        PyRFLXError,
+        match='^pyrflx: error: cannot release "TLV::Message" to pool of "Ethernet::Frame"$',
+    ):
+        pool.release(MessageValue(models.TLV_MESSAGE))
+    with pytest.raises(PyRFLXError, match="^pyrflx: error: invalid pool size 0$"):
+        package.pool("Frame", 0)
+
+
+def test_package_parse_many() -> None:
+    package = Package("Ethernet")
+    package["Frame"] = MessageValue(models.ETHERNET_FRAME)
+    files = [
+        "ethernet_802.3.raw",
+        "ethernet_invalid_too_short.raw",
+        "ethernet_ipv4_udp.raw",
+        "ethernet_vlan_tag.raw",
+        "ethernet_invalid_too_long.raw",
+    ]
+    buffers = [(CAPTURED_DIR / f).read_bytes() for f in files] * 3
+    expected: List[Union[str, MessageValue]] = []
+    for buffer in buffers:
+        message = package["Frame"]
+        try:
+            message.parse(buffer)
+            expected.append(message)
+        except PyRFLXError as e:
+            expected.append(str(e))
+    assert any(isinstance(e, str) for e in expected)
+    assert any(isinstance(e, MessageValue) for e in expected)
+
+    def check(results: Iterator[Union[MessageValue, PyRFLXError]]) -> None:
+        values = [str(r) if isinstance(r, PyRFLXError) else r for r in results]
+        assert values == expected
+        for result, message in zip(values, expected):
+            if isinstance(result, MessageValue):
+                assert isinstance(message, MessageValue)
+                assert result.bytestring == message.bytestring
+                assert result.valid_message
+                assert result.accessible_fields == message.accessible_fields
+                result.set("Destination", 0)
+                assert result.get("Destination") == 0
+
+    check(package.parse_many("Frame", buffers))
+
+    with ThreadPoolExecutor(2) as executor:
+        check(package.parse_many("Frame", iter(buffers), executor, chunk_size=2, workers=2))
+    with ProcessPoolExecutor(2) as processes:
+        check(package.parse_many("Frame", iter(buffers), processes, chunk_size=4))
+    with package.process_pool(2) as pool:
+        assert pool.workers == 2
+        check(package.parse_many("Frame", iter(buffers), pool, chunk_size=4))
+        assert list(package.parse_many("Frame", [], pool)) == []
+    with pytest.raises(PyRFLXError, match="^pyrflx: error: invalid chunk size 0$"):
+        package.parse_many("Frame", buffers, chunk_size=0)
+    with pytest.raises(PyRFLXError, match="^pyrflx: error: invalid number of workers 0$"):
+        package.parse_many("Frame", buffers, workers=0)
+
+
+def test_columnar_decoder() -> None:
+    message = Message(
+        "P::M",
+        [
+            Link(INITIAL, Field("F1")),
+            Link(Field("F1"), Field("F2")),
+            Link(Field("F2"), Field("F3")),
+            Link(Field("F3"), Field("F4")),
+            Link(Field("F4"), FINAL),
+        ],
+        {
+            Field("F1"): RangeInteger("P::Range", expr.Number(1), expr.Number(100), expr.Number(8)),
+            Field("F2"): ModularInteger("P::Modular", expr.Number(16)),
+            Field("F3"): models.ENUMERATION_PRIORITY,
+            Field("F4"): ModularInteger("P::Large", expr.Number(2 ** 36)),
+        },
+    )
+    decoder = ColumnarDecoder(message)
+    assert decoder.record_size == 7
+    records = [
+        b"\x01\x10\x0f\x00\x00\x00\x00",
+        b"\x64\xff\xf1\x23\x45\x67\x89",
+        b"\x2a\x5a\x5f\xff\xff\xff\xff",
+    ]
+    columns = decoder.decode(b"".join(records))
+    assert set(columns) == {"F1", "F2", "F3", "F4"}
+    for i, record in enumerate(records):
+        msg = MessageValue(message)
+        msg.parse(record)
+        assert columns["F1"][i] == msg.get("F1")
+        assert columns["F2"][i] == msg.get("F2")
+        assert columns["F4"][i] == msg.get("F4")
+    assert list(columns["F3"]) == [0x00, 0xFF, 0xA5]
+    assert all(len(c) == 0 for c in decoder.decode(b"").values())
+    with pytest.raises(
+        PyRFLXError, match="^pyrflx: error: buffer size 8 is not a multiple of record size 7$"
+    ):
+        decoder.decode(bytes(8))
+    with pytest.raises(
+        PyRFLXError, match="^pyrflx: error: value 0 of field F1 not in type range 1 .. 100$"
+    ):
+        decoder.decode(records[0] + bytes(7))
+
+
+def test_columnar_decoder_invalid_enum_value() -> None:
+    priority = Enumeration(
+        "P::Priority",
+        [("Low", expr.Number(1)), ("High", expr.Number(7))],
+        expr.Number(8),
+        False,
+    )
+    message = Message(
+        "P::M",
+        [Link(INITIAL, Field("F")), Link(Field("F"), FINAL)],
+        {Field("F"): priority},
+    )
+    assert list(ColumnarDecoder(message).decode(b"\x01\x07\x07")["F"]) == [1, 7, 7]
+    with pytest.raises(
+        PyRFLXError, match="^pyrflx: error: value 2 of field F is not a valid enum value$"
+    ):
+        ColumnarDecoder(message).decode(b"\x01\x02\x03")
+
+
+def test_columnar_decoder_overlapping_fields() -> None:
+    message = Message(
+        "P::M",
+        [
+            Link(INITIAL, Field("F1")),
+            Link(Field("F1"), Field("F2"), first=expr.First("Message")),
+            Link(Field("F2"), FINAL),
+        ],
+        {
+            Field("F1"): ModularInteger("P::T1", expr.Number(2 ** 16)),
+            Field("F2"): ModularInteger("P::T2", expr.Number(2 ** 8)),
+        },
+        skip_proof=True,
+    )
+    decoder = ColumnarDecoder(message)
+    assert decoder.record_size == 2
+    columns = decoder.decode(b"")
+    assert list(columns["F1"]) == [0x0102, 0x0304]
+    assert list(columns["F2"]) == [0x01, 0x03]
+
+
+@pytest.mark.parametrize(
+    "message, error",
+    [
+        (models.ETHERNET_FRAME, 'message "Ethernet::Frame" has no static layout'),
+        (models.NULL_MESSAGE, 'message "Null::Message" has no static layout'),
+        (models.ARRAYS_MESSAGE, 'message "Arrays::Message" has no static layout'),
+        (
+            Message(
+                "P::M",
+                [Link(INITIAL, Field("F"), size=expr.Number(16)), Link(Field("F"), FINAL)],
+                {Field("F"): Opaque()},
+            ),
+            'field "F" of "P::M" is not scalar',
+        ),
+        (
+            Message(
+                "P::M",
+                [Link(INITIAL, Field("F")), Link(Field("F"), FINAL)],
+                {Field("F"): ModularInteger("P::T", expr.Number(2 ** 4))},
+                skip_proof=True,
+            ),
+            'size of "P::M" is not a multiple of 8 bits',
+        ),
+        (
+            Message(
+                "P::M",
+                [Link(INITIAL, Field("F")), Link(Field("F"), FINAL)],
+                {Field("F"): RangeInteger("P::T", expr.Number(0), expr.Number(1), expr.Number(72))},
+            ),
+            'field "F" of "P::M" exceeds 64 bits',
+        ),
+    ],
+)
+def test_columnar_decoder_unsupported_message(message: Message, error: str) -> None:
+    with pytest.raises(PyRFLXError, match=f"^pyrflx: error: {error}$"):
+        ColumnarDecoder(message)
+
+
+def test_message_value_feed() -> None:
+    msg = MessageValue(models.TLV_MESSAGE)
+    assert msg.feed(b"") == 8
+    assert msg.feed(b"\x01") == 16
+    assert msg.feed(b"\x00") == 8
+    assert msg.valid_fields == ["Tag"]
+    assert msg.feed(b"\x02\xaa") == 8
+    assert msg.unparsed_data == b""
+    assert msg.feed(b"\xbb\xcc") == 0
+    assert msg.valid_message
+    assert msg.get("Value") == b"\xaa\xbb"
+    assert msg.unparsed_data == b"\xcc"
+    assert msg.feed(b"\xdd") == 0
+    assert msg.unparsed_data == b"\xcc\xdd"
+    msg.reset()
+    assert msg.unparsed_data == b""
+    assert msg.feed(b"\x03\x01") == 0
+    assert msg.valid_message
+    assert msg.get("Tag") == "Msg_Error"
+    assert msg.unparsed_data == b"\x01"
+
+
+def test_message_value_feed_static_prefix() -> None:
+    data = (CAPTURED_DIR / "ethernet_802.3.raw").read_bytes()
+    expected = MessageValue(models.ETHERNET_FRAME)
+    expected.parse(data)
+    msg = MessageValue(models.ETHERNET_FRAME)
+    assert msg.feed(data[:5]) == 56
+    assert msg.valid_fields == []
+    assert msg.feed(data[5:13]) == 8
+    assert msg.valid_fields == ["Destination", "Source"]
+    assert msg.feed(data[13:]) == 0
+    assert msg.valid_message
+    assert msg == expected
+
+
+def test_message_value_feed_error() -> None:
+    msg = MessageValue(models.TLV_MESSAGE)
+    with pytest.raises(
+        PyRFLXError,
+        match=(
+            "^"
+            "pyrflx: error: cannot set value for field Tag\n"
+            "pyrflx: error: Number 0 is not a valid enum value"
+            "$"
+        ),
+    ):
+        msg.feed(b"\x00")
+    msg = MessageValue(models.ETHERNET_FRAME)
+    with pytest.raises(
+        PyRFLXError,
+        match=(
+            "^pyrflx: error: cannot parse field Payload incrementally:"
+            " size depends on end of message$"
+        ),
+    ):
+        msg.feed((CAPTURED_DIR / "ethernet_ipv4_udp.raw").read_bytes())
+    msg = MessageValue(models.ARRAYS_ARRAY_SIZE_DEFINED_BY_MESSAGE_SIZE)
+    with pytest.raises(
+        PyRFLXError,
+        match=(
+            "^pyrflx: error: cannot parse message Arrays::Array_Size_Defined_By_Message_Size"
+            " incrementally: size of Vector depends on end of message$"
+        ),
+    ):
+        msg.feed(b"\x01")
+    assert msg.valid_fields == []
+
+
+def test_message_value_feed_byte_by_byte() -> None:
+    data = (CAPTURED_DIR / "ethernet_802.3.raw").read_bytes()
+    expected = MessageValue(models.ETHERNET_FRAME)
+    expected.parse(data)
+    msg = MessageValue(models.ETHERNET_FRAME)
+    for byte in data[:20]:
+        assert msg.feed(bytes([byte])) > 0
+    copy = msg.copy()
+    assert copy.feed(data[20:]) == 0
+    assert copy == expected
+    assert "Payload" not in msg.valid_fields
+    for byte in data[20:-1]:
+        assert msg.feed(bytes([byte])) > 0
+    assert msg.feed(data[-1:] + b"\xff") == 0
+    assert msg.valid_message
+    assert msg == expected
+    assert msg.unparsed_data == b"\xff"
+
+
+def test_aio_read_message() -> None:
+    package = Package("TLV")
+    package["Message"] = MessageValue(models.TLV_MESSAGE)
+
+    async def read() -> None:
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"\x01\x00\x02\xaa\xbb\x03\x01")
+        reader.feed_eof()
+        message = await aio.read_message(reader, package, "Message")
+        assert message.valid_message
+        assert message.get("Value") == b"\xaa\xbb"
+        message = await aio.read_message(reader, package, "Message")
+        assert message.valid_message
+        assert message.get("Tag") == "Msg_Error"
+        with pytest.raises(asyncio.IncompleteReadError):
+            await aio.read_message(reader, package, "Message")
+
+    asyncio.run(read())
+
+
+def test_aio_write_message() -> None:
+    package = Package("TLV")
+    package["Message"] = MessageValue(models.TLV_MESSAGE)
+    message = package["Message"]
+    message.set("Tag", "Msg_Data")
+    message.set("Length", 2)
+    message.set("Value", b"\xaa\xbb")
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await aio.write_message(writer, await aio.read_message(reader, package, "Message"))
+        writer.close()
+
+    async def echo() -> None:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname())
+            await aio.write_message(writer, message)
+            assert await aio.read_message(reader, package, "Message") == message
+            writer.close()
+
+    asyncio.run(echo())
+
+
+def test_bitstring() -> None:
+    bits = Bitstring.from_bytes(b"\x12\x34\x56")
+    assert len(bits) == 24
+    assert int(bits) == 0x123456
+    assert bits[4:12] == Bitstring("00100011")
+    assert bits[4:12][2:6] == Bitstring("1000")
+    assert bits[20:] == Bitstring("0110")
+    assert bits[23] == Bitstring("0")
+    assert bytes(bits[8:]) == b"\x34\x56"
+    assert bytes(bits[:12]) == b"\x12\x03"
+    assert bits[:4] + bits[16:] == Bitstring("000101010110")
+    assert Bitstring.join([bits[:8], Bitstring(), bits[16:]]) == Bitstring.from_bytes(b"\x12\x56")
+    assert Bitstring.from_int(5, 4) == Bitstring("0101")
+    assert str(Bitstring.from_int(0, 0)) == ""
+    with pytest.raises(IndexError):
+        bits[20:25]  # pylint: disable=pointless-statement
+    with pytest.raises(
+        PyRFLXError, match="^pyrflx: error: value 16 cannot be represented by 4 bits$"
+    ):
+        Bitstring.from_int(16, 4)
+
+
 def test_message_value_parse_from_bitstring_invalid(tlv_message_value: MessageValue) -> None:
     with pytest.raises(
         PyRFLXError, match="^pyrflx: error: Bitstring does not consist of only 0 and 1$"
@@ -1179,3 +1678,56 @@ def test_message_size_unverified() -> None:
     message.set("A", 2)
     message.set("B", b"\x01\x02")
     assert message.valid_message
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        (expr.TRUE, True),
+        (expr.Number(42), 42),
+        (expr.Variable("X"), 8),
+        (expr.Variable("x"), 8),
+        (-expr.Variable("X"), -8),
+        (expr.Variable("Y"), None),
+        (expr.Variable("L"), 2),
+        (expr.Size("F"), 16),
+        (expr.Add(expr.Last("F"), expr.Number(1)), 24),
+        (expr.Sub(expr.Size("F"), expr.Variable("X")), 8),
+        (expr.Mul(expr.Variable("X"), expr.Variable("Y")), None),
+        (expr.Div(expr.Size("F"), expr.Number(8)), 2),
+        (expr.Div(expr.Size("F"), expr.Number(3)), None),
+        (expr.Mod(expr.Size("F"), expr.Number(3)), 1),
+        (expr.Pow(expr.Number(2), expr.Variable("X")), 256),
+        (expr.Equal(expr.Variable("X"), expr.Number(8)), True),
+        (expr.Less(expr.Variable("X"), expr.Variable("L")), False),
+        (expr.Equal(expr.Variable("Y"), expr.Variable("Y")), True),
+        (expr.NotEqual(expr.Variable("Y"), expr.Number(8)), None),
+        (expr.Equal(expr.Variable("X"), expr.TRUE), None),
+        (expr.And(expr.Equal(expr.Variable("Y"), expr.Number(1)), expr.FALSE), False),
+        (expr.And(expr.Equal(expr.Variable("Y"), expr.Number(1)), expr.TRUE), None),
+        (expr.Or(expr.Equal(expr.Variable("Y"), expr.Number(1)), expr.TRUE), True),
+        (expr.Or(expr.Equal(expr.Variable("Y"), expr.Number(1)), expr.FALSE), None),
+        (expr.ValidChecksum("F"), True),
+        (expr.Not(expr.TRUE), None),
+        (expr.UNDEFINED, None),
+    ],
+)
+def test_compile_expression(expression: expr.Expr, expected: layout.Value) -> None:
+    literals: Dict[expr.Name, expr.Expr] = {expr.Variable("L"): expr.Number(2)}
+    mapping: Dict[expr.Name, expr.Expr] = {
+        expr.Variable("X"): expr.Number(8),
+        expr.Size("F"): expr.Number(16),
+        expr.Last("F"): expr.Number(23),
+        expr.ValidChecksum("F"): expr.TRUE,
+    }
+    values: Dict[str, int] = {}
+    for k, e in mapping.items():
+        v = layout.value(e, literals)
+        assert v is not None
+        values[layout.key(k)] = v
+    result = layout.compile_expression(expression, literals)(values)
+    assert result == expected
+    assert type(result) is type(expected)  # pylint: disable=unidiomatic-typecheck
+    if expected is not None:
+        substituted = expression.substituted(mapping={**mapping, **literals})
+        assert layout.value(substituted.simplified(), {}) == expected
@@ -1,77 +1,481 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+import pytest
+import z3
 
 from rflx import expression as expr, model
+from rflx.expression import ProofResult
 from rflx.specification import cache
 from tests.data.models import TLV_MESSAGE
 
 
 def test_init(tmp_path: Path) -> None:
     cache.CACHE_DIR = tmp_path / "Test"
-    cache.Cache()
+    c = cache.Cache()
+    assert c.get("A") is None
+    c.flush()
     assert not (tmp_path / "Test").exists()
 
 
-def test_init_valid(tmp_path: Path) -> None:
+def test_init_invalid(tmp_path: Path) -> None:
     cache.CACHE_DIR = tmp_path
     with open(tmp_path / cache.VERIFICATION_FILE, "x") as f:
-        f.write("{}")
-    cache.Cache()
+        f.write("invalid")
+    c = cache.Cache()
+    assert c.get("A") is None
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    assert cache.Cache().get("A") == ProofResult.SAT
 
 
-def test_init_invalid(tmp_path: Path) -> None:
+def test_init_directory(monkeypatch: Any, tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path / "Default"
+    monkeypatch.setenv(cache.CACHE_DIR_VARIABLE, str(tmp_path / "Environment"))
+    c = cache.Cache()
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    assert (tmp_path / "Environment" / cache.VERIFICATION_FILE).exists()
+    c = cache.Cache(directory=tmp_path / "Explicit")
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    assert (tmp_path / "Explicit" / cache.VERIFICATION_FILE).exists()
+    assert not (tmp_path / "Default").exists()
+
+
+def test_journal_mode(tmp_path: Path) -> None:
     cache.CACHE_DIR = tmp_path
-    with open(tmp_path / cache.VERIFICATION_FILE, "x") as f:
-        f.write("invalid")
-    cache.Cache()
+    c = cache.Cache()
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    connection = sqlite3.connect(str(tmp_path / cache.VERIFICATION_FILE))
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    connection.close()
 
 
-def test_verified(tmp_path: Path) -> None:
-    m1 = model.Message(
-        "P::M",
-        [
-            model.Link(model.INITIAL, model.Field("A")),
-            model.Link(model.Field("A"), model.FINAL),
-        ],
-        {model.Field("A"): model.ModularInteger("P::T", expr.Pow(expr.Number(2), expr.Number(8)))},
-    )
-    m2 = model.Message(
-        "P::M",
-        [
-            model.Link(model.INITIAL, model.Field("B")),
-            model.Link(model.Field("B"), model.FINAL),
-        ],
-        {model.Field("B"): model.ModularInteger("P::T", expr.Pow(expr.Number(2), expr.Number(8)))},
+def test_add(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    c = cache.Cache()
+    c.add("A", ProofResult.SAT)
+    c.add("B", ProofResult.UNSAT)
+    assert c.get("A") == ProofResult.SAT
+    assert c.get("B") == ProofResult.UNSAT
+    assert cache.Cache().get("A") is None
+    c.flush()
+    c = cache.Cache()
+    assert c.get("A") == ProofResult.SAT
+    assert c.get("B") == ProofResult.UNSAT
+    assert c.get("C") is None
+    assert len(c) == 2
+
+
+def test_eviction(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    c = cache.Cache(max_entries=2)
+    c.add("A", ProofResult.SAT)
+    c.add("B", ProofResult.SAT)
+    c.flush()
+    assert c.get("A") == ProofResult.SAT
+    c.add("C", ProofResult.SAT)
+    c.flush()
+    assert len(c) == 2
+    c = cache.Cache()
+    assert c.get("A") == ProofResult.SAT
+    assert c.get("B") is None
+    assert c.get("C") == ProofResult.SAT
+
+
+def test_merge(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    c = cache.Cache()
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    other = cache.Cache()
+    assert other.get("A") == ProofResult.SAT
+    other.add("B", ProofResult.UNSAT)
+    c.merge(other)
+    assert c.get("B") == ProofResult.UNSAT
+    c.flush()
+    assert cache.Cache().get("B") == ProofResult.UNSAT
+
+
+def test_merge_disabled(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    other = cache.Cache()
+    other.add("A", ProofResult.SAT)
+    c = cache.Cache(enabled=False)
+    c.merge(other)
+    c.flush()
+    assert not (tmp_path / cache.VERIFICATION_FILE).exists()
+
+
+def add_entries(directory: Path, worker: int) -> None:
+    c = cache.Cache(directory=directory)
+    for i in range(100):
+        c.add(f"{worker}-{i}", ProofResult.SAT)
+    c.flush()
+
+
+def test_concurrent_flush(tmp_path: Path) -> None:
+    with ProcessPoolExecutor(4) as executor:
+        list(executor.map(add_entries, [tmp_path] * 8, range(8)))
+    c = cache.Cache(directory=tmp_path)
+    assert len(c) == 800
+    assert all(c.get(f"{w}-{i}") == ProofResult.SAT for w in range(8) for i in range(100))
+
+
+def test_get_many(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    c = cache.Cache()
+    c.add("A", ProofResult.SAT)
+    c.add("B", ProofResult.UNSAT)
+    c.flush()
+    c.add("C", ProofResult.SAT)
+    assert c.get_many(["A", "C", "D"]) == {"A": ProofResult.SAT, "C": ProofResult.SAT}
+    assert cache.Cache().get_many(["A", "B", "C"]) == {
+        "A": ProofResult.SAT,
+        "B": ProofResult.UNSAT,
+    }
+
+
+def test_get_many_chunks(tmp_path: Path) -> None:
+    keys = [str(i) for i in range(2 * cache.FETCH_CHUNK_SIZE + 1)]
+    backend = cache.SQLiteBackend(tmp_path / cache.VERIFICATION_FILE)
+    backend.store({k: ProofResult.SAT for k in keys}, [])
+    assert backend.fetch(keys) == {k: ProofResult.SAT for k in keys}
+
+
+@contextmanager
+def run_server(
+    directory: Path, writable: bool = True, token: str = None
+) -> Iterator[Tuple[str, cache.CacheServer]]:
+    server = cache.CacheServer(
+        ("localhost", 0),
+        cache.SQLiteBackend(directory / cache.VERIFICATION_FILE),
+        writable=writable,
+        token=token,
     )
-    m3 = model.Message(
-        "P::M",
-        [
-            model.Link(model.INITIAL, model.Field("A")),
-            model.Link(model.Field("A"), model.FINAL),
-        ],
-        {model.Field("A"): model.ModularInteger("P::T", expr.Pow(expr.Number(2), expr.Number(16)))},
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        yield f"http://localhost:{server.server_address[1]}", server
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path: Path) -> Iterator[str]:
+    with run_server(tmp_path / "Server") as (url, _):
+        yield url
+
+
+def test_http_backend(tmp_path: Path, server: str) -> None:
+    cache.CACHE_DIR = tmp_path / "Local"
+    c = cache.Cache(url=server)
+    assert c.get("A") is None
+    c.add("A", ProofResult.SAT)
+    c.add("B", ProofResult.UNSAT)
+    c.flush()
+    c = cache.Cache(url=server)
+    assert c.get_many(["A", "B", "C"]) == {"A": ProofResult.SAT, "B": ProofResult.UNSAT}
+    assert len(c) == 2
+    assert not (tmp_path / "Local").exists()
+
+
+def test_http_backend_environment(monkeypatch: Any, server: str) -> None:
+    monkeypatch.setenv(cache.CACHE_URL_VARIABLE, server)
+    c = cache.Cache()
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    assert len(cache.HTTPBackend(server)) == 1
+    assert cache.Cache().get("A") == ProofResult.SAT
+
+
+def test_http_backend_unavailable() -> None:
+    c = cache.Cache(url="http://localhost:1")
+    assert c.get("A") is None
+    c.add("A", ProofResult.SAT)
+    c.flush()
+    assert c.get("B") is None
+    assert len(c) == 0
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        b'{"results": {"A": "INVALID"}, "count": 1}',
+        b'{"results": ["A"], "count": 1}',
+        b'{"results": {"A": ["SAT"]}, "count": 1}',
+        b'["A"]',
+        b"invalid",
+    ],
+)
+def test_http_backend_invalid_response(response: bytes) -> None:
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # pylint: disable=invalid-name
+            self.rfile.read(int(self.headers["Content-Length"]))
+            requests.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args: Any) -> None:  # pylint: disable=arguments-differ
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        backend = cache.HTTPBackend(f"http://localhost:{server.server_address[1]}")
+        assert backend.fetch(["A"]) == {}
+        assert backend.fetch(["A"]) == {}
+        assert len(backend) == 0
+        assert requests == ["/fetch"]
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+def test_cache_server_invalid_request(server: str) -> None:
+    for path, data in [("fetch", b"invalid"), ("store", b'{"results": {"A": "X"}, "used": []}')]:
+        with pytest.raises(urllib.error.HTTPError, match="400"):
+            urllib.request.urlopen(f"{server}/{path}", data=data)
+    with pytest.raises(urllib.error.HTTPError, match="404"):
+        urllib.request.urlopen(f"{server}/invalid", data=b"{}")
+    with pytest.raises(urllib.error.HTTPError, match="404"):
+        urllib.request.urlopen(f"{server}/invalid")
+    with urllib.request.urlopen(f"{server}/count") as response:
+        assert json.loads(response.read()) == {"count": 0}
+
+
+def test_cache_server_oversized_request(monkeypatch: Any, server: str) -> None:
+    monkeypatch.setattr(cache, "MAX_REQUEST_SIZE", 16)
+    with pytest.raises(urllib.error.HTTPError, match="413"):
+        urllib.request.urlopen(f"{server}/fetch", data=b'{"keys": ["A", "B", "C"]}')
+    with urllib.request.urlopen(f"{server}/fetch", data=b'{"keys": []}') as response:
+        assert json.loads(response.read()) == {"results": {}}
+
+
+def test_cache_server_read_only(tmp_path: Path) -> None:
+    backend = cache.SQLiteBackend(tmp_path / "Server" / cache.VERIFICATION_FILE)
+    backend.store({"A": ProofResult.SAT}, [])
+    with run_server(tmp_path / "Server", writable=False) as (url, _):
+        with pytest.raises(urllib.error.HTTPError, match="403"):
+            urllib.request.urlopen(f"{url}/store", data=b'{"results": {}, "used": []}')
+        client = cache.HTTPBackend(url)
+        client.store({"B": ProofResult.SAT}, [])
+        assert client.fetch(["A", "B"]) == {"A": ProofResult.SAT}
+        assert len(client) == 1
+
+
+def test_cache_server_token(tmp_path: Path) -> None:
+    with run_server(tmp_path / "Server", token="secret") as (url, _):
+        for path, data in [("count", None), ("fetch", b'{"keys": []}')]:
+            with pytest.raises(urllib.error.HTTPError, match="401"):
+                urllib.request.urlopen(
+                    urllib.request.Request(
+                        f"{url}/{path}", data=data, headers={"Authorization": "Bearer wrong"}
+                    )
+                )
+        assert cache.HTTPBackend(url).fetch(["A"]) == {}
+        client = cache.HTTPBackend(url, token="secret")
+        client.store({"A": ProofResult.SAT}, [])
+        assert client.fetch(["A"]) == {"A": ProofResult.SAT}
+
+
+def test_cache_server_concurrent_requests(tmp_path: Path) -> None:
+    with run_server(tmp_path / "Server") as (url, server):
+        assert isinstance(server, ThreadingHTTPServer)
+        with socket.create_connection(("localhost", server.server_address[1])):
+            # an incomplete request must not block other clients
+            client = cache.HTTPBackend(url, timeout=5)
+            client.store({"A": ProofResult.SAT}, [])
+            assert client.fetch(["A"]) == {"A": ProofResult.SAT}
+
+
+def test_versioned_key(monkeypatch: Any) -> None:
+    key = cache.Cache._versioned_key("A")  # pylint: disable=protected-access
+    monkeypatch.setattr(cache, "KEY_VERSION", cache.KEY_VERSION + "|other")
+    assert cache.Cache._versioned_key("A") != key  # pylint: disable=protected-access
+    assert z3.get_version_string() in cache.KEY_VERSION
+
+
+def test_specification_cache(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    specfile = tmp_path / "test.rflx"
+    specfile.write_text("package Test is end Test;")
+    c = cache.SpecificationCache()
+    key = c.key(specfile, [])
+    assert key is not None
+    assert c.get(key) is None
+    c.add(key, [TLV_MESSAGE], [])
+    assert cache.SpecificationCache().get(key) == ([TLV_MESSAGE], [])
+    assert c.key(specfile, []) == key
+    assert c.key(specfile, ["A"]) != key
+    specfile.write_text("package Test is  end Test;")
+    assert c.key(specfile, []) != key
+    assert c.key(tmp_path / "non_existent.rflx", []) is None
+
+
+def test_specification_cache_unverified(tmp_path: Path) -> None:
+    c = cache.SpecificationCache(directory=tmp_path)
+    c.add("A", [TLV_MESSAGE], [], verified=False)
+    assert c.get("A") is None
+    assert c.get("A", verified=False) == ([TLV_MESSAGE], [])
+
+
+def test_specification_cache_disabled(tmp_path: Path) -> None:
+    specfile = tmp_path / "test.rflx"
+    specfile.write_text("package Test is end Test;")
+    c = cache.SpecificationCache(enabled=False, directory=tmp_path)
+    assert c.key(specfile, []) is None
+    c.add("A", [TLV_MESSAGE], [])
+    assert c.get("A") is None
+    assert not (tmp_path / cache.SPECIFICATION_DIRECTORY).exists()
+
+
+def test_specification_cache_invalid_entry(tmp_path: Path) -> None:
+    c = cache.SpecificationCache(directory=tmp_path)
+    c.add("A", [TLV_MESSAGE], [])
+    (tmp_path / cache.SPECIFICATION_DIRECTORY / "A").write_bytes(b"invalid")
+    assert c.get("A") is None
+
+
+def test_specification_cache_invalid_signature(tmp_path: Path) -> None:
+    c = cache.SpecificationCache(directory=tmp_path / "A")
+    c.add("A", [TLV_MESSAGE], [])
+    entry = (tmp_path / "A" / cache.SPECIFICATION_DIRECTORY / "A").read_bytes()
+    (tmp_path / "A" / cache.SPECIFICATION_DIRECTORY / "B").write_bytes(entry)
+    assert c.get("B") is None
+    (tmp_path / "A" / cache.SPECIFICATION_DIRECTORY / "A").write_bytes(
+        bytes(cache.SIGNATURE_SIZE) + entry[cache.SIGNATURE_SIZE :]
     )
+    assert c.get("A") is None
+    other = cache.SpecificationCache(directory=tmp_path / "B")
+    other.add("C", [], [])
+    (tmp_path / "B" / cache.SPECIFICATION_DIRECTORY / "A").write_bytes(entry)
+    assert other.get("A") is None
+    assert other.get("C") == ([], [])
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="file permissions not supported")
+def test_specification_cache_public_key(tmp_path: Path) -> None:
+    c = cache.SpecificationCache(directory=tmp_path)
+    c.add("A", [], [])
+    (tmp_path / cache.SPECIFICATION_DIRECTORY / cache.SPECIFICATION_KEY_FILE).chmod(0o644)
+    c = cache.SpecificationCache(directory=tmp_path)
+    assert c.get("A") is None
+    c.add("B", [], [])
+    assert not (tmp_path / cache.SPECIFICATION_DIRECTORY / "B").exists()
+
+
+def test_specification_cache_dependencies(tmp_path: Path) -> None:
+    specfile = tmp_path / "test.rflx"
+    specfile.write_text("with Types; package Test is end Test;")
+    c = cache.SpecificationCache(directory=tmp_path)
+    assert c.dependencies(specfile) is None
+    c.add_dependencies(specfile, ["types.rflx"])
+    assert cache.SpecificationCache(directory=tmp_path).dependencies(specfile) == ["types.rflx"]
+    specfile.write_text("package Test is end Test;")
+    assert c.dependencies(specfile) is None
+    c.add_dependencies(specfile, ["../types.rflx"])
+    assert c.dependencies(specfile) is None
+    assert c.dependencies(tmp_path / "non_existent.rflx") is None
+
+
+def test_specification_cache_dependencies_signature(tmp_path: Path) -> None:
+    specfile = tmp_path / "test.rflx"
+    specfile.write_text("with Types; package Test is end Test;")
+    c = cache.SpecificationCache(directory=tmp_path)
+    c.add_dependencies(specfile, ["types.rflx"])
+    (entry,) = (tmp_path / cache.SPECIFICATION_DIRECTORY).glob("*.json")
+    entry.write_bytes(json.dumps(["types.rflx"]).encode("utf-8"))
+    assert c.dependencies(specfile) is None
+    c.add_dependencies(specfile, ["types.rflx"])
+    assert c.dependencies(specfile) == ["types.rflx"]
+    if hasattr(os, "getuid"):
+        (tmp_path / cache.SPECIFICATION_DIRECTORY / cache.SPECIFICATION_KEY_FILE).chmod(0o644)
+        assert cache.SpecificationCache(directory=tmp_path).dependencies(specfile) is None
+
+
+def test_specification_cache_key_format(monkeypatch: Any, tmp_path: Path) -> None:
+    specfile = tmp_path / "test.rflx"
+    specfile.write_text("package Test is end Test;")
+    c = cache.SpecificationCache(directory=tmp_path)
+    key = c.key(specfile, [])
+    monkeypatch.setattr(cache, "SPECIFICATION_FORMAT", cache.SPECIFICATION_FORMAT + 1)
+    assert c.key(specfile, []) != key
+
+
+def test_specification_cache_eviction(tmp_path: Path) -> None:
+    c = cache.SpecificationCache(max_entries=2, directory=tmp_path)
+    for i, key in enumerate(["A", "B", "C"]):
+        c.add(key, [], [])
+        os.utime(tmp_path / cache.SPECIFICATION_DIRECTORY / key, (i, i))
+    assert len(c) == 2
+    assert c.get("A") is None
+    assert c.get("B") == ([], [])
+    assert c.get("C") == ([], [])
+
+
+def test_verified(tmp_path: Path) -> None:
+    def message(value: int) -> model.Message:
+        return model.Message(
+            "P::M",
+            [
+                model.Link(model.INITIAL, model.Field("A")),
+                model.Link(model.Field("A"), model.Field("B")),
+                model.Link(
+                    model.Field("B"),
+                    model.FINAL,
+                    condition=expr.Greater(expr.Variable("B"), expr.Number(value)),
+                ),
+            ],
+            {
+                model.Field("A"): model.ModularInteger(
+                    "P::T", expr.Pow(expr.Number(2), expr.Number(8))
+                ),
+                model.Field("B"): model.ModularInteger(
+                    "P::T", expr.Pow(expr.Number(2), expr.Number(8))
+                ),
+            },
+            skip_proof=True,
+        )
+
     cache.CACHE_DIR = tmp_path
     c = cache.Cache()
-    assert not c.is_verified(m1)
-    assert not c.is_verified(m2)
-    assert not c.is_verified(m3)
-    c.add_verified(m1)
-    assert c.is_verified(m1)
-    assert not c.is_verified(m2)
-    assert not c.is_verified(m3)
-    c.add_verified(m2)
-    assert not c.is_verified(m1)
-    assert c.is_verified(m2)
-    assert not c.is_verified(m3)
-    c.add_verified(m3)
-    assert not c.is_verified(m1)
-    assert not c.is_verified(m2)
-    assert c.is_verified(m3)
+    expr.clear_caches()
+    message(1).verify(cache=c)
+    proofs = len(c)
+    assert proofs > 0
+    message(1).verify(cache=c)
+    assert len(c) == proofs
+    message(2).verify(cache=c)
+    changed = len(c) - proofs
+    assert 0 < changed < proofs
 
 
 def test_verified_disabled(tmp_path: Path) -> None:
     cache.CACHE_DIR = tmp_path
     c = cache.Cache(enabled=False)
-    assert not c.is_verified(TLV_MESSAGE)
-    c.add_verified(TLV_MESSAGE)
-    assert not c.is_verified(TLV_MESSAGE)
+    c.add("A", ProofResult.SAT)
+    assert c.get("A") is None
+    TLV_MESSAGE.verify(cache=c)
+    c.flush()
+    assert not (tmp_path / cache.VERIFICATION_FILE).exists()
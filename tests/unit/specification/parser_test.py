@@ -1,5 +1,6 @@
 # pylint: disable=too-many-lines
 
+import logging
 from itertools import zip_longest
 from pathlib import Path
 from typing import Any, Dict, Sequence
@@ -109,19 +110,282 @@ def test_create_model_cached() -> None:
     p.create_model()
 
 
+def test_create_model_workers() -> None:
+    models_ = []
+    for workers in [1, 2]:
+        p = parser.Parser(workers=workers)
+        p.parse(SPEC_DIR / "message_in_message.rflx", SPEC_DIR / "type_refinement.rflx")
+        models_.append(p.create_model())
+    assert_messages(models_[1].messages, models_[0].messages)
+    assert models_[1].refinements == models_[0].refinements
+
+
+def test_create_model_workers_error() -> None:
+    errors = []
+    for workers in [1, 2]:
+        p = parser.Parser(workers=workers)
+        p.parse_string(
+            """
+                package Test is
+                   type T is mod 256;
+                   type M is
+                      message
+                         A : T;
+                         B : Opaque;
+                      end message;
+                   type N is new M;
+                   type O is
+                      message
+                         A : T
+                            then B
+                               if A > 10 and A < 5;
+                         B : T;
+                      end message;
+                end Test;
+            """
+        )
+        with pytest.raises(RecordFluxError) as e:
+            p.create_model()
+        errors.append(str(e.value))
+    assert errors[1] == errors[0]
+
+
+def test_create_model_workers_error_multiple_packages() -> None:
+    errors = []
+    for workers in [1, 2]:
+        p = parser.Parser(workers=workers)
+        p.parse_string(
+            """
+                package P is
+                   type T is mod 256;
+                   type M is
+                      message
+                         A : T
+                            then B
+                               if A > 10 and A < 5;
+                         B : T;
+                      end message;
+                   type U is mod 2**16;
+                end P;
+            """
+        )
+        p.parse_string(
+            """
+                with P;
+
+                package Q is
+                   type N is new P::M;
+                   type O is
+                      message
+                         A : P::U
+                            then B
+                               if A > 300 and A < 200;
+                         B : P::T;
+                      end message;
+                end Q;
+            """
+        )
+        with pytest.raises(RecordFluxError) as e:
+            p.create_model()
+        errors.append(str(e.value))
+    assert errors[0].index('"P::M"') < errors[0].index('"Q::O"')
+    assert errors[1] == errors[0]
+
+
 def test_create_proven_message(tmp_path: Path) -> None:
     cache.CACHE_DIR = tmp_path
     c = cache.Cache()
     assert parser.create_proven_message(models.VALID_MESSAGE, False, c)
-    assert c.is_verified(models.VALID_MESSAGE)
+    proofs = len(c)
+    assert proofs > 0
+    assert parser.create_proven_message(models.VALID_MESSAGE, False, c)
+    assert len(c) == proofs
 
 
 def test_create_proven_message_error(tmp_path: Path) -> None:
     cache.CACHE_DIR = tmp_path
     c = cache.Cache()
-    with pytest.raises(RecordFluxError):
-        parser.create_proven_message(models.INVALID_MESSAGE, False, c)
-    assert not c.is_verified(models.INVALID_MESSAGE)
+    errors = []
+    for _ in range(2):
+        with pytest.raises(RecordFluxError) as e:
+            parser.create_proven_message(
+                model.UnprovenMessage(
+                    "P::M",
+                    [
+                        Link(INITIAL, Field("F")),
+                        Link(
+                            Field("F"), FINAL, condition=expr.Equal(expr.Number(1), expr.Number(2))
+                        ),
+                    ],
+                    {Field("F"): ModularInteger("P::T", expr.Number(256))},
+                ),
+                False,
+                c,
+            )
+        errors.append(str(e.value))
+    assert errors[0].startswith('model: error: unreachable field "F" in "P::M"')
+    assert errors[1] == errors[0]
+
+
+def test_verifier(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    c = cache.Cache()
+    with parser.Verifier(cache=c, workers=2) as verifier:
+        message = verifier.proven(models.VALID_MESSAGE)
+        assert verifier.pending == [message.identifier]
+        assert not verifier.wait(message.identifier).check()
+        assert verifier.pending == []
+        assert len(c) > 0
+        assert len(cache.Cache()) == 0
+    assert len(cache.Cache()) == len(c)
+
+
+def test_verifier_error(tmp_path: Path) -> None:
+    cache.CACHE_DIR = tmp_path
+    c = cache.Cache()
+    unproven_message = model.UnprovenMessage(
+        "P::M",
+        [Link(INITIAL, Field("F")), Link(Field("F"), FINAL)],
+        {Field("F"): OPAQUE},
+    )
+    with parser.Verifier(cache=c, workers=2) as verifier:
+        message = verifier.proven(unproven_message)
+        assert verifier.wait(message.identifier).check()
+
+
+def test_verifier_sequential() -> None:
+    with parser.Verifier() as verifier:
+        verifier.proven(models.VALID_MESSAGE)
+        assert verifier.pending == []
+        with pytest.raises(RecordFluxError):
+            verifier.proven(models.INVALID_MESSAGE)
+
+
+def test_verifier_workspace(monkeypatch: Any) -> None:
+    workspace = parser.Workspace()
+    with parser.Verifier(workspace=workspace) as verifier:
+        verifier.proven(models.VALID_MESSAGE)
+    assert workspace.verified(models.VALID_MESSAGE)
+    monkeypatch.setattr(model.Message, "verify", lambda *x, **y: pytest.fail("verified again"))
+    with parser.Verifier(workspace=workspace) as verifier:
+        verifier.proven(models.VALID_MESSAGE)
+
+
+def test_verifier_workspace_workers() -> None:
+    workspace = parser.Workspace()
+    unproven_message = model.UnprovenMessage(
+        "P::M",
+        [Link(INITIAL, Field("F")), Link(Field("F"), FINAL)],
+        {Field("F"): OPAQUE},
+    )
+    with parser.Verifier(workers=2, workspace=workspace) as verifier:
+        for m in [models.VALID_MESSAGE, unproven_message]:
+            verifier.wait(verifier.proven(m).identifier)
+    assert workspace.verified(models.VALID_MESSAGE)
+    assert not workspace.verified(unproven_message)
+
+
+def test_workspace_modified(tmp_path: Path) -> None:
+    workspace = parser.Workspace()
+    specfile = tmp_path / "test.rflx"
+    assert not workspace.modified([specfile])
+    specfile.write_text("package Test is end Test;")
+    assert workspace.modified([specfile])
+    assert not workspace.modified()
+
+
+def test_create_model_workspace(monkeypatch: Any, tmp_path: Path) -> None:
+    def create_model(types: str) -> model.Model:
+        specfile.write_text(
+            f"""
+                package Test is
+                   {types}
+                   type M is
+                      message
+                         A : T;
+                      end message;
+                end Test;
+            """
+        )
+        p = parser.Parser(workspace=workspace)
+        p.parse(specfile)
+        return p.create_model()
+
+    verified = []
+    verify = model.Message.verify
+    monkeypatch.setattr(
+        model.Message,
+        "verify",
+        lambda self, *x, **y: verified.append(self) or verify(self, *x, **y),
+    )
+    specfile = tmp_path / "test.rflx"
+    workspace = parser.Workspace()
+    create_model("type T is mod 256;")
+    assert len(verified) == 1
+    assert not workspace.modified()
+    create_model("type T is mod 256; type U is mod 2**16;")
+    assert len(verified) == 1
+    create_model("type T is mod 2**16;")
+    assert len(verified) == 2
+
+
+def test_create_model_specification_cache(monkeypatch: Any, tmp_path: Path, caplog: Any) -> None:
+    def create_model(skip_verification: bool = False) -> model.Model:
+        p = parser.Parser(skip_verification, cached=True, cache_directory=tmp_path / "Cache")
+        p.parse(tmp_path / "test.rflx")
+        return p.create_model()
+
+    (tmp_path / "types.rflx").write_text(
+        """
+            package Types is
+               type T is mod 256;
+            end Types;
+        """
+    )
+    (tmp_path / "test.rflx").write_text(
+        """
+            with Types;
+
+            package Test is
+               type M is
+                  message
+                     A : Types::T;
+                  end message;
+            end Test;
+        """
+    )
+    evaluated = []
+    evaluate = parser.Parser._Parser__evaluate_specification  # type: ignore
+    monkeypatch.setattr(
+        parser.Parser,
+        "_Parser__evaluate_specification",
+        lambda self, spec, *x: evaluated.append(spec.f_package_declaration.f_identifier.text)
+        or evaluate(self, spec, *x),
+    )
+    expected = create_model()
+    assert evaluated == ["Types", "Test"]
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        assert create_model() == expected
+    assert evaluated == ["Types", "Test"]
+    assert not [r for r in caplog.messages if r.startswith("Parsing")]
+    (tmp_path / "types.rflx").write_text(
+        """
+            package Types is
+               type T is mod 2**16;
+            end Types;
+        """
+    )
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        create_model(skip_verification=True)
+    assert evaluated == ["Types", "Test", "Types", "Test"]
+    assert [r for r in caplog.messages if r.startswith("Parsing")] == [
+        f"Parsing {tmp_path / 'test.rflx'}",
+        f"Parsing {tmp_path / 'types.rflx'}",
+    ]
+    create_model()
+    assert evaluated == ["Types", "Test", "Types", "Test", "Types", "Test"]
 
 
 @pytest.mark.parametrize("spec", ["empty_file", "comment_only"])